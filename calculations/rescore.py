@@ -0,0 +1,192 @@
+"""
+Re-score historical readings with new assumptions
+
+Run from the repository root:
+    python -m calculations.rescore readings.csv rescored.csv --met 1.1 --clo 0.7
+    python -m calculations.rescore readings.parquet rescored.parquet --workers 8
+    python -m calculations.rescore data/timeseries.db rescored.parquet --model 7730-2025
+Readings stream in chunks through a process pool running the vectorized
+ISO 7730 kernel; results are written in input order as chunks complete, so
+memory stays bounded by the chunks in flight. Parquet needs pyarrow.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calculations.thermal_comfort import BATCH_COLUMNS, ISO_MODELS, calculate_thermal_comfort_frame, invalid_mask
+
+DEFAULT_CHUNK_SIZE = 100000
+# Sensor/app column names accepted in place of the ISO input names
+COLUMN_ALIASES = {
+    'air_temperature': 'tdb',
+    'mean_radiant_temp': 'tr',
+    'air_velocity': 'vr',
+    'relative_humidity': 'rh'
+}
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files need pyarrow: pip install pyarrow")
+    return pyarrow.parquet
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most chunk_size readings from a CSV, Parquet or timeseries SQLite file"""
+    import pandas as pd
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif extension == '.parquet':
+        parquet = _require_pyarrow()
+        for batch in parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif extension == '.db':
+        import sqlite3
+        from utils.timeseries_db import TIMESTAMP_SCALE
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            yield from pd.read_sql_query(
+                f"SELECT room, ts * 1.0 / {TIMESTAMP_SCALE} AS ts, {', '.join(BATCH_COLUMNS)} "
+                f"FROM readings ORDER BY room, ts",
+                connection, chunksize=chunk_size
+            )
+        finally:
+            connection.close()
+    else:
+        raise ValueError(f"Unsupported input format: {path}")
+
+def score_chunk(frame, met=None, clo=None, model=ISO_MODELS[0]):
+    """
+    Add pmv/ppd columns to one chunk, scored with the given ISO 7730 edition;
+    met/clo replace the stored assumptions when given
+    """
+    frame = frame.rename(columns=COLUMN_ALIASES)
+    if met is not None:
+        frame['met'] = met
+    if clo is not None:
+        frame['clo'] = clo
+    frame['pmv'], frame['ppd'] = calculate_thermal_comfort_frame(frame, model=model)
+    return frame
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower()
+        if self.format not in ('.csv', '.parquet'):
+            raise ValueError(f"Unsupported output format: {path}")
+        self._parquet = None
+        self._started = False
+
+    def write(self, frame):
+        if self.format == '.csv':
+            frame.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        else:
+            import pyarrow
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = _require_pyarrow().ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+class Progress:
+    """Rows, invalid rows and throughput, printed every interval seconds"""
+
+    def __init__(self, interval=5.0, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.rows = 0
+        self.invalid = 0
+        self.chunks = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def update(self, frame):
+        self.rows += len(frame)
+        self.invalid += int(invalid_mask(frame['pmv'].to_numpy(), frame['ppd'].to_numpy()).sum())
+        self.chunks += 1
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            'rows': self.rows,
+            'invalid': self.invalid,
+            'chunks': self.chunks,
+            'elapsed_s': elapsed,
+            'rows_per_s': self.rows / elapsed if elapsed > 0 else 0.0
+        }
+
+    def report(self, final=False):
+        summary = self.summary()
+        print(f"{'Done: ' if final else ''}{summary['rows']:,} rows in {summary['chunks']} chunks, "
+              f"{summary['invalid']:,} invalid, {summary['elapsed_s']:.1f}s ({summary['rows_per_s']:,.0f} rows/s)",
+              file=self.stream)
+
+def rescore(input_path, output_path, met=None, clo=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+            progress_interval=5.0, model=ISO_MODELS[0]):
+    """Stream input_path through score_chunk on a process pool into output_path; returns the progress summary"""
+    workers = workers or os.cpu_count() or 1
+    writer = ChunkWriter(output_path)
+    progress = Progress(progress_interval)
+    try:
+        if workers == 1:
+            for frame in read_chunks(input_path, chunk_size):
+                scored = score_chunk(frame, met, clo, model)
+                writer.write(scored)
+                progress.update(scored)
+        else:
+            # At most two chunks per worker in flight; results are written in input order
+            max_in_flight = 2 * workers
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for frame in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(score_chunk, frame, met, clo, model))
+                    if len(pending) >= max_in_flight:
+                        scored = pending.popleft().result()
+                        writer.write(scored)
+                        progress.update(scored)
+                while pending:
+                    scored = pending.popleft().result()
+                    writer.write(scored)
+                    progress.update(scored)
+    finally:
+        writer.close()
+    progress.report(final=True)
+    return progress.summary()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score stored readings with new comfort assumptions")
+    parser.add_argument('input', help="Readings as .csv, .parquet or a timeseries .db")
+    parser.add_argument('output', help="Scored readings as .csv or .parquet")
+    parser.add_argument('--met', type=float, default=None, help="Metabolic rate for every reading (default: stored)")
+    parser.add_argument('--clo', type=float, default=None, help="Clothing insulation for every reading (default: stored)")
+    parser.add_argument('--model', choices=ISO_MODELS, default=ISO_MODELS[0],
+                        help=f"ISO 7730 edition to score with (default: {ISO_MODELS[0]}, as the dashboard)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Readings per chunk")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    try:
+        rescore(args.input, args.output, met=args.met, clo=args.clo, workers=args.workers,
+                chunk_size=args.chunk_size, progress_interval=args.progress_interval, model=args.model)
+    except (KeyError, ValueError) as error:
+        raise SystemExit(f"Error: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,30 @@
-from pythermalcomfort.models import pmv_ppd_iso
+from collections import OrderedDict
+import numpy as np
+import threading
+import warnings
 import math
 
+from utils.metrics import increment, timer
+
+BATCH_COLUMNS = ('tdb', 'tr', 'vr', 'rh', 'met', 'clo')
+# Editions of ISO 7730 pythermalcomfort implements; the dashboard and daemon score with the first
+ISO_MODELS = ('7730-2005', '7730-2025')
+
+# Slider steps in app.py: 0.1 for temperatures/humidity, 0.01 for air speed/met/clo
+CACHE_QUANTA = (0.1, 0.1, 0.01, 0.1, 0.01, 0.01)
+DEFAULT_CACHE_SIZE = 4096
+
+# ISO 7730 air temperature limits, the search range for setpoints (°C)
+SETPOINT_BRACKET = (10.0, 30.0)
+
+def pmv_ppd_iso(**kwargs):
+    """pythermalcomfort (and numba with it) takes seconds to import; load it on first use"""
+    from pythermalcomfort.models import pmv_ppd_iso
+    with timer('pmv_ppd_iso'):
+        result = pmv_ppd_iso(**kwargs)
+    increment('pmv_rows', int(np.size(kwargs['tdb'])))
+    return result
+
 def calculate_thermal_comfort(air_temperature, mean_radiant_temp, air_velocity, 
                             relative_humidity, met, clo):
     """
@@ -16,8 +40,121 @@ def calculate_thermal_comfort(air_temperature, mean_radiant_temp, air_velocity,
         model="7730-2005"
     )
 
-    pmv = result.pmv
-    ppd = result.ppd
+    return format_comfort_values(result.pmv, result.ppd)
+
+def calculate_thermal_comfort_batch(air_temperature, mean_radiant_temp, air_velocity,
+                                   relative_humidity, met, clo, model="7730-2005"):
+    """
+    Calculate PMV and PPD for many readings in one vectorized ISO 7730 pass
+    (model: one of ISO_MODELS). Inputs are scalars or array-likes that broadcast
+    against each other. Returns float64 arrays (pmv, ppd); rows with invalid input are NaN.
+    """
+    tdb, tr, vr, rh, met, clo = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in
+          (air_temperature, mean_radiant_temp, air_velocity, relative_humidity, met, clo))
+    )
+
+    # Out-of-range rows are expected in fleet data; they come back as NaN instead
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = pmv_ppd_iso(
+            tdb=tdb,
+            tr=tr,
+            vr=vr,
+            rh=rh,
+            met=met,
+            clo=clo,
+            model=model,
+            round_output=False
+        )
+
+    pmv = np.asarray(result.pmv, dtype=np.float64).reshape(tdb.shape)
+    ppd = np.asarray(result.ppd, dtype=np.float64).reshape(tdb.shape)
+    return pmv, ppd
+
+def calculate_thermal_comfort_frame(readings, model="7730-2005"):
+    """
+    Calculate PMV and PPD for a DataFrame (or mapping of arrays) with
+    tdb/tr/vr/rh/met/clo columns. Returns float64 arrays (pmv, ppd).
+    """
+    missing = [column for column in BATCH_COLUMNS if column not in readings]
+    if missing:
+        raise KeyError(f"Missing input columns: {', '.join(missing)}")
+
+    return calculate_thermal_comfort_batch(
+        readings['tdb'],
+        readings['tr'],
+        readings['vr'],
+        readings['rh'],
+        readings['met'],
+        readings['clo'],
+        model=model
+    )
+
+def invalid_mask(pmv, ppd):
+    """Boolean mask of rows the batch calculation could not score"""
+    return np.isnan(pmv) | np.isnan(ppd)
+
+def _unlimited_pmv(tdb, tr, vr, rh, met, clo):
+    """PMV without the ISO applicability limits, so the solver sees a continuous function"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = pmv_ppd_iso(tdb=tdb, tr=tr, vr=vr, rh=rh, met=met, clo=clo,
+                             model="7730-2005", limit_inputs=False, round_output=False)
+    return np.asarray(result.pmv, dtype=np.float64).reshape(np.shape(tdb))
+
+def solve_air_temperature(target_pmv, mean_radiant_temp, air_velocity, relative_humidity, met, clo,
+                          bracket=SETPOINT_BRACKET, tolerance=0.01):
+    """
+    Air temperature at which PMV equals target_pmv, for many rooms at once.
+    Inputs broadcast like calculate_thermal_comfort_batch. PMV rises monotonically
+    with air temperature, so every room is bisected inside bracket simultaneously:
+    each iteration is one vectorized PMV evaluation over all rooms.
+    Returns float64 temperatures; NaN where the target is not reachable inside the
+    bracket or the other inputs are outside the ISO 7730 limits.
+    """
+    target, tr, vr, rh, met, clo = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in
+          (target_pmv, mean_radiant_temp, air_velocity, relative_humidity, met, clo))
+    )
+    low = np.full(target.shape, float(bracket[0]))
+    high = np.full(target.shape, float(bracket[1]))
+    solvable = ((_unlimited_pmv(low, tr, vr, rh, met, clo) <= target) &
+                (_unlimited_pmv(high, tr, vr, rh, met, clo) >= target))
+
+    for _ in range(int(np.ceil(np.log2((bracket[1] - bracket[0]) / tolerance)))):
+        middle = (low + high) / 2
+        below = _unlimited_pmv(middle, tr, vr, rh, met, clo) < target
+        low = np.where(below, middle, low)
+        high = np.where(below, high, middle)
+
+    temperature = (low + high) / 2
+    # Solutions that the forward calculation would reject are not setpoints
+    pmv, _ = calculate_thermal_comfort_batch(temperature, tr, vr, rh, met, clo)
+    return np.where(solvable & ~np.isnan(pmv), temperature, np.nan)
+
+def comfort_temperature_band(comfort_pmv_min, comfort_pmv_max, mean_radiant_temp, air_velocity,
+                             relative_humidity, met, clo, **kwargs):
+    """
+    Air temperature range (low, high) that keeps PMV within [comfort_pmv_min, comfort_pmv_max],
+    solved for both band edges of every room in one bisection
+    """
+    shape = np.broadcast(*(np.asarray(value) for value in
+                           (comfort_pmv_min, comfort_pmv_max, mean_radiant_temp, air_velocity,
+                            relative_humidity, met, clo))).shape
+    targets = np.stack([np.broadcast_to(np.asarray(comfort_pmv_min, dtype=np.float64), shape),
+                        np.broadcast_to(np.asarray(comfort_pmv_max, dtype=np.float64), shape)])
+    low, high = solve_air_temperature(targets, mean_radiant_temp, air_velocity, relative_humidity,
+                                      met, clo, **kwargs)
+    return low, high
+
+def format_comfort_values(pmv, ppd):
+    """
+    Format PMV and PPD for display. Display-only: returns strings,
+    "Invalid input" when either value is NaN.
+    """
+    pmv = float(pmv)
+    ppd = float(ppd)
 
     # Handle nan values
     if math.isnan(pmv) or math.isnan(ppd):
@@ -25,6 +162,100 @@ def calculate_thermal_comfort(air_temperature, mean_radiant_temp, air_velocity,
     
     return f"{pmv:.2f}", f"{ppd:.1f}"
 
+class ComfortCache:
+    """
+    Bounded LRU cache of PMV/PPD results keyed on quantized inputs.
+    Safe to share between Streamlit sessions (threads) in one process.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, quanta=CACHE_QUANTA):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.quanta = quanta
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, air_temperature, mean_radiant_temp, air_velocity,
+                 relative_humidity, met, clo):
+        """Snap inputs to their slider step; integer keys avoid float noise"""
+        values = (air_temperature, mean_radiant_temp, air_velocity, relative_humidity, met, clo)
+        return tuple(int(round(value / step)) for value, step in zip(values, self.quanta))
+
+    def get(self, air_temperature, mean_radiant_temp, air_velocity,
+            relative_humidity, met, clo):
+        """Return (pmv, ppd) floats, running the ISO 7730 solver only on a miss"""
+        key = self.make_key(air_temperature, mean_radiant_temp, air_velocity,
+                            relative_humidity, met, clo)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Solve on the quantized inputs so every caller of a key sees the same value
+        pmv, ppd = calculate_thermal_comfort_batch(
+            *(index * step for index, step in zip(key, self.quanta))
+        )
+        value = (float(pmv), float(ppd))
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def resize(self, maxsize):
+        """Change the eviction size, dropping least recently used entries if needed"""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+_comfort_cache = ComfortCache()
+
+def cached_thermal_comfort(air_temperature, mean_radiant_temp, air_velocity,
+                           relative_humidity, met, clo):
+    """
+    Calculate PMV and PPD through the process-wide LRU cache.
+    Returns floats (pmv, ppd); NaN for invalid input.
+    """
+    return _comfort_cache.get(air_temperature, mean_radiant_temp, air_velocity,
+                              relative_humidity, met, clo)
+
+def configure_comfort_cache(maxsize):
+    """Set the eviction size of the process-wide comfort cache"""
+    _comfort_cache.resize(maxsize)
+
+def comfort_cache_info():
+    """Hit/miss counters of the process-wide comfort cache"""
+    return _comfort_cache.info()
+
 def get_comfort_recommendations(pmv, ppd, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max):
     """
     Get recommendations based on comfort parameters
@@ -1,7 +1,13 @@
 import streamlit as st
-import altair as alt
-import pandas as pd
+import numpy as np
 from datetime import datetime
+from utils.downsampling import decimate
+from utils.history import epoch_to_datetime
+from utils.rolling_stats import comfort_mask
+from utils.metrics import timed
+
+# altair and pandas are imported inside the chart builders, so importing this
+# module (e.g. for create_header) does not load the plotting stack
 
 def create_header(custom_title, custom_subtitle, session_tag, session_tag_color):
     """Create the app header with custom styling"""
@@ -27,18 +33,27 @@ def create_metrics_display(air_temperature, relative_humidity, pmv_display, ppd_
         st.metric("💨 Air Speed", f"{air_velocity:.2f} m/s")
         st.metric("⏱️ Session Duration", str(datetime.now() - session_start).split('.')[0])
 
-def create_charts(pmv_history, ppd_history, timestamp_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max):
-    """Create the charts section"""
+def history_chart_data(timestamp_history, values, name, max_points=None):
+    """Chart rows for one series, decimated with LTTB to at most max_points"""
+    import pandas as pd
+
+    if max_points is not None:
+        timestamp_history, values = decimate(timestamp_history, values, max_points)
+    return pd.DataFrame({
+        'Timestamp': epoch_to_datetime(timestamp_history),
+        name: values
+    })
+
+@timed('chart_history')
+def create_charts(pmv_history, ppd_history, timestamp_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max,
+                  max_points=None):
+    """Create the charts section; timestamps are epoch seconds"""
+    import altair as alt
+
     if len(pmv_history) > 1:
-        chart_data = pd.DataFrame({
-            'Timestamp': timestamp_history,
-            'PMV': pmv_history,
-            'PPD': ppd_history
-        })
-        
         # PMV Chart
-        pmv_chart = alt.Chart(chart_data).mark_line(color='orange').encode(
-            x='Timestamp',
+        pmv_chart = alt.Chart(history_chart_data(timestamp_history, pmv_history, 'PMV', max_points)).mark_line(color='orange').encode(
+            x='Timestamp:T',
             y=alt.Y('PMV', scale=alt.Scale(domain=[-2, 2]))
         ).properties(
             title='PMV History',
@@ -46,8 +61,8 @@ def create_charts(pmv_history, ppd_history, timestamp_history, comfort_pmv_min,
         )
         
         # PPD Chart
-        ppd_chart = alt.Chart(chart_data).mark_line(color='pink').encode(
-            x='Timestamp',
+        ppd_chart = alt.Chart(history_chart_data(timestamp_history, ppd_history, 'PPD', max_points)).mark_line(color='pink').encode(
+            x='Timestamp:T',
             y=alt.Y('PPD', scale=alt.Scale(domain=[0, 100]))
         ).properties(
             title='PPD History',
@@ -57,8 +72,67 @@ def create_charts(pmv_history, ppd_history, timestamp_history, comfort_pmv_min,
         return pmv_chart, ppd_chart
     return None, None
 
+def comfort_segments(pmv_history, ppd_history, timestamp_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max):
+    """
+    Run-length encode the comfort status: one row per run of consecutive
+    Comfort/Discomfort readings with its start and end epoch seconds.
+    """
+    import pandas as pd
+
+    comfortable = comfort_mask(pmv_history, ppd_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)
+    timestamps = np.asarray(timestamp_history, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, comfortable[1:] != comfortable[:-1]])
+    # A run ends where the next one starts; the last one lasts one typical sample interval
+    step = int(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 1
+    ends = np.r_[timestamps[starts[1:]], timestamps[-1] + max(step, 1)]
+    return pd.DataFrame({
+        'Start': timestamps[starts],
+        'End': ends,
+        'Status': np.where(comfortable[starts], 'Comfort', 'Discomfort'),
+        'Samples': np.diff(np.r_[starts, len(timestamps)])
+    })
+
+@timed('chart_timeline')
+def create_comfort_timeline(pmv_history, ppd_history, timestamp_history, comfort_pmv_min, comfort_pmv_max, comfort_ppd_max):
+    """Comfort timeline as a single rect chart with one mark per run"""
+    import altair as alt
+
+    segments = comfort_segments(pmv_history, ppd_history, timestamp_history,
+                                comfort_pmv_min, comfort_pmv_max, comfort_ppd_max)
+    segments['Start'] = epoch_to_datetime(segments['Start'])
+    segments['End'] = epoch_to_datetime(segments['End'])
+    return alt.Chart(segments).mark_rect().encode(
+        x=alt.X('Start:T', title=None),
+        x2='End:T',
+        color=alt.Color('Status:N', scale=alt.Scale(domain=["Comfort", "Discomfort"], range=["#4CAF50", "#F44336"])),
+        tooltip=[alt.Tooltip('Start:T', format='%H:%M:%S'), alt.Tooltip('End:T', format='%H:%M:%S'),
+                 'Status:N', 'Samples:Q']
+    ).properties(height=60)
+
+@timed('chart_pie')
+def create_comfort_pie(comfort_counts):
+    """Comfort vs discomfort proportion from {'Comfort': n, 'Discomfort': m}"""
+    import altair as alt
+    import pandas as pd
+
+    comfort_counts = {status: count for status, count in comfort_counts.items() if count}
+    return alt.Chart(pd.DataFrame({
+        'Status': list(comfort_counts),
+        'Count': list(comfort_counts.values())
+    })).mark_arc(innerRadius=50).encode(
+        theta='Count',
+        color=alt.Color('Status:N', scale=alt.Scale(domain=["Comfort", "Discomfort"], range=["#4CAF50", "#F44336"]))
+    ).properties(
+        title="Comfort vs Discomfort Proportion",
+        height=300
+    )
+
+@timed('chart_feedback')
 def create_feedback_section(feedback_counts):
     """Create the user feedback section"""
+    import altair as alt
+    import pandas as pd
+
     feedback_df = pd.DataFrame({
         'Feedback': list(feedback_counts.keys()),
         'Count': list(feedback_counts.values())
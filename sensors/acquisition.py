@@ -0,0 +1,252 @@
+"""
+Asynchronous multi-port sensor acquisition
+Polls many Arduino nodes concurrently and publishes readings into one shared queue
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+import serial
+
+from sensors.frames import FRAME_SIZE
+from sensors.sensor_interface import DATA_FORMATS, MODES, make_decoder, negotiate_format
+
+class PortStats:
+    """Counters for one serial port"""
+
+    def __init__(self, port: str):
+        self.port = port
+        self.connected = False
+        self.readings = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.last_reading_at: Optional[float] = None
+        self.data_format: Optional[str] = None
+        self.decoder: Dict = {}
+
+    def as_dict(self) -> Dict:
+        return dict(vars(self))
+
+class AcquisitionService:
+    def __init__(self, ports: Iterable[str], baud_rate: int = 9600, mode: str = 'poll',
+                 data_format: str = 'json', interval: float = 1.0,
+                 read_timeout: float = 1.0, connect_timeout: float = 5.0, reset_delay: float = 2.0,
+                 backoff_initial: float = 1.0, backoff_max: float = 60.0, max_failures: int = 3,
+                 queue_size: int = 10000, serial_factory: Optional[Callable] = None):
+        """
+        Initialize acquisition service
+        ports: Serial ports to poll (e.g., ['/dev/ttyUSB0', '/dev/ttyUSB1'])
+        mode: 'poll' requests each reading; 'stream' lets devices push readings
+        data_format: 'json', 'binary' or 'auto', negotiated per port (see negotiate_format)
+        interval: Seconds between requests on each port (poll mode)
+        read_timeout: Per-port limit for one round trip, or for silence in stream mode
+        reset_delay: Seconds to wait after opening a port while the Arduino resets
+        backoff_initial, backoff_max: Reconnect delay bounds, doubled after each failure
+        max_failures: Consecutive bad reads before a port is reopened
+        serial_factory: Callable(port, baud_rate, timeout) returning a serial-like object
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f"data_format must be one of {DATA_FORMATS}")
+        self.ports = list(dict.fromkeys(ports))
+        self.mode = mode
+        self.data_format = data_format
+        self.baud_rate = baud_rate
+        self.interval = interval
+        self.read_timeout = read_timeout
+        self.connect_timeout = connect_timeout
+        self.reset_delay = reset_delay
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.max_failures = max_failures
+        self.serial_factory = serial_factory or (
+            lambda port, baud_rate, timeout: serial.Serial(port, baud_rate, timeout=timeout)
+        )
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.stats = {port: PortStats(port) for port in self.ports}
+        self._tasks = []
+        self._executors = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        """Start one polling task per port"""
+        if self._tasks:
+            return
+        for port in self.ports:
+            # A dedicated thread per port: a hung driver call only blocks its own port
+            self._executors[port] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sensor-{port}")
+            self._tasks.append(asyncio.create_task(self._run_port(port), name=f"acquire-{port}"))
+
+    async def stop(self):
+        """Cancel all polling tasks and close ports"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+        self._executors = {}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-port counters"""
+        return {port: stats.as_dict() for port, stats in self.stats.items()}
+
+    def _negotiate(self, connection) -> str:
+        return negotiate_format(connection, self.data_format)
+
+    async def _in_thread(self, port: str, func: Callable, *args, timeout: float):
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(self._executors[port], func, *args), timeout)
+
+    def _publish(self, port: str, reading: Dict):
+        item = {'port': port, 'timestamp': time.time(), **reading}
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Keep the newest data flowing when consumers fall behind
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(item)
+
+    def _open(self, port: str):
+        return self.serial_factory(port, self.baud_rate, self.read_timeout)
+
+    @staticmethod
+    def _request(connection, data_format: str) -> bytes:
+        connection.write(b'R')
+        if data_format == 'binary':
+            return connection.read(FRAME_SIZE)
+        return connection.readline()
+
+    @staticmethod
+    def _start_stream(connection):
+        connection.reset_input_buffer()
+        connection.write(b'S')
+
+    @staticmethod
+    def _read_chunk(connection) -> bytes:
+        # Returns whatever has arrived, or waits up to the port timeout for one byte
+        return connection.read(connection.in_waiting or 1)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    async def _run_port(self, port: str):
+        stats = self.stats[port]
+        delay = self.backoff_initial
+        while True:
+            connection = None
+            try:
+                connection = await self._in_thread(port, self._open, port, timeout=self.connect_timeout)
+                await asyncio.sleep(self.reset_delay)  # Wait for Arduino to reset
+                data_format = await self._in_thread(port, self._negotiate, connection,
+                                                    timeout=self.connect_timeout)
+                stats.connected = True
+                stats.data_format = data_format
+                delay = self.backoff_initial
+                if self.mode == 'stream':
+                    await self._stream_port(port, connection, data_format)
+                else:
+                    await self._poll_port(port, connection, data_format)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+            except (serial.SerialException, OSError) as e:
+                stats.errors += 1
+                print(f"Sensor port {port}: {str(e)}")
+            finally:
+                stats.connected = False
+                if connection is not None:
+                    self._close(connection)
+
+            stats.reconnects += 1
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.backoff_max)
+
+    async def _poll_port(self, port: str, connection, data_format: str):
+        """Request readings until the port fails max_failures times in a row"""
+        loop = asyncio.get_running_loop()
+        stats = self.stats[port]
+        decoder = make_decoder(data_format)
+        failures = 0
+        while failures < self.max_failures:
+            started = loop.time()
+            try:
+                data = await self._in_thread(port, self._request, connection, data_format,
+                                             timeout=self.read_timeout)
+                # A reply cut short by the timeout must not prefix the next one
+                decoder.reset()
+                readings = decoder.feed(data + b'\n' if data_format == 'json' else data)
+                reading = readings[-1] if readings else None
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                reading = None
+            stats.decoder = decoder.stats()
+
+            if reading is None:
+                failures += 1
+                stats.errors += 1
+            else:
+                failures = 0
+                stats.readings += 1
+                stats.last_reading_at = time.time()
+                self._publish(port, reading)
+
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    async def _stream_port(self, port: str, connection, data_format: str):
+        """Decode pushed readings until the port stays silent max_failures times in a row"""
+        stats = self.stats[port]
+        decoder = make_decoder(data_format)
+        await self._in_thread(port, self._start_stream, connection, timeout=self.read_timeout)
+        silent = 0
+        while silent < self.max_failures:
+            try:
+                data = await self._in_thread(port, self._read_chunk, connection, timeout=self.read_timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                data = b''
+
+            if not data:
+                silent += 1
+                continue
+            silent = 0
+            readings = decoder.feed(data)
+            stats.decoder = decoder.stats()
+            if readings:
+                stats.readings += len(readings)
+                stats.last_reading_at = time.time()
+            for reading in readings:
+                self._publish(port, reading)
+
+# Example usage:
+if __name__ == "__main__":
+    import sys
+
+    async def main(ports):
+        async with AcquisitionService(ports) as service:
+            while True:
+                reading = await service.queue.get()
+                print("Sensor readings:", reading)
+
+    try:
+        asyncio.run(main(sys.argv[1:] or ['/dev/ttyUSB0']))
+    except KeyboardInterrupt:
+        pass
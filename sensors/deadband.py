@@ -0,0 +1,96 @@
+"""
+Change detection in front of the comfort calculation
+Sensor readings mostly jitter within sensor resolution; a reading is only
+passed on when an input moved by at least its deadband since the last
+passed reading of the same source, or when the heartbeat interval elapsed.
+Suppressed readings skip the PMV solve, storage and chart updates.
+"""
+
+import time
+from typing import Dict, Hashable, Iterable, List, Optional
+
+# Default deadbands in input units: roughly the resolution of the sensor nodes.
+# met/clo come from the user, so any change passes.
+DEFAULT_DEADBANDS = {
+    'air_temperature': 0.1,
+    'mean_radiant_temp': 0.1,
+    'relative_humidity': 1.0,
+    'air_velocity': 0.01,
+    'met': 0.0,
+    'clo': 0.0
+}
+# Seconds after which an unchanged reading is passed anyway
+DEFAULT_HEARTBEAT = 60.0
+# Slack for float subtraction, so a move of exactly one deadband (22.3 -> 22.4) passes
+_STEP_TOLERANCE = 1e-9
+
+class ChangeDetector:
+    def __init__(self, deadbands: Optional[Dict[str, float]] = None, heartbeat: Optional[float] = DEFAULT_HEARTBEAT):
+        """
+        Initialize change detector
+        deadbands: Per-input overrides merged over DEFAULT_DEADBANDS; inputs
+                   missing from a reading are ignored
+        heartbeat: Pass a reading at least this often per source (None: never)
+        """
+        self.deadbands = {**DEFAULT_DEADBANDS, **(deadbands or {})}
+        self.heartbeat = heartbeat
+        # Last passed reading per source: (values, time passed)
+        self._reference: Dict[Hashable, tuple] = {}
+        self.seen = 0
+        self.changed = 0
+        self.heartbeats = 0
+        self.suppressed = 0
+
+    def configure(self, deadbands: Optional[Dict[str, float]] = None, heartbeat: Optional[float] = DEFAULT_HEARTBEAT):
+        """Change the settings, keeping the counters; the next reading of every source passes"""
+        deadbands = {**DEFAULT_DEADBANDS, **(deadbands or {})}
+        if deadbands != self.deadbands or heartbeat != self.heartbeat:
+            self.deadbands = deadbands
+            self.heartbeat = heartbeat
+            self._reference.clear()
+
+    def _moved(self, reference: Dict[str, float], reading: Dict) -> bool:
+        for name, deadband in self.deadbands.items():
+            if name not in reading:
+                continue
+            previous = reference.get(name)
+            if previous is None:
+                return True
+            change = abs(reading[name] - previous)
+            # NaN values compare false, so they count as a change and are always looked at
+            if not (change == 0 or change < deadband - _STEP_TOLERANCE):
+                return True
+        return False
+
+    def check(self, reading: Dict, source: Hashable = None, now: Optional[float] = None) -> bool:
+        """True if reading should be processed; updates the source's reference when it is"""
+        self.seen += 1
+        now = reading.get('timestamp', time.time()) if now is None else now
+        state = self._reference.get(source)
+        if state is None or self._moved(state[0], reading):
+            self.changed += 1
+        elif self.heartbeat is not None and now - state[1] >= self.heartbeat:
+            self.heartbeats += 1
+        else:
+            self.suppressed += 1
+            return False
+        self._reference[source] = ({name: reading[name] for name in self.deadbands if name in reading}, now)
+        return True
+
+    def filter(self, readings: Iterable[Dict], source_key: str = 'port') -> List[Dict]:
+        """Readings (queue items keyed by source_key) that should be processed, in order"""
+        return [reading for reading in readings if self.check(reading, reading.get(source_key))]
+
+    def reset(self, source: Hashable = None):
+        """Forget the reference of one source, so its next reading passes"""
+        self._reference.pop(source, None)
+
+    def snapshot(self) -> Dict:
+        """Counters of the work saved so far"""
+        return {
+            'seen': self.seen,
+            'changed': self.changed,
+            'heartbeats': self.heartbeats,
+            'suppressed': self.suppressed,
+            'suppressed_ratio': self.suppressed / self.seen if self.seen else 0.0
+        }
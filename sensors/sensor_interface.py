@@ -1,157 +1,376 @@
-# """
-# Sensor Interface for Thermal Comfort Monitor
-# Uses Arduino-compatible sensors to read environmental parameters
-# """
-
-# import serial
-# import time
-# import json
-# from typing import Dict, Optional
-
-# class SensorInterface:
-#     def __init__(self, port: str = '/dev/ttyUSB0', baud_rate: int = 9600):
-#         """
-#         Initialize sensor interface
-#         port: Serial port (e.g., '/dev/ttyUSB0' for Linux, 'COM3' for Windows)
-#         baud_rate: Serial communication speed
-#         """
-#         self.port = port
-#         self.baud_rate = baud_rate
-#         self.serial = None
-#         self.connected = False
-
-#     def connect(self) -> bool:
-#         """Establish connection with Arduino"""
-#         try:
-#             self.serial = serial.Serial(self.port, self.baud_rate, timeout=1)
-#             time.sleep(2)  # Wait for Arduino to reset
-#             self.connected = True
-#             return True
-#         except Exception as e:
-#             print(f"Connection error: {str(e)}")
-#             self.connected = False
-#             return False
-
-#     def disconnect(self):
-#         """Close serial connection"""
-#         if self.serial and self.serial.is_open:
-#             self.serial.close()
-#             self.connected = False
-
-#     def read_sensors(self) -> Optional[Dict]:
-#         """
-#         Read all sensor values
-#         Returns dictionary with sensor readings or None if error
-#         """
-#         if not self.connected:
-#             if not self.connect():
-#                 return None
-
-#         try:
-#             # Request sensor data
-#             self.serial.write(b'R')
-#             time.sleep(0.1)  # Wait for response
-
-#             # Read response
-#             if self.serial.in_waiting:
-#                 data = self.serial.readline().decode('utf-8').strip()
-#                 try:
-#                     sensor_data = json.loads(data)
-#                     return {
-#                         'air_temperature': sensor_data.get('temp', 0),
-#                         'relative_humidity': sensor_data.get('humidity', 0),
-#                         'air_velocity': sensor_data.get('air_speed', 0),
-#                         'mean_radiant_temp': sensor_data.get('radiant_temp', 0)
-#                     }
-#                 except json.JSONDecodeError:
-#                     print("Error parsing sensor data")
-#                     return None
-#             return None
-#         except Exception as e:
-#             print(f"Error reading sensors: {str(e)}")
-#             self.connected = False
-#             return None
-
-# # Example Arduino code (to be uploaded to Arduino):
-# """
-# #include <DHT.h>
-# #include <Wire.h>
-# #include <Adafruit_Sensor.h>
-# #include <Adafruit_BME280.h>
-# #include <Adafruit_MLX90614.h>
-
-# // Pin definitions
-# #define DHT_PIN 2
-# #define DHT_TYPE DHT22
-# #define ANEMOMETER_PIN A0
-
-# // Initialize sensors
-# DHT dht(DHT_PIN, DHT_TYPE);
-# Adafruit_BME280 bme;
-# Adafruit_MLX90614 mlx = Adafruit_MLX90614();
-
-# void setup() {
-#   Serial.begin(9600);
+"""
+Sensor Interface for Thermal Comfort Monitor
+Uses Arduino-compatible sensors to read environmental parameters
+"""
+
+import serial
+import time
+import json
+from collections import deque
+from typing import Dict, List, Optional
+
+from sensors.frames import FRAME_SIZE, FrameDecoder
+from utils.metrics import timed, timer
+
+MODES = ('poll', 'stream')
+DATA_FORMATS = ('auto', 'json', 'binary')
+
+def parse_sensor_line(line) -> Optional[Dict]:
+    """
+    Parse one JSON line sent by the Arduino sketch
+    Returns dictionary with sensor readings or None if the line is not valid JSON
+    """
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    try:
+        sensor_data = json.loads(line.strip())
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(sensor_data, dict):
+        return None
+    return {
+        'air_temperature': sensor_data.get('temp', 0),
+        'relative_humidity': sensor_data.get('humidity', 0),
+        'air_velocity': sensor_data.get('air_speed', 0),
+        'mean_radiant_temp': sensor_data.get('radiant_temp', 0)
+    }
+
+class LineDecoder:
+    """
+    Incremental decoder for a stream of JSON lines
+    Feed raw bytes as they arrive; complete lines are parsed, the trailing
+    fragment is kept for the next feed. Bad lines are counted and skipped.
+    """
+
+    def __init__(self, max_line_length: int = 256):
+        self.max_line_length = max_line_length
+        self.lines = 0
+        self.partial_lines = 0
+        self.corrupt_lines = 0
+        self._buffer = bytearray()
+
+    @timed('sensor_decode')
+    def feed(self, data: bytes) -> List[Dict]:
+        """Decode all complete lines in data, returning sensor readings in order"""
+        self._buffer += data
+        *lines, rest = self._buffer.split(b'\n')
+        self._buffer = bytearray(rest)
+        if len(self._buffer) > self.max_line_length:
+            # No newline in sight: drop the runaway fragment
+            self._buffer.clear()
+            self.partial_lines += 1
+
+        readings = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            self.lines += 1
+            # Lines cut off at connect time or by dropped bytes lose a brace
+            if not (line.startswith(b'{') and line.endswith(b'}')):
+                self.partial_lines += 1
+                continue
+            reading = parse_sensor_line(line)
+            if reading is None:
+                self.corrupt_lines += 1
+                continue
+            readings.append(reading)
+        return readings
+
+    def reset(self):
+        self._buffer.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'lines': self.lines,
+            'partial_lines': self.partial_lines,
+            'corrupt_lines': self.corrupt_lines
+        }
+
+def negotiate_format(connection, requested: str = 'auto') -> str:
+    """
+    Agree on a payload format with the device, returning 'json' or 'binary'
+    Sends 'V'; firmware with binary frames answers {"formats":["json","binary"]}
+    and is switched over with 'B'. Older firmware ignores 'V', the read times out
+    and JSON is kept.
+    """
+    if requested not in DATA_FORMATS:
+        raise ValueError(f"data_format must be one of {DATA_FORMATS}")
+    if requested == 'json':
+        return 'json'
+
+    connection.reset_input_buffer()
+    connection.write(b'V')
+    try:
+        capabilities = json.loads(connection.readline().decode('utf-8', errors='replace'))
+        formats = capabilities.get('formats', []) if isinstance(capabilities, dict) else []
+    except json.JSONDecodeError:
+        formats = []
+
+    if 'binary' in formats:
+        connection.write(b'B')
+        return 'binary'
+    if requested == 'binary':
+        print("Device does not support binary frames, using JSON")
+    return 'json'
+
+def make_decoder(data_format: str):
+    """Incremental decoder for a negotiated payload format"""
+    return FrameDecoder() if data_format == 'binary' else LineDecoder()
+
+class SensorInterface:
+    def __init__(self, port: str = '/dev/ttyUSB0', baud_rate: int = 9600, mode: str = 'poll',
+                 data_format: str = 'json', max_pending: int = 1000):
+        """
+        Initialize sensor interface
+        port: Serial port (e.g., '/dev/ttyUSB0' for Linux, 'COM3' for Windows)
+        baud_rate: Serial communication speed
+        mode: 'poll' sends a request per reading; 'stream' lets the device push
+              readings at its own rate (needs the streaming sketch below)
+        data_format: 'json', 'binary' or 'auto'; binary and auto are negotiated
+                     with the device at connect time and fall back to JSON
+        max_pending: Streamed readings queued by read_available before the oldest are dropped;
+                     read_sensors returns the newest one and clears the queue
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f"data_format must be one of {DATA_FORMATS}")
+        self.port = port
+        self.baud_rate = baud_rate
+        self.mode = mode
+        self.requested_format = data_format
+        self.data_format = 'json'
+        self.serial = None
+        self.connected = False
+        self.decoder = LineDecoder()
+        self.pending = deque(maxlen=max_pending)
+
+    def connect(self) -> bool:
+        """Establish connection with Arduino"""
+        try:
+            self.serial = serial.Serial(self.port, self.baud_rate, timeout=1)
+            time.sleep(2)  # Wait for Arduino to reset
+            self.data_format = negotiate_format(self.serial, self.requested_format)
+            self.decoder = make_decoder(self.data_format)
+            if self.mode == 'stream':
+                self.serial.reset_input_buffer()
+                self.serial.write(b'S')  # Start streaming
+            self.connected = True
+            return True
+        except Exception as e:
+            print(f"Connection error: {str(e)}")
+            self.connected = False
+            return False
+
+    def disconnect(self):
+        """Close serial connection"""
+        if self.serial and self.serial.is_open:
+            if self.mode == 'stream':
+                try:
+                    self.serial.write(b'X')  # Stop streaming
+                except Exception:
+                    pass
+            self.serial.close()
+            self.connected = False
+
+    @timed('sensor_read')
+    def read_sensors(self) -> Optional[Dict]:
+        """
+        Read all sensor values
+        Returns dictionary with sensor readings or None if error. In streaming
+        mode this is the newest reading pushed so far; older ones are dropped,
+        so a slow caller never falls behind the device.
+        """
+        if not self.connected:
+            if not self.connect():
+                return None
+
+        if self.mode == 'stream':
+            self.read_available(block=not self.pending)
+            if not self.pending:
+                return None
+            reading = self.pending[-1]
+            self.pending.clear()
+            return reading
+
+        try:
+            # Request sensor data
+            self.serial.write(b'R')
+            if self.data_format == 'binary':
+                readings = self.decoder.feed(self.serial.read(FRAME_SIZE))
+                return readings[-1] if readings else None
+            time.sleep(0.1)  # Wait for response
+
+            # Read response
+            if self.serial.in_waiting:
+                data = self.serial.readline()
+                with timer('sensor_decode'):
+                    sensor_data = parse_sensor_line(data)
+                if sensor_data is None:
+                    print("Error parsing sensor data")
+                return sensor_data
+            return None
+        except Exception as e:
+            print(f"Error reading sensors: {str(e)}")
+            self.connected = False
+            return None
+
+    def read_available(self, block: bool = False) -> List[Dict]:
+        """
+        Streaming mode: decode everything the device has pushed so far
+        Readings are also queued for read_sensors. With block=True, waits up to
+        the serial timeout for at least some data.
+        """
+        if not self.connected and not self.connect():
+            return []
+
+        try:
+            waiting = self.serial.in_waiting
+            if not waiting and not block:
+                return []
+            readings = self.decoder.feed(self.serial.read(waiting or 1))
+            if not readings and block:
+                # Finish the line or frame in progress, bounded by the serial timeout
+                if self.data_format == 'binary':
+                    readings = self.decoder.feed(self.serial.read(FRAME_SIZE))
+                else:
+                    readings = self.decoder.feed(self.serial.readline())
+        except Exception as e:
+            print(f"Error reading sensors: {str(e)}")
+            self.connected = False
+            return []
+
+        self.pending.extend(readings)
+        return readings
+
+# Example Arduino code (to be uploaded to Arduino):
+"""
+#include <DHT.h>
+#include <Wire.h>
+#include <Adafruit_Sensor.h>
+#include <Adafruit_BME280.h>
+#include <Adafruit_MLX90614.h>
+
+// Pin definitions
+#define DHT_PIN 2
+#define DHT_TYPE DHT22
+#define ANEMOMETER_PIN A0
+// ~70-byte JSON lines every 200 ms use about a third of a 9600-baud link
+#define STREAM_INTERVAL_MS 200
+
+// Initialize sensors
+DHT dht(DHT_PIN, DHT_TYPE);
+Adafruit_BME280 bme;
+Adafruit_MLX90614 mlx = Adafruit_MLX90614();
+
+bool streaming = false;
+bool binary = false;
+uint8_t seq = 0;
+unsigned long last_sent = 0;
+
+// 20-byte frame: 0xAA 0x55, seq, 4 x float32, checksum (sum of bytes 2..18)
+void sendFrame(float temp, float humidity, float air_speed, float radiant_temp) {
+  uint8_t frame[20];
+  frame[0] = 0xAA;
+  frame[1] = 0x55;
+  frame[2] = seq++;
+  memcpy(frame + 3, &temp, 4);
+  memcpy(frame + 7, &humidity, 4);
+  memcpy(frame + 11, &air_speed, 4);
+  memcpy(frame + 15, &radiant_temp, 4);
+  uint8_t checksum = 0;
+  for (int i = 2; i < 19; i++) {
+    checksum += frame[i];
+  }
+  frame[19] = checksum;
+  Serial.write(frame, 20);
+}
+
+void sendReading() {
+  // Read sensors
+  float humidity = dht.readHumidity();
+  float temp = dht.readTemperature();
+  float pressure = bme.readPressure() / 100.0F;
+  float radiant_temp = mlx.readObjectTempC();
   
-#   // Initialize DHT
-#   dht.begin();
+  // Read anemometer (air speed)
+  int anemometer_value = analogRead(ANEMOMETER_PIN);
+  float air_speed = map(anemometer_value, 0, 1023, 0, 5.0); // Convert to m/s
   
-#   // Initialize BME280
-#   if (!bme.begin(0x76)) {
-#     Serial.println("Could not find BME280 sensor!");
-#   }
+  if (binary) {
+    sendFrame(temp, humidity, air_speed, radiant_temp);
+    return;
+  }
+  
+  // Create JSON response
+  Serial.print("{");
+  Serial.print("\"temp\":");
+  Serial.print(temp);
+  Serial.print(",\"humidity\":");
+  Serial.print(humidity);
+  Serial.print(",\"air_speed\":");
+  Serial.print(air_speed);
+  Serial.print(",\"radiant_temp\":");
+  Serial.print(radiant_temp);
+  Serial.println("}");
+}
+
+void setup() {
+  Serial.begin(9600);
   
-#   // Initialize MLX90614
-#   if (!mlx.begin()) {
-#     Serial.println("Could not find MLX90614 sensor!");
-#   }
-# }
-
-# void loop() {
-#   if (Serial.available() > 0) {
-#     char command = Serial.read();
-#     if (command == 'R') {
-#       // Read sensors
-#       float humidity = dht.readHumidity();
-#       float temp = dht.readTemperature();
-#       float pressure = bme.readPressure() / 100.0F;
-#       float radiant_temp = mlx.readObjectTempC();
-      
-#       // Read anemometer (air speed)
-#       int anemometer_value = analogRead(ANEMOMETER_PIN);
-#       float air_speed = map(anemometer_value, 0, 1023, 0, 5.0); // Convert to m/s
-      
-#       // Create JSON response
-#       Serial.print("{");
-#       Serial.print("\"temp\":");
-#       Serial.print(temp);
-#       Serial.print(",\"humidity\":");
-#       Serial.print(humidity);
-#       Serial.print(",\"air_speed\":");
-#       Serial.print(air_speed);
-#       Serial.print(",\"radiant_temp\":");
-#       Serial.print(radiant_temp);
-#       Serial.println("}");
-#     }
-#   }
-#   delay(100);
-# }
-# """
-
-# # Example usage:
-# if __name__ == "__main__":
-#     # Create sensor interface
-#     sensor = SensorInterface(port='COM3')  # Change port as needed
+  // Initialize DHT
+  dht.begin();
+  
+  // Initialize BME280
+  if (!bme.begin(0x76)) {
+    Serial.println("Could not find BME280 sensor!");
+  }
+  
+  // Initialize MLX90614
+  if (!mlx.begin()) {
+    Serial.println("Could not find MLX90614 sensor!");
+  }
+}
+
+void loop() {
+  if (Serial.available() > 0) {
+    char command = Serial.read();
+    if (command == 'R') {
+      sendReading();
+    } else if (command == 'S') {
+      streaming = true;  // Push readings every STREAM_INTERVAL_MS
+    } else if (command == 'X') {
+      streaming = false;
+    } else if (command == 'V') {
+      Serial.println("{\"formats\":[\"json\",\"binary\"]}");
+    } else if (command == 'B') {
+      binary = true;  // Switch payloads to binary frames
+    } else if (command == 'J') {
+      binary = false;
+    }
+  }
+  if (streaming && millis() - last_sent >= STREAM_INTERVAL_MS) {
+    last_sent = millis();
+    sendReading();
+  }
+}
+"""
+
+# Example usage:
+if __name__ == "__main__":
+    # Create sensor interface
+    sensor = SensorInterface(port='COM3')  # Change port as needed
     
-#     # Connect to Arduino
-#     if sensor.connect():
-#         print("Connected to sensors")
+    # Connect to Arduino
+    if sensor.connect():
+        print("Connected to sensors")
         
-#         # Read sensor values
-#         while True:
-#             data = sensor.read_sensors()
-#             if data:
-#                 print("Sensor readings:", data)
-#             time.sleep(1)  # Read every second
-#     else:
-#         print("Failed to connect to sensors") 
\ No newline at end of file
+        # Read sensor values
+        while True:
+            data = sensor.read_sensors()
+            if data:
+                print("Sensor readings:", data)
+            time.sleep(1)  # Read every second
+    else:
+        print("Failed to connect to sensors") 
\ No newline at end of file
@@ -0,0 +1,303 @@
+"""
+Simulated sensor fleet for load testing without hardware
+Generates drifting readings for N virtual rooms and serves them in-process,
+through a SensorInterface-compatible object, or as virtual serial devices
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from sensors.frames import encode_frame
+
+class SimulatedSensorFleet:
+    def __init__(self, n_rooms: int, seed: Optional[int] = None):
+        """
+        Initialize a fleet of virtual rooms
+        Each room drifts around its own setpoints (mean-reverting random walk)
+        with a daily temperature cycle; all rooms advance in one vectorized step.
+        """
+        if n_rooms < 1:
+            raise ValueError("n_rooms must be at least 1")
+        self.n_rooms = n_rooms
+        self.rng = np.random.default_rng(seed)
+        self.setpoint_temp = self.rng.uniform(20.0, 26.0, n_rooms)
+        self.setpoint_humidity = self.rng.uniform(30.0, 60.0, n_rooms)
+        self.setpoint_air_speed = self.rng.uniform(0.05, 0.3, n_rooms)
+        self.radiant_offset = self.rng.normal(0.0, 0.8, n_rooms)
+        self.phase = self.rng.uniform(0.0, 2 * np.pi, n_rooms)
+
+        self.temp = self.setpoint_temp.copy()
+        self.humidity = self.setpoint_humidity.copy()
+        self.air_speed = self.setpoint_air_speed.copy()
+        self.radiant_temp = self.temp + self.radiant_offset
+        self.elapsed = 0.0
+        self.last_update: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _drift(values, setpoint, dt, reversion, noise, rng):
+        """
+        Ornstein-Uhlenbeck step towards setpoint, sampled from the exact transition
+        so it stays stable for any dt (an Euler step overshoots once dt > 1/reversion)
+        """
+        decay = np.exp(-reversion * dt)
+        spread = noise * np.sqrt((1.0 - decay * decay) / (2.0 * reversion))
+        values -= setpoint
+        values *= decay
+        values += setpoint + spread * rng.standard_normal(values.shape)
+
+    def step(self, dt: float = 1.0):
+        """Advance every room by dt seconds"""
+        if dt <= 0:
+            return
+        with self._lock:
+            self.elapsed += dt
+            daily = 1.5 * np.sin(2 * np.pi * self.elapsed / 86400.0 + self.phase)
+            self._drift(self.temp, self.setpoint_temp + daily, dt, 0.01, 0.05, self.rng)
+            self._drift(self.humidity, self.setpoint_humidity, dt, 0.005, 0.2, self.rng)
+            self._drift(self.air_speed, self.setpoint_air_speed, dt, 0.05, 0.01, self.rng)
+            # Surfaces follow the air slowly
+            self.radiant_temp += min(1.0, 0.002 * dt) * (self.temp + self.radiant_offset - self.radiant_temp)
+
+            np.clip(self.temp, 15.0, 30.0, out=self.temp)
+            np.clip(self.humidity, 10.0, 90.0, out=self.humidity)
+            np.clip(self.air_speed, 0.05, 1.0, out=self.air_speed)
+            np.clip(self.radiant_temp, 15.0, 30.0, out=self.radiant_temp)
+
+    def advance_to(self, now: Optional[float] = None):
+        """Advance by the wall-clock time since the last call (from any thread)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self.last_update is not None and now < self.last_update:
+                return
+            dt = 0.0 if self.last_update is None else now - self.last_update
+            self.last_update = now
+        self.step(dt)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Current readings for all rooms, keyed like read_sensors"""
+        with self._lock:
+            return {
+                'air_temperature': self.temp.copy(),
+                'relative_humidity': self.humidity.copy(),
+                'air_velocity': self.air_speed.copy(),
+                'mean_radiant_temp': self.radiant_temp.copy()
+            }
+
+    def read_room(self, room: int) -> Dict:
+        """Current reading of one room in the SensorInterface.read_sensors schema"""
+        with self._lock:
+            return {
+                'air_temperature': round(float(self.temp[room]), 2),
+                'relative_humidity': round(float(self.humidity[room]), 2),
+                'air_velocity': round(float(self.air_speed[room]), 2),
+                'mean_radiant_temp': round(float(self.radiant_temp[room]), 2)
+            }
+
+class SimulatedSensorInterface:
+    """Drop-in replacement for SensorInterface reading one room of a simulated fleet"""
+
+    def __init__(self, fleet: SimulatedSensorFleet, room: int = 0):
+        if not 0 <= room < fleet.n_rooms:
+            raise ValueError(f"room must be between 0 and {fleet.n_rooms - 1}")
+        self.fleet = fleet
+        self.room = room
+        self.port = f"sim://{room}"
+        self.connected = False
+
+    def connect(self) -> bool:
+        self.connected = True
+        return True
+
+    def disconnect(self):
+        self.connected = False
+
+    def read_sensors(self) -> Optional[Dict]:
+        if not self.connected:
+            self.connect()
+        self.fleet.advance_to()
+        return self.fleet.read_room(self.room)
+
+class SimulatedAcquisition:
+    """
+    In-process counterpart of AcquisitionService
+    Publishes one reading per room every 1/rate seconds into an asyncio queue,
+    using the same item layout ({'port', 'timestamp', **reading}).
+    """
+
+    def __init__(self, fleet: SimulatedSensorFleet, rate: float = 1.0, queue_size: int = 100000):
+        self.fleet = fleet
+        self.rate = rate
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.published = 0
+        self.dropped = 0
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="simulated-acquisition")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict:
+        return {'rooms': self.fleet.n_rooms, 'published': self.published, 'dropped': self.dropped}
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        ports = [f"sim://{room}" for room in range(self.fleet.n_rooms)]
+        while True:
+            started = loop.time()
+            self.fleet.step(1.0 / self.rate)
+            now = time.time()
+            columns = self.fleet.arrays()
+            for index, port in enumerate(ports):
+                item = {'port': port, 'timestamp': now,
+                        **{key: float(values[index]) for key, values in columns.items()}}
+                if self.queue.full():
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                self.queue.put_nowait(item)
+            self.published += len(ports)
+            await asyncio.sleep(max(0.0, 1.0 / self.rate - (loop.time() - started)))
+
+class VirtualSerialDevice:
+    """
+    Pseudo-terminal that speaks the Arduino sketch protocol for one simulated room
+    Point SensorInterface or AcquisitionService at .port (Linux/macOS only).
+    Supports R (read), S/X (start/stop streaming), V (formats), B/J (binary/JSON).
+    """
+
+    def __init__(self, fleet: SimulatedSensorFleet, room: int = 0, stream_interval: float = 0.05):
+        import pty
+        import tty
+
+        self.fleet = fleet
+        self.room = room
+        self.stream_interval = stream_interval
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self.streaming = False
+        self.binary = False
+        self._seq = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._serve, name=f"virtual-serial-{self.room}", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _payload(self) -> bytes:
+        self.fleet.advance_to()
+        reading = self.fleet.read_room(self.room)
+        if self.binary:
+            self._seq += 1
+            return encode_frame(self._seq, reading['air_temperature'], reading['relative_humidity'],
+                                reading['air_velocity'], reading['mean_radiant_temp'])
+        return (json.dumps({
+            'temp': reading['air_temperature'],
+            'humidity': reading['relative_humidity'],
+            'air_speed': reading['air_velocity'],
+            'radiant_temp': reading['mean_radiant_temp']
+        }, separators=(',', ':')) + '\r\n').encode()
+
+    def _serve(self):
+        import select
+
+        next_push = time.monotonic()
+        while self._running:
+            timeout = max(0.0, next_push - time.monotonic()) if self.streaming else 0.1
+            try:
+                ready, _, _ = select.select([self._master], [], [], timeout)
+                commands = os.read(self._master, 64) if ready else b''
+            except OSError:
+                break
+
+            for command in commands.decode('ascii', errors='ignore'):
+                if command == 'R':
+                    os.write(self._master, self._payload())
+                elif command == 'S':
+                    self.streaming = True
+                    next_push = time.monotonic()
+                elif command == 'X':
+                    self.streaming = False
+                elif command == 'V':
+                    os.write(self._master, b'{"formats":["json","binary"]}\r\n')
+                elif command == 'B':
+                    self.binary = True
+                elif command == 'J':
+                    self.binary = False
+
+            if self.streaming and time.monotonic() >= next_push:
+                os.write(self._master, self._payload())
+                next_push += self.stream_interval
+
+# Example usage:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulated sensor fleet")
+    parser.add_argument('--rooms', type=int, default=1000, help="Number of virtual rooms")
+    parser.add_argument('--rate', type=float, default=1.0, help="Readings per room per second")
+    parser.add_argument('--seconds', type=float, default=10.0, help="How long to run the in-process source")
+    parser.add_argument('--serial', type=int, default=0,
+                        help="Serve this many rooms as virtual serial devices instead")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    fleet = SimulatedSensorFleet(args.rooms, seed=args.seed)
+    if args.serial:
+        devices = [VirtualSerialDevice(fleet, room).start() for room in range(min(args.serial, args.rooms))]
+        for device in devices:
+            print(f"Room {device.room}: {device.port}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for device in devices:
+                device.close()
+    else:
+        async def main():
+            consumed = 0
+            started = time.monotonic()
+            async with SimulatedAcquisition(fleet, rate=args.rate) as source:
+                while time.monotonic() - started < args.seconds:
+                    try:
+                        await asyncio.wait_for(source.queue.get(), timeout=1.0)
+                        consumed += 1
+                    except asyncio.TimeoutError:
+                        pass
+                elapsed = time.monotonic() - started
+                print(f"{consumed} readings in {elapsed:.1f}s ({consumed / elapsed:.0f}/s), {source.snapshot()}")
+
+        asyncio.run(main())
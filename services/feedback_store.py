@@ -0,0 +1,305 @@
+"""
+Comfort feedback shared by every dashboard viewer
+
+Votes from all browser sessions of a Streamlit process go to one
+FeedbackStore. Counters per room and time bucket are updated in memory under
+a lock, so recording a vote and reading the live pie chart are O(1); votes
+reach SQLite in batches from a background thread, so a lecture hall voting at
+once costs one transaction per flush instead of one per vote. On start the
+store reloads recent buckets from the database, so restarts lose nothing
+that was flushed.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+
+DEFAULT_FEEDBACK_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'feedback.db')
+VOTES = ('Too Cold', 'Comfortable', 'Too Hot')
+# Each vote on a three-point sensation scale, compared with PMV by join_pmv
+VOTE_SENSATION = np.array([-1.0, 0.0, 1.0])
+DEFAULT_BUCKET_SECONDS = 60
+# Window of the live counts (pie chart)
+DEFAULT_WINDOW_SECONDS = 3600
+# Buckets kept in memory per room (one day of minutes); older ones are read from the database
+DEFAULT_MEMORY_BUCKETS = 24 * 60
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Pending votes that trigger a flush before the interval is up
+DEFAULT_MAX_PENDING = 1000
+# Seconds a vote's timestamp may be ahead of this host's clock
+MAX_CLOCK_SKEW = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS votes (
+    room TEXT NOT NULL,
+    ts REAL NOT NULL,
+    vote INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS votes_room_ts ON votes (room, ts);
+"""
+
+class _RoomCounters:
+    """Vote counts per bucket of one room, plus running totals of the buckets inside the live window"""
+
+    def __init__(self, since):
+        self.buckets = deque()  # [bucket_start, counts], oldest first; counts is a list per vote
+        self.window = [0] * len(VOTES)
+        self.window_first = 0  # index of the oldest bucket inside the window
+        self.since = since  # every vote from this time on is in memory
+
+    def add(self, bucket, vote, count, memory_buckets):
+        """Count votes in their own bucket; votes older than since are only kept in the database"""
+        if bucket < self.since:
+            return
+        if not self.buckets or bucket > self.buckets[-1][0]:
+            self.buckets.append([bucket, [0] * len(VOTES)])
+            index = len(self.buckets) - 1
+        else:
+            # A late vote (e.g. recorded with its client-side timestamp)
+            index = bisect_left(self.buckets, bucket, key=lambda entry: entry[0])
+            if self.buckets[index][0] != bucket:
+                self.buckets.insert(index, [bucket, [0] * len(VOTES)])
+                if index < self.window_first:
+                    self.window_first += 1
+        self.buckets[index][1][vote] += count
+        # Buckets at or after window_first are in the window until the next expire()
+        if index >= self.window_first:
+            self.window[vote] += count
+        if len(self.buckets) > memory_buckets:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        _, counts = self.buckets.popleft()
+        self.since = self.buckets[0][0]
+        if self.window_first > 0:
+            self.window_first -= 1
+        else:
+            for vote, count in enumerate(counts):
+                self.window[vote] -= count
+
+    def expire(self, cutoff):
+        """Move buckets that started before cutoff out of the window totals"""
+        while self.window_first < len(self.buckets) and self.buckets[self.window_first][0] < cutoff:
+            for vote, count in enumerate(self.buckets[self.window_first][1]):
+                self.window[vote] -= count
+            self.window_first += 1
+
+class FeedbackStore:
+    def __init__(self, path=DEFAULT_FEEDBACK_DB, bucket_seconds=DEFAULT_BUCKET_SECONDS,
+                 window_seconds=DEFAULT_WINDOW_SECONDS, memory_buckets=DEFAULT_MEMORY_BUCKETS,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_pending=DEFAULT_MAX_PENDING):
+        """
+        Open (and create) the store and start its writer thread
+        path: SQLite file for the votes; None keeps them in memory only
+        bucket_seconds: Width of the time buckets counts are kept in
+        window_seconds: Span of the live counts returned by counts(); at most
+                        memory_buckets buckets, since counts() only reads memory
+        """
+        if window_seconds > memory_buckets * bucket_seconds:
+            raise ValueError("window_seconds must fit in memory_buckets buckets")
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        self.window_seconds = window_seconds
+        self.memory_buckets = memory_buckets
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._rooms = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.recorded = 0
+        self.written = 0
+        self.flushes = 0
+
+        self._conn = None
+        # Votes before this time are only in the database
+        self._memory_since = -np.inf
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._load()
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._writer = None
+        if self._conn is not None:
+            self._writer = threading.Thread(target=self._run, name='feedback-writer', daemon=True)
+            self._writer.start()
+
+    def _bucket(self, timestamp):
+        return int(timestamp) - int(timestamp) % self.bucket_seconds
+
+    def _load(self):
+        """Rebuild the in-memory buckets from the votes of the last memory_buckets buckets"""
+        since = self._memory_since = self._bucket(time.time()) - (self.memory_buckets - 1) * self.bucket_seconds
+        rows = self._conn.execute(
+            "SELECT room, CAST(ts AS INTEGER) - CAST(ts AS INTEGER) % ? AS bucket, vote, COUNT(*) "
+            "FROM votes WHERE ts >= ? GROUP BY room, bucket, vote ORDER BY bucket",
+            (self.bucket_seconds, since)
+        ).fetchall()
+        for room, bucket, vote, count in rows:
+            self._counters(room).add(bucket, vote, count, self.memory_buckets)
+
+    def _counters(self, room):
+        counters = self._rooms.get(room)
+        if counters is None:
+            counters = self._rooms[room] = _RoomCounters(self._memory_since)
+        return counters
+
+    def record(self, room, vote, timestamp=None):
+        """Count one vote (a VOTES label or its index) for room; timestamps in the future are rejected"""
+        if isinstance(vote, str):
+            if vote not in VOTES:
+                raise ValueError(f"Unknown vote: {vote}")
+            vote = VOTES.index(vote)
+        elif not 0 <= vote < len(VOTES):
+            raise ValueError(f"Unknown vote: {vote}")
+        now = time.time()
+        timestamp = now if timestamp is None else float(timestamp)
+        if timestamp > now + MAX_CLOCK_SKEW:
+            raise ValueError(f"Vote timestamp {timestamp} is in the future")
+        with self._lock:
+            self._counters(room).add(self._bucket(timestamp), vote, 1, self.memory_buckets)
+            self.recorded += 1
+            if self._conn is not None:
+                self._pending.append((room, timestamp, vote))
+                if len(self._pending) >= self.max_pending:
+                    self._wake.set()
+
+    def counts(self, room, now=None):
+        """{vote label: count} of room over the live window (amortized O(1))"""
+        cutoff = self._bucket(time.time() if now is None else now) - self.window_seconds + self.bucket_seconds
+        with self._lock:
+            counters = self._rooms.get(room)
+            if counters is None:
+                return {label: 0 for label in VOTES}
+            counters.expire(cutoff)
+            return dict(zip(VOTES, counters.window))
+
+    def rooms(self):
+        with self._lock:
+            return sorted(self._rooms)
+
+    def bucket_counts(self, room, start=None, end=None):
+        """
+        (bucket_start, counts) of room with start <= bucket_start <= end, oldest first
+        counts has one column per vote. Buckets older than the in-memory ones come from the database.
+        """
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        with self._lock:
+            counters = self._rooms.get(room)
+            since = self._memory_since if counters is None else counters.since
+            # Anything before since is read from the database, so it is not counted twice
+            lower = max(start, since) if self._conn is not None else start
+            memory = [] if counters is None else [(bucket, list(counts)) for bucket, counts in counters.buckets
+                                                  if lower <= bucket <= end]
+
+        older = []
+        if self._conn is not None and start < since:
+            self.flush()
+            with self._db_lock:
+                rows = self._conn.execute(
+                    "SELECT CAST(ts AS INTEGER) - CAST(ts AS INTEGER) % ? AS bucket, vote, COUNT(*) "
+                    "FROM votes WHERE room = ? AND ts >= ? AND ts < ? GROUP BY bucket, vote ORDER BY bucket",
+                    (self.bucket_seconds, room, max(start, -2.0 ** 62), min(end + self.bucket_seconds, since))
+                ).fetchall()
+            by_bucket = {}
+            for bucket, vote, count in rows:
+                by_bucket.setdefault(bucket, [0] * len(VOTES))[vote] += count
+            older = sorted(by_bucket.items())
+
+        buckets = older + memory
+        if not buckets:
+            return np.empty(0, dtype=np.int64), np.zeros((0, len(VOTES)), dtype=np.int64)
+        return (np.array([bucket for bucket, _ in buckets], dtype=np.int64),
+                np.array([counts for _, counts in buckets], dtype=np.int64))
+
+    def join_pmv(self, room, pmv, timestamps, start=None, end=None):
+        """
+        Votes next to computed comfort, per bucket with at least one vote
+        pmv, timestamps: The room's PMV readings (epoch seconds), e.g. HistoryBuffer.window()
+        Returns {'bucket', 'votes', 'mean_vote', 'mean_pmv'} arrays (mean_pmv is NaN for
+        buckets without readings) and 'overall': the same means over all those buckets.
+        """
+        buckets, counts = self.bucket_counts(room, start, end)
+        votes = counts.sum(axis=1)
+        mean_vote = counts @ VOTE_SENSATION / np.maximum(votes, 1)
+
+        pmv = np.asarray(pmv, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        valid = ~np.isnan(pmv)
+        pmv, timestamps = pmv[valid], timestamps[valid]
+        # Position of each reading's bucket among the vote buckets (-1 when no one voted then)
+        reading_buckets = timestamps - timestamps % self.bucket_seconds
+        position = np.searchsorted(buckets, reading_buckets)
+        matched = (position < len(buckets)) & (buckets[np.minimum(position, len(buckets) - 1)] == reading_buckets) \
+            if len(buckets) else np.zeros(len(pmv), dtype=bool)
+        pmv_sum = np.bincount(position[matched], weights=pmv[matched], minlength=len(buckets))
+        pmv_count = np.bincount(position[matched], minlength=len(buckets))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_pmv = pmv_sum / pmv_count
+
+        total_votes = int(votes.sum())
+        overall = {
+            'votes': total_votes,
+            'mean_vote': float(counts.sum(axis=0) @ VOTE_SENSATION / total_votes) if total_votes else float('nan'),
+            'mean_pmv': float(pmv[matched].mean()) if matched.any() else float('nan')
+        }
+        return {'bucket': buckets, 'votes': votes, 'mean_vote': mean_vote, 'mean_pmv': mean_pmv, 'overall': overall}
+
+    def flush(self):
+        """Write pending votes in one transaction; returns the number written"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or self._conn is None:
+            return 0
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT INTO votes (room, ts, vote) VALUES (?, ?, ?)", pending)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                with self._lock:
+                    # Keep the votes for the next attempt, oldest first
+                    self._pending[:0] = pending
+                raise
+            self._conn.execute("COMMIT")
+            self.written += len(pending)
+            self.flushes += 1
+        return len(pending)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error writing feedback: {str(e)}")
+
+    def info(self):
+        with self._lock:
+            pending = len(self._pending)
+            rooms = len(self._rooms)
+        return {'recorded': self.recorded, 'written': self.written, 'pending': pending,
+                'flushes': self.flushes, 'rooms': rooms}
+
+    def close(self):
+        """Stop the writer and write what is still pending"""
+        self._stop.set()
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join()
+        self.flush()
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
@@ -0,0 +1,133 @@
+"""
+Shared results store between the scoring daemon and any number of dashboards
+The daemon writes; Streamlit processes only read, so viewers add no scoring work.
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+
+from utils.session_store import SessionStore
+
+DEFAULT_RESULTS_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'live')
+LATEST_DTYPE = np.dtype([
+    ('room', 'U64'),
+    ('timestamp', '<f8'),
+    ('tdb', '<f8'),
+    ('tr', '<f8'),
+    ('vr', '<f8'),
+    ('rh', '<f8'),
+    ('met', '<f8'),
+    ('clo', '<f8'),
+    ('pmv', '<f8'),
+    ('ppd', '<f8'),
+])
+
+def room_key(room):
+    """File-system safe directory name for a room id such as '/dev/ttyUSB0' or 'sim://3'"""
+    return re.sub(r'[^\w.-]+', '_', room).strip('_') or 'room'
+
+class ResultsStore:
+    """
+    Latest comfort result per room plus per-room history
+    latest.npy is replaced atomically on every scoring batch; history goes to an
+    append-only SessionStore per room under rooms/.
+    """
+
+    def __init__(self, root=DEFAULT_RESULTS_ROOT, segment_size=600):
+        self.root = root
+        self.segment_size = segment_size
+        self.latest_path = os.path.join(root, 'latest.npy')
+        self._histories = {}
+        self._latest = {}
+        self._cached = (None, {})
+        self._lock = threading.Lock()
+
+    # Writer side (scoring daemon)
+
+    def write_batch(self, rows):
+        """
+        Record a structured array of scored readings (LATEST_DTYPE); readings that
+        could not be scored (NaN PMV/PPD) update the latest result but not the history
+        """
+        for row in rows:
+            room = str(row['room'])
+            self._latest[room] = row
+            if not (np.isnan(row['pmv']) or np.isnan(row['ppd'])):
+                self._history(room).append(row['pmv'], row['ppd'], row['timestamp'])
+
+        os.makedirs(self.root, exist_ok=True)
+        latest = np.array(list(self._latest.values()), dtype=LATEST_DTYPE)
+        temporary = self.latest_path + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, latest)
+        os.replace(temporary, self.latest_path)
+
+    def flush(self):
+        """Make buffered history visible to readers"""
+        for history in self._histories.values():
+            history.flush()
+
+    def compact(self):
+        for history in self._histories.values():
+            history.compact()
+
+    def _history(self, room):
+        if room not in self._histories:
+            # The daemon flushes and compacts on its own schedule
+            self._histories[room] = SessionStore(room_key(room), os.path.join(self.root, 'rooms'), self.segment_size,
+                                                 flush_interval=None, compact_after=None)
+        return self._histories[room]
+
+    # Reader side (dashboards)
+
+    def latest(self):
+        """Latest result per room as {room: {field: value}}, re-read only when the file changes"""
+        try:
+            stat = os.stat(self.latest_path)
+        except FileNotFoundError:
+            return {}
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._cached[0] == version:
+                return self._cached[1]
+        try:
+            latest = np.load(self.latest_path)
+        except (OSError, ValueError):
+            return self._cached[1]
+        results = {
+            str(row['room']): {name: (str(row[name]) if name == 'room' else float(row[name]))
+                               for name in LATEST_DTYPE.names}
+            for row in latest
+        }
+        with self._lock:
+            self._cached = (version, results)
+        return results
+
+    def version(self):
+        """Changes whenever the daemon publishes a new batch"""
+        try:
+            stat = os.stat(self.latest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def history_version(self, room):
+        """Changes whenever a new history segment is written for room"""
+        try:
+            return os.stat(os.path.join(self.root, 'rooms', room_key(room))).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def rooms(self):
+        return sorted(self.latest())
+
+    def history(self, room, start=None, end=None):
+        """(pmv, ppd, timestamp) arrays of a room's flushed history"""
+        return SessionStore(room_key(room), os.path.join(self.root, 'rooms')).read_range(start, end)
+
+    def recent(self, room, count):
+        """(pmv, ppd, timestamp) arrays of a room's newest count flushed readings"""
+        return SessionStore(room_key(room), os.path.join(self.root, 'rooms')).read_last(count)
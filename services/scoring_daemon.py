@@ -0,0 +1,211 @@
+"""
+Headless multi-room scoring daemon
+Ingests sensor readings, drops those that stayed within sensor resolution,
+computes comfort once per remaining reading in vectorized batches, and
+publishes results to a ResultsStore shared by all dashboards.
+
+Run from the repository root:
+    python -m services.scoring_daemon --ports /dev/ttyUSB0 /dev/ttyUSB1
+    python -m services.scoring_daemon --simulate 1000
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from calculations.thermal_comfort import calculate_thermal_comfort_batch
+from sensors.deadband import ChangeDetector
+from services.results_store import LATEST_DTYPE, ResultsStore
+from utils.metrics import increment, register_collector, start_metrics_server, timed, timer
+from utils.timeseries_db import TimeSeriesDB
+
+class ScoringDaemon:
+    def __init__(self, source, store: ResultsStore, met: float = 1.2, clo: float = 0.5,
+                 room_settings: Optional[Dict[str, Dict]] = None, batch_interval: float = 1.0,
+                 flush_interval: float = 60.0, compact_interval: float = 3600.0,
+                 database: Optional[TimeSeriesDB] = None, maintenance_interval: float = 60.0,
+                 detector: Optional[ChangeDetector] = None):
+        """
+        Initialize scoring daemon
+        source: AcquisitionService or SimulatedAcquisition (anything with a .queue of readings)
+        met, clo: Default occupant assumptions
+        room_settings: Optional per-room overrides, e.g. {'/dev/ttyUSB0': {'met': 1.0, 'clo': 0.7}}
+        batch_interval: Seconds of readings scored together in one vectorized call
+        database: Optional TimeSeriesDB that also receives every scored batch,
+                  rolled up and trimmed every maintenance_interval seconds
+        detector: Optional ChangeDetector; readings within its deadbands of the
+                  room's last scored reading are dropped before scoring and storage
+        """
+        self.source = source
+        self.store = store
+        self.met = met
+        self.clo = clo
+        self.room_settings = room_settings or {}
+        self.batch_interval = batch_interval
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.database = database
+        self.maintenance_interval = maintenance_interval
+        self.detector = detector
+        self.scored = 0
+        self.invalid = 0
+        self.batches = 0
+
+    async def _collect(self):
+        """Wait for at least one reading, then drain whatever arrives within batch_interval"""
+        queue = self.source.queue
+        readings = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_interval
+        while True:
+            while not queue.empty():
+                readings.append(queue.get_nowait())
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return readings
+            try:
+                readings.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                return readings
+
+    @timed('daemon_score')
+    def score(self, readings):
+        """Score a list of queue items in one vectorized call; returns LATEST_DTYPE rows"""
+        rows = np.zeros(len(readings), dtype=LATEST_DTYPE)
+        rows['room'] = [reading['port'] for reading in readings]
+        rows['timestamp'] = [reading['timestamp'] for reading in readings]
+        rows['tdb'] = [reading['air_temperature'] for reading in readings]
+        rows['tr'] = [reading['mean_radiant_temp'] for reading in readings]
+        rows['vr'] = [reading['air_velocity'] for reading in readings]
+        rows['rh'] = [reading['relative_humidity'] for reading in readings]
+        rows['met'] = [self.room_settings.get(reading['port'], {}).get('met', self.met) for reading in readings]
+        rows['clo'] = [self.room_settings.get(reading['port'], {}).get('clo', self.clo) for reading in readings]
+
+        rows['pmv'], rows['ppd'] = calculate_thermal_comfort_batch(
+            rows['tdb'], rows['tr'], rows['vr'], rows['rh'], rows['met'], rows['clo']
+        )
+        return rows
+
+    async def run(self):
+        """Score until cancelled"""
+        loop = asyncio.get_running_loop()
+        last_flush = last_compact = last_maintenance = loop.time()
+        try:
+            while True:
+                readings = await self._collect()
+                increment('daemon_readings', len(readings))
+                if self.detector is not None:
+                    with timer('deadband_filter'):
+                        readings = self.detector.filter(readings)
+                if readings:
+                    with timer('daemon_batch', profile=True):
+                        rows = self.score(readings)
+                    # File and SQLite writes block; keep them off the event loop so acquisition keeps up
+                    with timer('store_write'):
+                        await asyncio.to_thread(self.store.write_batch, rows)
+                    if self.database is not None:
+                        with timer('db_insert'):
+                            await asyncio.to_thread(self.database.insert, rows)
+                    self.batches += 1
+                    self.scored += len(rows)
+                    self.invalid += int(np.isnan(rows['pmv']).sum())
+
+                # Segment writes and merges block too
+                now = loop.time()
+                if now - last_flush >= self.flush_interval:
+                    await asyncio.to_thread(self.store.flush)
+                    last_flush = now
+                if now - last_compact >= self.compact_interval:
+                    await asyncio.to_thread(self.store.compact)
+                    last_compact = now
+                if self.database is not None and now - last_maintenance >= self.maintenance_interval:
+                    await asyncio.to_thread(self.database.maintain)
+                    last_maintenance = now
+        finally:
+            self.store.flush()
+
+    def snapshot(self):
+        snapshot = {'batches': self.batches, 'scored': self.scored, 'invalid': self.invalid}
+        if self.detector is not None:
+            snapshot['deadband'] = self.detector.snapshot()
+        return snapshot
+
+def _source_totals(snapshot):
+    """Acquisition counters summed over ports (the simulator already reports totals)"""
+    totals = {}
+    for key, value in snapshot.items():
+        if isinstance(value, dict):
+            for name, count in value.items():
+                if isinstance(count, (int, float)) and not isinstance(count, bool) and name != 'last_reading_at':
+                    totals[name] = totals.get(name, 0) + count
+        else:
+            totals[key] = value
+    return totals
+
+async def _main(args):
+    if args.simulate:
+        from sensors.simulator import SimulatedAcquisition, SimulatedSensorFleet
+        source = SimulatedAcquisition(SimulatedSensorFleet(args.simulate, seed=args.seed), rate=args.rate)
+    else:
+        from sensors.acquisition import AcquisitionService
+        source = AcquisitionService(args.ports, mode=args.mode, data_format=args.data_format,
+                                    interval=1.0 / args.rate)
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+        register_collector('source', lambda: _source_totals(source.snapshot()),
+                           counters=('readings', 'errors', 'timeouts', 'reconnects', 'published', 'dropped'))
+    database = TimeSeriesDB(args.db) if args.db else None
+    daemon = ScoringDaemon(source, ResultsStore(args.data_dir), met=args.met, clo=args.clo,
+                           batch_interval=args.batch_interval, flush_interval=args.flush_interval,
+                           database=database,
+                           detector=None if args.no_deadband else ChangeDetector(heartbeat=args.heartbeat))
+    register_collector('daemon', daemon.snapshot, counters=('batches', 'scored', 'invalid'))
+    if daemon.detector is not None:
+        register_collector('deadband', daemon.detector.snapshot,
+                           counters=('seen', 'changed', 'heartbeats', 'suppressed'))
+    async with source:
+        task = asyncio.create_task(daemon.run())
+        try:
+            while True:
+                await asyncio.sleep(10)
+                print(f"{time.strftime('%H:%M:%S')} {daemon.snapshot()} {source.snapshot()}")
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            if database is not None:
+                database.close()
+
+if __name__ == "__main__":
+    import argparse
+    from sensors.deadband import DEFAULT_HEARTBEAT
+    from services.results_store import DEFAULT_RESULTS_ROOT
+    from utils.metrics import DEFAULT_METRICS_PORT
+    from utils.timeseries_db import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(description="Headless multi-room thermal comfort scoring")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--ports', nargs='+', help="Serial ports of the sensor nodes")
+    source_group.add_argument('--simulate', type=int, metavar='ROOMS', help="Score a simulated fleet instead")
+    parser.add_argument('--mode', choices=['poll', 'stream'], default='poll')
+    parser.add_argument('--data-format', choices=['auto', 'json', 'binary'], default='auto')
+    parser.add_argument('--rate', type=float, default=1.0, help="Readings per room per second")
+    parser.add_argument('--met', type=float, default=1.2, help="Default metabolic rate (met)")
+    parser.add_argument('--clo', type=float, default=0.5, help="Default clothing insulation (clo)")
+    parser.add_argument('--batch-interval', type=float, default=1.0)
+    parser.add_argument('--flush-interval', type=float, default=60.0)
+    parser.add_argument('--data-dir', default=DEFAULT_RESULTS_ROOT)
+    parser.add_argument('--db', nargs='?', const=DEFAULT_DB_PATH, default=None,
+                        help=f"Also store readings in SQLite with roll-ups and retention (default path {DEFAULT_DB_PATH})")
+    parser.add_argument('--heartbeat', type=float, default=DEFAULT_HEARTBEAT,
+                        help="Score an unchanged room at least every this many seconds")
+    parser.add_argument('--no-deadband', action='store_true', help="Score every reading, even unchanged ones")
+    parser.add_argument('--metrics-port', type=int, nargs='?', const=DEFAULT_METRICS_PORT, default=None,
+                        help=f"Serve Prometheus metrics on 127.0.0.1 (default port {DEFAULT_METRICS_PORT})")
+    parser.add_argument('--seed', type=int, default=None)
+
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,21 @@
+import numpy as np
+
+from calculations.thermal_comfort import calculate_thermal_comfort_batch, comfort_temperature_band
+
+def test_array_band_with_scalar_inputs():
+    pmv_min = np.array([-0.5, -0.2, -0.7])
+    pmv_max = np.array([0.5, 0.2, 0.7])
+    low, high = comfort_temperature_band(pmv_min, pmv_max, 25.0, 0.1, 50.0, 1.2, 0.7)
+
+    assert low.shape == high.shape == (3,)
+    # A narrower band sits inside a wider one
+    assert low[2] < low[0] < low[1] < high[1] < high[0] < high[2]
+    pmv, _ = calculate_thermal_comfort_batch(np.concatenate([low, high]), 25.0, 0.1, 50.0, 1.2, 0.7)
+    assert np.allclose(pmv, np.concatenate([pmv_min, pmv_max]), atol=0.01)
+
+def test_scalar_band_with_array_inputs():
+    low, high = comfort_temperature_band(-0.5, 0.5, np.array([23.0, 25.0]), 0.1, 50.0, 1.2, np.array([0.7, 1.0]))
+    assert low.shape == high.shape == (2,)
+    assert (low < high).all()
+    # More clothing moves the band down
+    assert high[1] < high[0]
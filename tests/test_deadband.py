@@ -0,0 +1,38 @@
+from sensors.deadband import ChangeDetector
+
+def _reading(air_temperature, relative_humidity=45.0, air_velocity=0.1, met=1.2, clo=0.5):
+    return {'air_temperature': air_temperature, 'mean_radiant_temp': air_temperature,
+            'relative_humidity': relative_humidity, 'air_velocity': air_velocity, 'met': met, 'clo': clo}
+
+def test_move_of_exactly_one_step_passes():
+    # 22.4 - 22.3 is just under 0.1 in binary floating point, 22.6 - 22.5 just over
+    for start, end in ((22.3, 22.4), (22.5, 22.6), (22.4, 22.3)):
+        detector = ChangeDetector(heartbeat=None)
+        assert detector.check(_reading(start), now=0.0)
+        assert detector.check(_reading(end), now=1.0), (start, end)
+
+def test_move_within_the_deadband_is_suppressed():
+    detector = ChangeDetector(heartbeat=None)
+    assert detector.check(_reading(22.3), now=0.0)
+    assert not detector.check(_reading(22.35), now=1.0)
+    assert not detector.check(_reading(22.3, relative_humidity=45.9), now=2.0)
+    assert detector.snapshot()['suppressed'] == 2
+
+def test_zero_deadband_passes_any_change_but_not_an_unchanged_value():
+    detector = ChangeDetector(heartbeat=None)
+    assert detector.check(_reading(22.3), now=0.0)
+    assert not detector.check(_reading(22.3), now=1.0)
+    assert detector.check(_reading(22.3, met=1.21), now=2.0)
+
+def test_nan_counts_as_a_change():
+    detector = ChangeDetector(heartbeat=None)
+    assert detector.check(_reading(22.3), now=0.0)
+    assert detector.check(_reading(float('nan')), now=1.0)
+    assert detector.check(_reading(float('nan')), now=2.0)
+
+def test_heartbeat_passes_an_unchanged_reading():
+    detector = ChangeDetector(heartbeat=60.0)
+    assert detector.check(_reading(22.3), now=0.0)
+    assert not detector.check(_reading(22.3), now=59.0)
+    assert detector.check(_reading(22.3), now=60.0)
+    assert detector.snapshot()['heartbeats'] == 1
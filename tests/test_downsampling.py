@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from utils.downsampling import (TieredHistory, choose_tier, decimate, lttb_indices, minmax_indices,
+                                resample)
+from utils.history import HistoryBuffer
+
+def test_lttb_keeps_the_ends_and_a_spike():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50.0)
+    y[537] = 5.0
+    indices = lttb_indices(x, y, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+    assert 537 in indices
+
+def test_short_series_and_tiny_budgets_are_left_alone():
+    x = np.arange(10)
+    assert lttb_indices(x, x, 10).tolist() == list(range(10))
+    assert lttb_indices(x, x, 2).tolist() == list(range(10))
+    assert minmax_indices(x, 1).tolist() == list(range(10))
+    assert len(lttb_indices(x[:0], x[:0], 5)) == 0
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=1000)
+    indices = minmax_indices(y, 20)
+    assert y.argmax() in indices and y.argmin() in indices
+    assert len(indices) <= 20 and (np.diff(indices) > 0).all()
+    with pytest.raises(ValueError):
+        decimate(np.arange(10), y[:10], 5, method='mean')
+
+def test_choose_tier_at_the_budget_boundary():
+    # 1000 points x 10 oversampling: raw up to 10,000 s, then minutes up to 600,000 s
+    assert choose_tier(10000, 1000) == 1
+    assert choose_tier(10001, 1000) == 60
+    assert choose_tier(600000, 1000) == 60
+    assert choose_tier(600001, 1000) == 900
+    assert choose_tier(10 ** 9, 1000) == 900
+
+def test_resample_means_per_bucket():
+    timestamps = np.array([0, 30, 59, 60, 150, 179])
+    starts, pmv, ppd = resample(timestamps, 60, [0.0, 0.3, 0.6, 1.0, 2.0, 4.0], np.arange(6.0))
+    assert starts.tolist() == [0, 60, 120]
+    assert np.allclose(pmv, [0.3, 1.0, 3.0])
+    assert np.allclose(ppd, [1.0, 3.0, 4.5])
+    empty = resample([], 60, [])
+    assert len(empty[0]) == 0 and len(empty[1]) == 0
+
+def test_tiers_match_resampling_the_raw_history():
+    rng = np.random.default_rng(1)
+    timestamps = np.cumsum(rng.integers(1, 20, 3000)) + 1_700_000_000
+    pmv = rng.uniform(-1, 1, 3000)
+    ppd = rng.uniform(5, 30, 3000)
+    buffer = HistoryBuffer(3000)
+    buffer.extend(pmv, ppd, timestamps)
+
+    tiered = TieredHistory.from_history(buffer)
+    for seconds in (60, 900):
+        starts, pmv_means, ppd_means = resample(timestamps, seconds, pmv, ppd)
+        tier_pmv, tier_ppd, tier_starts = tiered.window(seconds)
+        # The last bucket is still open and reported as it stands
+        assert tier_starts.tolist() == starts.tolist()
+        assert np.allclose(tier_pmv, pmv_means) and np.allclose(tier_ppd, ppd_means)
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.feedback_store import VOTES, FeedbackStore
+
+def _minute():
+    """Start of the current minute"""
+    now = int(time.time())
+    return now - now % 60
+
+def test_live_window_drops_old_buckets():
+    start = _minute()
+    store = FeedbackStore(path=None, window_seconds=600)
+    store.record('hall', 'Too Hot', start - 1200)
+    store.record('hall', 'Comfortable', start - 300)
+    store.record('hall', 2, start)
+    assert store.counts('hall') == {'Too Cold': 0, 'Comfortable': 1, 'Too Hot': 1}
+    # Nine minutes on, only the vote of this minute is still in the ten-minute window
+    assert store.counts('hall', now=start + 540)['Comfortable'] == 0
+    assert store.counts('hall', now=start + 540)['Too Hot'] == 1
+    assert store.counts('empty') == dict.fromkeys(VOTES, 0)
+
+def test_late_votes_land_in_their_own_bucket():
+    start = _minute()
+    store = FeedbackStore(path=None, window_seconds=600)
+    store.record('hall', 'Comfortable', start)
+    store.counts('hall')
+    store.record('hall', 'Too Cold', start - 180 + 10)
+    store.record('hall', 'Too Cold', start - 1800)
+    # Inside the window it counts live; older ones only show up per bucket
+    assert store.counts('hall')['Too Cold'] == 1
+    buckets, counts = store.bucket_counts('hall')
+    assert buckets.tolist() == [start - 1800, start - 180, start]
+    assert counts[:, VOTES.index('Too Cold')].tolist() == [1, 1, 0]
+
+def test_future_and_unknown_votes_are_rejected():
+    store = FeedbackStore(path=None)
+    store.record('hall', 'Comfortable', time.time() + 1)
+    with pytest.raises(ValueError):
+        store.record('hall', 'Comfortable', time.time() + 3600)
+    with pytest.raises(ValueError):
+        store.record('hall', 'Lukewarm')
+    with pytest.raises(ValueError):
+        store.record('hall', 3)
+    assert store.info()['recorded'] == 1
+
+def test_votes_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'feedback.db')
+    store = FeedbackStore(path, flush_interval=60)
+    for vote in ('Too Cold', 'Too Cold', 'Comfortable'):
+        store.record('hall', vote)
+    store.close()
+    assert store.info()['written'] == 3
+
+    reopened = FeedbackStore(path, flush_interval=60)
+    try:
+        assert reopened.counts('hall') == {'Too Cold': 2, 'Comfortable': 1, 'Too Hot': 0}
+    finally:
+        reopened.close()
+
+def test_concurrent_votes_are_all_counted():
+    store = FeedbackStore(path=None)
+
+    def vote(index):
+        for _ in range(500):
+            store.record(f"room{index % 2}", index % len(VOTES))
+
+    threads = [threading.Thread(target=vote, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(store.counts('room0').values()) + sum(store.counts('room1').values()) == 3000
+    assert store.counts('room0') == dict.fromkeys(VOTES, 500)
+
+def test_join_pmv_means_per_voted_bucket():
+    start = _minute()
+    store = FeedbackStore(path=None)
+    store.record('hall', 'Too Hot', start - 120 + 5)
+    store.record('hall', 'Comfortable', start - 120 + 50)
+    store.record('hall', 'Too Cold', start + 1)
+    timestamps = [start - 120 + 1, start - 120 + 30, start - 60, start + 2, start + 3]
+    pmv = [0.4, 0.8, 2.0, np.nan, -0.6]
+    joined = store.join_pmv('hall', pmv, timestamps)
+
+    assert joined['bucket'].tolist() == [start - 120, start]
+    assert joined['votes'].tolist() == [2, 1]
+    assert np.allclose(joined['mean_vote'], [0.5, -1.0])
+    # The reading of the minute without votes and the NaN reading are left out
+    assert np.allclose(joined['mean_pmv'], [0.6, -0.6])
+    assert joined['overall']['votes'] == 3
+    assert np.isclose(joined['overall']['mean_pmv'], (0.4 + 0.8 - 0.6) / 3)
@@ -0,0 +1,24 @@
+from sensors.frames import FrameDecoder, encode_frame
+
+def _frame_ending_in_sync_byte():
+    """A frame whose checksum is 0xAA, the first byte of the sync word"""
+    for seq in range(256):
+        frame = encode_frame(seq, 22.5, 45.0, 0.1, 23.0)
+        if frame[-1] == 0xAA:
+            return frame
+    raise AssertionError("no sequence number gives a 0xAA checksum")
+
+def test_checksum_equal_to_sync_byte_is_not_kept():
+    decoder = FrameDecoder()
+    assert len(decoder.feed_array(_frame_ending_in_sync_byte())) == 1
+    assert decoder.stats()['skipped_bytes'] == 0
+
+    assert len(decoder.feed_array(encode_frame(1, 22.5, 45.0, 0.1, 23.0))) == 1
+    assert decoder.stats() == {'frames': 2, 'corrupt_frames': 0, 'skipped_bytes': 0}
+
+def test_trailing_sync_byte_after_garbage_is_kept():
+    decoder = FrameDecoder()
+    frame = encode_frame(7, 22.5, 45.0, 0.1, 23.0)
+    assert len(decoder.feed_array(b'\x01\x02' + frame[:1])) == 0
+    assert len(decoder.feed_array(frame[1:])) == 1
+    assert decoder.stats()['skipped_bytes'] == 2
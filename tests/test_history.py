@@ -0,0 +1,68 @@
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from utils.history import HistoryBuffer, to_epoch
+
+def test_wraparound_matches_a_bounded_deque():
+    buffer = HistoryBuffer(5)
+    reference = deque(maxlen=5)
+    for index in range(13):
+        reading = (index * 0.1, float(index), 1000 + index)
+        evicted = buffer.append(*reading)
+        assert evicted == (reference[0] if len(reference) == 5 else None)
+        reference.append(reading)
+
+        pmv, ppd, timestamp = buffer.window()
+        assert list(zip(pmv.tolist(), ppd.tolist(), timestamp.tolist())) == list(reference)
+    assert len(buffer) == 5 and buffer.is_full
+
+def test_window_bounds_and_read_only_views():
+    buffer = HistoryBuffer(4)
+    buffer.extend([0.1, 0.2, 0.3], [5.0, 6.0, 7.0], [1, 2, 3])
+    assert buffer.window(2)[2].tolist() == [2, 3]
+    assert buffer.window(10)[2].tolist() == [1, 2, 3]
+    assert len(buffer.window(0)[0]) == 0 and len(buffer.window(-1)[0]) == 0
+    with pytest.raises(ValueError):
+        buffer.window()[0][0] = 1.0
+
+def test_capacity_of_one():
+    buffer = HistoryBuffer(1)
+    assert buffer.append(0.1, 5.0, 1) is None
+    assert buffer.append(0.2, 6.0, 2) == (0.1, 5.0, 1)
+    assert buffer.window()[0].tolist() == [0.2]
+    with pytest.raises(ValueError):
+        HistoryBuffer(0)
+
+def test_resize_keeps_the_newest_readings():
+    buffer = HistoryBuffer(6)
+    buffer.extend(np.arange(8) / 10, np.arange(8.0), np.arange(8))
+    assert buffer.resize(3).window()[2].tolist() == [5, 6, 7]
+    grown = buffer.resize(10)
+    assert grown.window()[2].tolist() == [2, 3, 4, 5, 6, 7]
+    grown.append(0.8, 8.0, 8)
+    assert len(grown) == 7
+
+def test_version_changes_on_every_write():
+    buffer = HistoryBuffer(2)
+    versions = [buffer.version]
+    for index in range(3):
+        buffer.append(0.0, 5.0, index)
+        versions.append(buffer.version)
+    buffer.clear()
+    versions.append(buffer.version)
+    assert len(set(versions)) == len(versions)
+    assert len(buffer) == 0
+
+def test_saved_lists_round_trip_and_accept_legacy_timestamps():
+    today = datetime.now().date()
+    legacy = datetime.combine(today, datetime.strptime('08:30:00', '%H:%M:%S').time())
+    buffer = HistoryBuffer.from_lists([0.1, 0.2, 0.3], [5.0, 6.0, 7.0],
+                                      [100, legacy.isoformat(), '08:30:00'], capacity=2)
+    assert buffer.window()[2].tolist() == [int(legacy.timestamp())] * 2
+
+    restored = HistoryBuffer.from_lists(**buffer.to_dict(), capacity=2)
+    assert restored.to_dict() == buffer.to_dict()
+    assert to_epoch(np.float64(12.9)) == 12
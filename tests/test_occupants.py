@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+from calculations.occupants import OccupantRoster
+from calculations.thermal_comfort import calculate_thermal_comfort_batch
+
+OFFICE = {'air_temperature': 23.0, 'mean_radiant_temp': 23.5, 'air_velocity': 0.1, 'relative_humidity': 45.0}
+LAB = {'air_temperature': 26.5, 'mean_radiant_temp': 27.0, 'air_velocity': 0.15, 'relative_humidity': 55.0}
+
+def _expected(reading, met, clo):
+    pmv, ppd = calculate_thermal_comfort_batch(reading['air_temperature'], reading['mean_radiant_temp'],
+                                               reading['air_velocity'], reading['relative_humidity'], met, clo)
+    return float(pmv), float(ppd)
+
+def test_every_occupant_is_scored_against_their_own_zone():
+    roster = OccupantRoster.simulated(['office', 'lab'], 50, seed=4)
+    result = roster.evaluate({'office': OFFICE, 'lab': LAB})
+    records = {record['id']: record for record in roster.to_records()}
+    for occupant_id, pmv, ppd in zip(result['ids'], result['pmv'], result['ppd']):
+        record = records[occupant_id]
+        expected = _expected(OFFICE if record['zone'] == 'office' else LAB, record['met'], record['clo'])
+        assert (pmv, ppd) == expected or (math.isnan(pmv) and math.isnan(expected[0]))
+
+    office = result['zones']['office']
+    office_pmv = result['pmv'][[records[i]['zone'] == 'office' for i in result['ids']]]
+    assert office['occupants'] == 50
+    assert math.isclose(office['mean_pmv'], np.nanmean(office_pmv))
+    assert office['worst_pmv'] in (np.nanmin(office_pmv), np.nanmax(office_pmv))
+    assert abs(office['worst_pmv']) == np.nanmax(np.abs(office_pmv))
+    assert result['total']['occupants'] == 100
+
+def test_zone_without_a_reading_counts_as_invalid():
+    roster = OccupantRoster.from_records([{'zone': 'office', 'met': 1.2, 'clo': 0.5},
+                                          {'zone': 'attic', 'met': 1.2, 'clo': 0.5}])
+    result = roster.evaluate({'office': OFFICE})
+    attic = result['zones']['attic']
+    assert attic['invalid'] == 1 and attic['outside'] == 0
+    assert math.isnan(attic['mean_pmv']) and math.isnan(attic['share_outside'])
+    assert result['total']['invalid'] == 1
+    assert result['total']['mean_pmv'] == result['zones']['office']['mean_pmv']
+
+def test_zones_of_different_types_stay_separate():
+    roster = OccupantRoster()
+    roster.add('a', 1, 1.2, 0.5)
+    roster.add('b', '1', 1.2, 0.5)
+    roster.add('c', 1, 1.0, 0.5)
+    result = roster.evaluate({1: OFFICE, '1': LAB})
+    assert result['zones'][1]['occupants'] == 2
+    assert result['zones']['1']['occupants'] == 1
+    assert result['zones']['1']['mean_pmv'] == _expected(LAB, 1.2, 0.5)[0]
+
+def test_edits_are_seen_by_the_next_evaluation():
+    roster = OccupantRoster()
+    assert roster.evaluate({})['total']['occupants'] == 0
+    roster.add('a', 'office', 1.2, 0.5)
+    roster.add('b', 'office', 1.2, 0.5)
+    before = roster.evaluate({'office': OFFICE})['zones']['office']['mean_pmv']
+    roster.update('a', clo=1.0)
+    roster.remove('b')
+    result = roster.evaluate({'office': OFFICE})
+    assert result['ids'] == ['a']
+    assert result['zones']['office']['mean_pmv'] == _expected(OFFICE, 1.2, 1.0)[0] > before
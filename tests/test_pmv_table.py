@@ -0,0 +1,50 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from calculations.pmv_table import TABLE_DOMAIN, PMVTable, build_pmv_table, load_pmv_table, ppd_from_pmv
+
+@pytest.fixture(scope='module')
+def table():
+    return build_pmv_table(path=None, shape=(6, 4, 5, 3, 4, 4))
+
+def test_grid_nodes_are_returned_exactly(table):
+    # Every corner of the domain, including the upper edges where the cell index is clipped
+    valid = 0
+    for index in itertools.product((0, -1), repeat=len(TABLE_DOMAIN)):
+        corner = [TABLE_DOMAIN[axis][1 if side == 0 else 2] for axis, side in enumerate(index)]
+        pmv, ppd = table.lookup(*corner)
+        expected = float(table.grid[index])
+        # Outside the ISO 7730 limits (PMV beyond +/-2, vapour pressure above 2.7 kPa)
+        if np.isnan(pmv):
+            continue
+        valid += 1
+        assert pmv == pytest.approx(expected, abs=1e-6)
+        assert ppd == pytest.approx(float(ppd_from_pmv(expected)), abs=1e-4)
+    assert valid > 0
+
+def test_interpolation_is_linear_between_nodes(table):
+    tdb = table.axes[0]
+    # Midway along air temperature only: the mean of the two neighbouring nodes
+    pmv, _ = table.lookup((tdb[2] + tdb[3]) / 2, 24.0, 0.25, 50.0, 1.2, 0.7)
+    ends, _ = table.lookup(np.array([tdb[2], tdb[3]]), 24.0, 0.25, 50.0, 1.2, 0.7)
+    assert pmv == pytest.approx(ends.mean(), abs=1e-6)
+
+def test_outside_domain_and_nan_inputs_are_invalid(table):
+    tdb = np.array([[22.0, 14.0], [31.0, np.nan]])
+    pmv, ppd = table.lookup(tdb, 24.0, 0.1, 50.0, 1.2, 0.7)
+    assert pmv.shape == ppd.shape == (2, 2)
+    assert np.isnan(pmv).tolist() == [[False, True], [True, True]]
+    assert np.isnan(ppd).tolist() == [[False, True], [True, True]]
+
+def test_saved_table_matches(table, tmp_path):
+    path = str(tmp_path / 'pmv_table.npy')
+    np.save(path, table.grid)
+    loaded = load_pmv_table(path)
+    inputs = (np.array([18.0, 24.0]), 24.0, np.array([0.1, 0.6]), 50.0, 1.2, 0.7)
+    assert np.array_equal(loaded.lookup(*inputs)[0], table.lookup(*inputs)[0])
+
+def test_grid_must_cover_every_input():
+    with pytest.raises(ValueError):
+        PMVTable(np.zeros((4, 4, 4)))
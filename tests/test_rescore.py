@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from calculations.rescore import rescore, score_chunk
+
+def _readings():
+    return pd.DataFrame({'air_temperature': [22.0, 25.0, 45.0], 'tr': [25.0, 25.0, 25.0], 'vr': [0.1, 0.1, 0.1],
+                         'rh': [50.0, 50.0, 50.0], 'met': [1.2, 1.2, 1.2], 'clo': [0.5, 0.5, 0.5]})
+
+def test_model_is_passed_to_the_iso_calculation():
+    for model in ('7730-2005', '7730-2025'):
+        scored = score_chunk(_readings(), clo=0.7, model=model)
+        assert scored['clo'].tolist() == [0.7, 0.7, 0.7]
+        assert scored['pmv'].notna().tolist() == [True, True, False]
+    with pytest.raises(ValueError):
+        score_chunk(_readings(), model='7730-1994')
+
+def test_rescore_keeps_input_order(tmp_path):
+    source, target = tmp_path / 'readings.csv', tmp_path / 'rescored.csv'
+    pd.concat([_readings()] * 5).to_csv(source, index=False)
+    summary = rescore(str(source), str(target), workers=1, chunk_size=4, model='7730-2025', progress_interval=60)
+
+    scored = pd.read_csv(target)
+    assert summary['rows'] == 15 and summary['invalid'] == 5 and summary['chunks'] == 4
+    assert scored['tdb'].tolist() == [22.0, 25.0, 45.0] * 5
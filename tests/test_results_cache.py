@@ -0,0 +1,79 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from utils.results_cache import ResultsCache
+
+def test_hits_misses_and_expiry():
+    cache = ResultsCache(ttl=60.0)
+    assert cache.get_or_compute(('a', 'stats'), lambda: 1) == 1
+    assert cache.get_or_compute(('a', 'stats'), lambda: 2) == 1
+    # A zero TTL expires on the next lookup
+    cache.put(('a', 'chart'), 'spec', ttl=0.0)
+    assert cache.get_or_compute(('a', 'chart'), lambda: 'rebuilt') == 'rebuilt'
+    info = cache.info()
+    assert (info['hits'], info['misses'], info['expirations']) == (1, 2, 1)
+
+def test_least_recently_used_entries_are_evicted_by_count_and_bytes():
+    cache = ResultsCache(max_entries=2)
+    cache.put(('a',), 1)
+    cache.put(('b',), 2)
+    cache.get_or_compute(('a',), lambda: None)
+    cache.put(('c',), 3)
+    assert cache.get_or_compute(('a',), lambda: 'gone') == 1
+    assert cache.get_or_compute(('b',), lambda: 'gone') == 'gone'
+
+    cache = ResultsCache(max_bytes=8000)
+    cache.put(('old',), np.zeros(600))
+    cache.put(('new',), np.zeros(600))
+    assert cache.info()['entries'] == 1 and cache.bytes == 4800
+    # Larger than the whole cache: returned to the caller but not kept
+    cache.put(('huge',), np.zeros(2000))
+    assert cache.info()['entries'] == 1 and cache.info()['evictions'] == 1
+
+def test_invalidation_by_prefix_and_version():
+    cache = ResultsCache()
+    for key in (('room1', 'stats'), ('room1', 'chart', 3600), ('room2', 'stats')):
+        cache.put(key, key)
+    assert cache.invalidate('room1') == 2
+    assert cache.info()['entries'] == 1
+
+    cache.mark_version('room2', 1)
+    cache.mark_version('room2', 1)
+    assert cache.info()['entries'] == 1
+    cache.mark_version('room2', 2)
+    assert cache.info()['entries'] == 0
+
+def test_concurrent_misses_compute_once():
+    cache = ResultsCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    def view():
+        barrier.wait()
+        results.append(cache.get_or_compute(('room', 'history'), compute))
+
+    results = []
+    threads = [threading.Thread(target=view) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 8 and len(calls) == 1
+
+def test_failed_computation_is_not_cached():
+    cache = ResultsCache()
+
+    def fail():
+        raise RuntimeError("store unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(('room',), fail)
+    assert cache.get_or_compute(('room',), lambda: 'ok') == 'ok'
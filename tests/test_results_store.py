@@ -0,0 +1,79 @@
+import math
+import threading
+
+import numpy as np
+
+from services.results_store import LATEST_DTYPE, ResultsStore
+from utils.session_store import SessionStore
+
+def _rows(room, timestamps, pmv):
+    rows = np.zeros(len(timestamps), dtype=LATEST_DTYPE)
+    rows['room'] = room
+    rows['timestamp'] = timestamps
+    rows['pmv'] = pmv
+    rows['ppd'] = np.where(np.isnan(pmv), np.nan, 5.0)
+    return rows
+
+def test_unscored_readings_stay_out_of_the_history(tmp_path):
+    store = ResultsStore(str(tmp_path), segment_size=4)
+    store.write_batch(_rows('sim://0', [100.0, 101.0, 102.0], np.array([0.1, 0.3, np.nan])))
+    store.flush()
+
+    pmv, ppd, timestamp = store.history('sim://0')
+    assert pmv.tolist() == [0.1, 0.3]
+    assert timestamp.tolist() == [100, 101]
+    assert math.isnan(store.latest()['sim://0']['pmv'])
+
+def test_recent_returns_the_newest_readings_across_segments(tmp_path):
+    store = ResultsStore(str(tmp_path), segment_size=4)
+    timestamps = np.arange(1000.0, 1010.0)
+    store.write_batch(_rows('sim://1', timestamps, np.linspace(-1, 1, 10)))
+    store.flush()
+
+    pmv, _, timestamp = store.recent('sim://1', 5)
+    assert timestamp.tolist() == list(range(1005, 1010))
+    assert np.allclose(pmv, np.linspace(-1, 1, 10)[5:])
+    assert store.recent('sim://1', 50)[2].tolist() == list(range(1000, 1010))
+    assert len(store.recent('sim://2', 5)[0]) == 0
+
+def test_read_last_includes_buffered_readings(tmp_path):
+    session = SessionStore('s', str(tmp_path), segment_size=3, flush_interval=None, compact_after=None)
+    for second in range(7):
+        session.append(0.0, 5.0, second)
+    # Two segments of three written, one reading still buffered
+    assert len(session.segments()) == 2
+    assert session.read_last(4)[2].tolist() == [3, 4, 5, 6]
+    assert session.read_last(1)[2].tolist() == [6]
+
+def test_readers_never_see_a_compaction_half_done(tmp_path):
+    writer = SessionStore('room', str(tmp_path), segment_size=50, flush_interval=None, compact_after=None)
+    done = threading.Event()
+    seen, errors = [], []
+
+    def read():
+        reader = SessionStore('room', str(tmp_path))
+        while not done.is_set():
+            try:
+                timestamp = reader.read_range()[2]
+            except Exception as e:
+                errors.append(e)
+                continue
+            seen.append(len(timestamp))
+            # Every flushed reading exactly once, in order
+            if not (np.diff(timestamp) == 1).all():
+                errors.append(timestamp)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        for second in range(2000):
+            writer.append(0.0, 5.0, second)
+            if second % 7 == 0:
+                writer.flush()
+            if second % 100 == 99:
+                writer.compact()
+    finally:
+        done.set()
+        thread.join()
+    assert not errors
+    assert seen and seen == sorted(seen)
@@ -0,0 +1,41 @@
+import math
+
+import numpy as np
+
+from utils.history import HistoryBuffer
+from utils.rolling_stats import RollingStats
+
+def test_nan_readings_are_counted_separately():
+    pmv = [0.2, float('nan'), -0.4, 0.9]
+    ppd = [5.8, float('nan'), 8.3, 22.1]
+    stats = RollingStats.from_arrays(pmv, ppd)
+
+    summary = stats.pmv.summary()
+    assert summary['count'] == 3
+    assert summary['invalid'] == 1
+    assert summary['min'] == -0.4
+    assert summary['max'] == 0.9
+    assert math.isclose(summary['mean'], 0.7 / 3)
+    assert stats.ppd.summary()['p50'] == 8.3
+    assert len(stats) == 3
+    assert stats.comfort_counts(-0.5, 0.5, 10.0, pmv, ppd) == {'Comfort': 2, 'Discomfort': 1}
+
+def test_nan_readings_leave_the_window_like_any_other():
+    rng = np.random.default_rng(3)
+    pmv = rng.uniform(-2, 2, 200)
+    pmv[rng.random(200) < 0.2] = np.nan
+    ppd = np.where(np.isnan(pmv), np.nan, 50.0)
+
+    buffer = HistoryBuffer(16)
+    stats = RollingStats(16)
+    for index, (value, other) in enumerate(zip(pmv, ppd)):
+        stats.update(value, other, buffer.append(value, other, float(index)))
+        window = buffer.window()[0]
+        valid = window[~np.isnan(window)]
+        assert stats.pmv.count == len(valid)
+        assert stats.pmv.invalid == len(window) - len(valid)
+        if len(valid):
+            assert stats.pmv.min == valid.min()
+            assert stats.pmv.max == valid.max()
+        else:
+            assert math.isnan(stats.pmv.min) and math.isnan(stats.pmv.max)
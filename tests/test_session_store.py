@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+from utils.session_store import SessionStore, list_sessions
+
+def _store(tmp_path, **kwargs):
+    kwargs = {'segment_size': 4, 'flush_interval': None, 'compact_after': None, **kwargs}
+    return SessionStore('session', str(tmp_path), **kwargs)
+
+def test_time_window_reads_only_overlapping_readings(tmp_path):
+    store = _store(tmp_path)
+    for second in range(10):
+        store.append(second / 10, float(second), 1000 + second)
+    # Two full segments written, two readings still buffered
+    assert len(store.segments()) == 2
+    assert store.time_bounds() == (1000, 1009)
+
+    pmv, ppd, timestamp = store.read_range(1003, 1008)
+    assert timestamp.tolist() == list(range(1003, 1009))
+    assert ppd.tolist() == [3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+    assert len(store.read_range(2000)[0]) == 0
+
+    # Another process only sees what was flushed
+    reader = SessionStore('session', str(tmp_path))
+    assert reader.read_range()[2].tolist() == list(range(1000, 1008))
+
+def test_compact_merges_small_segments_without_changing_the_readings(tmp_path):
+    store = _store(tmp_path)
+    for second in range(9):
+        store.append(0.1, 5.0, 1000 + second)
+        store.flush()
+    assert len(store.segments()) == 9
+    before = store.read_range()
+
+    store.compact()
+    # Two merged segments of four, the last reading stays on its own
+    assert [last - first + 1 for first, last, _ in store.segments()] == [4, 4, 1]
+    assert all(np.array_equal(a, b) for a, b in zip(before, store.read_range()))
+    assert sorted(path.name for path in (tmp_path / 'session').glob('seg-*.npy')) == \
+        sorted(os.path.basename(path) for _, _, path in store.segments())
+
+def test_duplicate_timestamps_get_their_own_segment(tmp_path):
+    store = _store(tmp_path, segment_size=2)
+    for pmv in (0.1, 0.2, 0.3, 0.4):
+        store.append(pmv, 5.0, 1000)
+    assert len(store.segments()) == 2
+    assert store.read_range()[0].tolist() == [0.1, 0.2, 0.3, 0.4]
+
+def test_meta_and_session_listing(tmp_path):
+    store = _store(tmp_path)
+    assert store.read_meta() == {}
+    store.write_meta({'notes': 'north side'})
+    assert SessionStore('session', str(tmp_path)).read_meta() == {'notes': 'north side'}
+    assert list_sessions(str(tmp_path)) == ['session']
+    assert list_sessions(str(tmp_path / 'missing')) == []
@@ -0,0 +1,42 @@
+import itertools
+import threading
+
+import numpy as np
+
+from sensors.simulator import SimulatedSensorFleet
+
+def test_large_step_samples_the_stationary_spread():
+    fleet = SimulatedSensorFleet(2000, seed=1)
+    fleet.step(1e6)
+    # Humidity reverts at 0.005/s with noise 0.2: stationary std 0.2 / sqrt(2 * 0.005) = 2
+    offset = fleet.humidity - fleet.setpoint_humidity
+    assert 1.8 < offset.std() < 2.2
+    assert ((fleet.humidity > 10.0) & (fleet.humidity < 90.0)).all()
+
+def test_one_large_step_matches_many_small_ones():
+    coarse = SimulatedSensorFleet(2000, seed=2)
+    fine = SimulatedSensorFleet(2000, seed=2)
+    coarse.step(600.0)
+    for _ in range(600):
+        fine.step(1.0)
+    # Same setpoints; the spread around them only depends on the elapsed time
+    for fleet in (coarse, fine):
+        assert abs((fleet.humidity - fleet.setpoint_humidity).std() - 2.0 * np.sqrt(1 - np.exp(-6.0))) < 0.15
+
+def test_advance_to_counts_each_interval_once():
+    fleet = SimulatedSensorFleet(10, seed=3)
+    fleet.advance_to(100.0)
+    fleet.advance_to(50.0)
+    assert fleet.elapsed == 0.0 and fleet.last_update == 100.0
+    fleet.advance_to(110.0)
+    assert fleet.elapsed == 10.0
+
+    fleet = SimulatedSensorFleet(10, seed=3)
+    clock = itertools.count()
+    threads = [threading.Thread(target=lambda: [fleet.advance_to(float(next(clock))) for _ in range(500)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fleet.elapsed == fleet.last_update == 8 * 500 - 1
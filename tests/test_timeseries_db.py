@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from services.results_store import LATEST_DTYPE
+from utils.timeseries_db import TimeSeriesDB
+
+# A minute boundary, so buckets are easy to read
+T0 = 1_700_000_040
+
+def _rows(room, timestamps, pmv):
+    rows = np.zeros(len(timestamps), dtype=LATEST_DTYPE)
+    rows['room'] = room
+    rows['timestamp'] = timestamps
+    rows['tdb'] = 22.0
+    rows['pmv'] = pmv
+    rows['ppd'] = 5.0
+    return rows
+
+@pytest.fixture
+def database(tmp_path):
+    database = TimeSeriesDB(str(tmp_path / 'timeseries.db'))
+    yield database
+    database.close()
+
+def test_readings_faster_than_one_hertz_are_all_kept(database):
+    timestamps = T0 + np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+    assert database.insert(_rows('sim://0', timestamps, np.linspace(0, 0.4, 5))) == 5
+    pmv, _, stored = database.query('sim://0')
+    assert np.allclose(stored, timestamps, atol=1e-3)
+    assert np.allclose(pmv, np.linspace(0, 0.4, 5))
+    # Unbounded queries and bounds between readings
+    assert len(database.query('sim://0', start=T0 + 0.3, end=T0 + 0.75)[0]) == 2
+    assert len(database.query('sim://0', start=-1e30, end=1e30)[0]) == 5
+
+def test_nan_results_are_stored_as_null_and_skipped_by_the_means(database):
+    database.insert(_rows('sim://0', T0 + np.arange(4.0), np.array([0.2, np.nan, 0.4, np.nan])))
+    pmv, _, _ = database.query('sim://0')
+    assert np.isnan(pmv).tolist() == [False, True, False, True]
+    minute_pmv, _, buckets = database.query('sim://0', tier=60)
+    assert buckets.tolist() == [T0] and np.allclose(minute_pmv, [0.3])
+
+def test_minute_tier_joins_rollups_and_the_raw_tail(database):
+    timestamps = T0 + np.arange(0.0, 180.0, 0.5)
+    database.insert(_rows('sim://0', timestamps, (timestamps - T0) // 60))
+    # Roll up the first two minutes only (the third is inside the grace period)
+    database.rollup(now=T0 + 150)
+    assert database.stats()['rollups'][60] == 2
+
+    pmv, _, buckets = database.query('sim://0', tier=60)
+    assert buckets.tolist() == [T0, T0 + 60, T0 + 120]
+    assert np.allclose(pmv, [0.0, 1.0, 2.0])
+    # Windows that start or end on a bucket boundary
+    assert database.query('sim://0', start=T0 + 60, end=T0 + 120, tier=60)[2].tolist() == [T0 + 60, T0 + 120]
+
+def test_retention_keeps_readings_that_are_not_rolled_up(database):
+    database.retention = {1: 60, 60: 120, 900: None}
+    database.insert(_rows('sim://0', T0 + np.arange(0.0, 600.0, 10.0), 0.1))
+    # Nothing rolled up yet: raw readings stay, however old
+    assert database.apply_retention(now=T0 + 10_000) == {60: 0}
+    database.rollup(now=T0 + 300)
+    deleted = database.apply_retention(now=T0 + 330)
+    # Raw readings go up to the lowest watermark (the 15 min tier's, T0 + 60); minutes older
+    # than 120 s go, so the minute tier resumes from the raw readings at its watermark
+    assert deleted == {1: 6, 60: 4}
+    assert database.query('sim://0')[2].min() == T0 + 60
+    assert database.query('sim://0', tier=60)[2].tolist() == [T0 + 240, T0 + 300, T0 + 360, T0 + 420,
+                                                              T0 + 480, T0 + 540]
@@ -0,0 +1,126 @@
+import numpy as np
+
+from utils.history import HistoryBuffer
+
+# Raw readings plus pre-aggregated 1 min and 15 min tiers
+TIER_SECONDS = (1, 60, 900)
+DEFAULT_TIER_CAPACITY = 7 * 24 * 60  # one week of minutes
+DEFAULT_CHART_POINTS = 1000
+# A tier is used while it has at most this many times the chart points; LTTB removes the rest
+TIER_OVERSAMPLING = 10
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the
+    visual shape of the series (first and last point always kept).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[selected], y[selected]
+        area = np.abs((ax - mean_x[bucket]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[bucket] - ay))
+        selected = lo + int(np.argmax(area))
+        indices[bucket + 1] = selected
+    return indices
+
+def minmax_indices(y, n_out):
+    """Indices of the minimum and maximum of n_out // 2 equal buckets, in order"""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    picked = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        bucket = y[lo:hi]
+        picked.extend((lo + int(np.argmin(bucket)), lo + int(np.argmax(bucket))))
+    return np.unique(picked)
+
+def decimate(timestamps, values, max_points, method='lttb'):
+    """(timestamps, values) reduced to at most max_points for plotting"""
+    if method == 'lttb':
+        indices = lttb_indices(timestamps, values, max_points)
+    elif method == 'minmax':
+        indices = minmax_indices(values, max_points)
+    else:
+        raise ValueError(f"Unknown decimation method: {method}")
+    return np.asarray(timestamps)[indices], np.asarray(values)[indices]
+
+def choose_tier(span_seconds, max_points, tiers=TIER_SECONDS):
+    """Finest tier (bucket seconds) that covers span_seconds without exceeding the point budget"""
+    for seconds in tiers:
+        if span_seconds / seconds <= max_points * TIER_OVERSAMPLING:
+            return seconds
+    return tiers[-1]
+
+def resample(timestamps, bucket_seconds, *columns):
+    """
+    Mean of each column per bucket_seconds bucket of (sorted) epoch timestamps.
+    Returns (bucket_start, *column_means).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) == 0:
+        return (timestamps,) + tuple(np.asarray(column, dtype=np.float64) for column in columns)
+    buckets = timestamps - timestamps % bucket_seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, len(buckets)])
+    means = tuple(np.add.reduceat(np.asarray(column, dtype=np.float64), starts) / counts for column in columns)
+    return (buckets[starts],) + means
+
+class TieredHistory:
+    """
+    Pre-aggregated PMV/PPD history alongside the raw HistoryBuffer
+    Every tier keeps bucket means in its own ring buffer, updated in O(1) per
+    reading, so a day or a week can be charted without touching raw samples.
+    """
+
+    def __init__(self, tiers=TIER_SECONDS[1:], capacity=DEFAULT_TIER_CAPACITY):
+        self.buffers = {seconds: HistoryBuffer(capacity) for seconds in tiers}
+        self._open = {seconds: None for seconds in tiers}  # [bucket, pmv_sum, ppd_sum, count]
+
+    def append(self, pmv, ppd, timestamp):
+        timestamp = int(timestamp)
+        for seconds, buffer in self.buffers.items():
+            bucket = timestamp - timestamp % seconds
+            current = self._open[seconds]
+            if current is not None and current[0] != bucket:
+                buffer.append(current[1] / current[3], current[2] / current[3], current[0])
+                current = None
+            if current is None:
+                current = self._open[seconds] = [bucket, 0.0, 0.0, 0]
+            current[1] += pmv
+            current[2] += ppd
+            current[3] += 1
+
+    def window(self, seconds):
+        """(pmv, ppd, bucket_start) of a tier, including the bucket still being filled"""
+        pmv, ppd, timestamps = self.buffers[seconds].window()
+        current = self._open[seconds]
+        if current is None:
+            return pmv, ppd, timestamps
+        return (np.append(pmv, current[1] / current[3]),
+                np.append(ppd, current[2] / current[3]),
+                np.append(timestamps, current[0]))
+
+    @classmethod
+    def from_history(cls, buffer, **kwargs):
+        tiered = cls(**kwargs)
+        for values in zip(*(column.tolist() for column in buffer.window())):
+            tiered.append(*values)
+        return tiered
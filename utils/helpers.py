@@ -1,12 +1,18 @@
 import socket
 import json
+import threading
+import time
 from datetime import datetime
-import qrcode
-from PIL import Image
-import io
+from functools import lru_cache
+from utils.session_store import DEFAULT_SESSION_ROOT, SessionStore
 
-def get_local_ip():
-    """Get local IP address for QR code"""
+# How long a discovered address is reused before checking whether the network changed
+LOCAL_IP_TTL = 60.0
+_local_ip = {'address': None, 'checked_at': 0.0}
+_local_ip_lock = threading.Lock()
+
+def discover_local_ip():
+    """Ask the OS which local address routes outside (no packet is sent)"""
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
@@ -16,8 +22,24 @@ def get_local_ip():
     except Exception:
         return "localhost"
 
+def get_local_ip(max_age=LOCAL_IP_TTL):
+    """Get local IP address for QR code, rediscovered at most every max_age seconds per process"""
+    with _local_ip_lock:
+        now = time.monotonic()
+        if _local_ip['address'] is None or now - _local_ip['checked_at'] >= max_age:
+            _local_ip['address'] = discover_local_ip()
+            _local_ip['checked_at'] = now
+        return _local_ip['address']
+
+@lru_cache(maxsize=8)
 def generate_qr_code(url):
-    """Generate QR code for the given URL"""
+    """
+    QR code for the given URL as PNG bytes
+    Cached per URL, so it is only rebuilt when the network address changes.
+    """
+    import io
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -27,14 +49,31 @@ def generate_qr_code(url):
     qr.add_data(url)
     qr.make(fit=True)
     img = qr.make_image(fill_color="black", back_color="white")
-    return img
+    png = io.BytesIO()
+    img.save(png, format='PNG')
+    return png.getvalue()
+
+def save_session_data(session_store, session_data):
+    """Flush buffered readings to the session store and save session settings"""
+    session_store.flush()
+    session_store.write_meta(session_data)
+    return session_store.session_id
 
-def save_session_data(session_data):
-    """Save session data to JSON"""
-    return json.dumps(session_data)
+def load_stored_session(session_id, window_seconds=None, root=DEFAULT_SESSION_ROOT):
+    """
+    Load settings and the readings of a stored session
+    window_seconds limits the readings to that span before the session's last reading
+    Returns (settings, (pmv, ppd, timestamps))
+    """
+    session_store = SessionStore(session_id, root)
+    start = None
+    bounds = session_store.time_bounds()
+    if window_seconds is not None and bounds is not None:
+        start = bounds[1] - window_seconds
+    return session_store.read_meta(), session_store.read_range(start)
 
 def load_session_data(uploaded_file):
-    """Load session data from JSON"""
+    """Load session data from JSON (sessions exported before the session store)"""
     if uploaded_file is not None:
         return json.load(uploaded_file)
     return None
@@ -0,0 +1,122 @@
+import time
+import numpy as np
+from datetime import datetime
+
+DEFAULT_HISTORY_CAPACITY = 3600
+
+class HistoryBuffer:
+    """
+    Fixed-capacity ring buffer of PMV/PPD readings.
+    Columns: pmv (float64), ppd (float64), timestamp (int64 epoch seconds).
+
+    Every column is stored twice back to back, so the most recent n samples
+    are always one contiguous slice and window() never copies.
+    """
+
+    def __init__(self, capacity=DEFAULT_HISTORY_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = int(capacity)
+        self._pmv = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._ppd = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._timestamp = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+        # Bumped on every change, so derived data (charts) can be reused while it stays put
+        self.version = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def is_full(self):
+        return self._size == self.capacity
+
+    def append(self, pmv, ppd, timestamp=None):
+        """
+        Add one reading in O(1), overwriting the oldest when full.
+        Returns the overwritten (pmv, ppd, timestamp), or None.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        head = self._head
+        mirror = head + self.capacity
+        timestamp = int(timestamp)
+        evicted = None
+        if self._size == self.capacity:
+            evicted = (float(self._pmv[head]), float(self._ppd[head]), int(self._timestamp[head]))
+        self._pmv[head] = self._pmv[mirror] = pmv
+        self._ppd[head] = self._ppd[mirror] = ppd
+        self._timestamp[head] = self._timestamp[mirror] = timestamp
+        self._head = (head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.version += 1
+        return evicted
+
+    def extend(self, pmv, ppd, timestamps):
+        """Append many readings, oldest first"""
+        for values in zip(pmv, ppd, timestamps):
+            self.append(*values)
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+        self.version += 1
+
+    def window(self, n=None):
+        """
+        Read-only views (pmv, ppd, timestamp) of the most recent n readings,
+        oldest first. Views share memory with the buffer, so copy them if they
+        must outlive later appends.
+        """
+        n = self._size if n is None else max(0, min(int(n), self._size))
+        end = self._head + self.capacity
+        views = []
+        for column in (self._pmv, self._ppd, self._timestamp):
+            view = column[end - n:end]
+            view.flags.writeable = False
+            views.append(view)
+        return tuple(views)
+
+    def resize(self, capacity):
+        """Return a buffer with the new capacity holding the most recent readings"""
+        resized = HistoryBuffer(capacity)
+        resized.extend(*self.window(capacity))
+        return resized
+
+    def to_dict(self):
+        """JSON-serializable columns"""
+        pmv, ppd, timestamps = self.window()
+        return {
+            'pmv_history': pmv.tolist(),
+            'ppd_history': ppd.tolist(),
+            'timestamp_history': timestamps.tolist()
+        }
+
+    @classmethod
+    def from_lists(cls, pmv_history, ppd_history, timestamp_history, capacity=DEFAULT_HISTORY_CAPACITY):
+        """Build a buffer from saved session lists, accepting legacy HH:MM:SS timestamps"""
+        buffer = cls(capacity)
+        count = min(len(pmv_history), len(ppd_history), len(timestamp_history))
+        start = max(0, count - buffer.capacity)
+        buffer.extend(
+            pmv_history[start:count],
+            ppd_history[start:count],
+            [to_epoch(value) for value in timestamp_history[start:count]]
+        )
+        return buffer
+
+def to_epoch(value):
+    """Convert an epoch number, ISO string or legacy HH:MM:SS string (today) to epoch seconds"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        clock = datetime.strptime(value, '%H:%M:%S').time()
+        return int(datetime.combine(datetime.now().date(), clock).timestamp())
+
+def epoch_to_datetime(timestamps):
+    """Epoch seconds to naive local datetime64 values for charting"""
+    offset = datetime.now().astimezone().utcoffset()
+    return (np.asarray(timestamps, dtype=np.int64) + int(offset.total_seconds())).astype('datetime64[s]')
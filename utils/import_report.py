@@ -0,0 +1,109 @@
+"""
+Import-time report for cold-start tuning
+
+Run from the repository root:
+    python -m utils.import_report                  # what app.py imports at startup
+    python -m utils.import_report pandas altair    # any modules
+Modules are imported in a fresh interpreter with -X importtime; the report
+breaks the cost down per top-level package, heaviest first.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+# Loaded on first use instead (charts, QR code, PMV calculation)
+LAZY_IMPORTS = ('pandas', 'altair', 'qrcode', 'pythermalcomfort.models')
+
+def startup_imports(path=APP_PATH):
+    """
+    Modules a script imports when it runs, in order: its import statements
+    outside function bodies (those run on first call, like the lazy imports)
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+
+    modules = []
+
+    def visit(node):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            return
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+        for child in ast.iter_child_nodes(node):
+            visit(child)
+
+    visit(tree)
+    return list(dict.fromkeys(modules))
+
+def measure_imports(modules):
+    """[(module, self_us, cumulative_us)] for everything importing modules loads, in load order"""
+    statement = "; ".join(f"import {module}" for module in modules)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                               cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # column header
+        entries.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return entries
+
+def summarize(entries):
+    """Self time per top-level package in seconds, heaviest first"""
+    packages = defaultdict(float)
+    for module, self_us, _ in entries:
+        packages[module.split('.')[0]] += self_us / 1e6
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+def report(modules):
+    entries = measure_imports(modules)
+    cumulative = {module: cumulative_us / 1e6 for module, _, cumulative_us in entries}
+    return {
+        'modules': list(modules),
+        'total_s': sum(self_us for _, self_us, _ in entries) / 1e6,
+        'module_count': len(entries),
+        'packages': summarize(entries),
+        'requested': {module: cumulative.get(module) for module in modules}
+    }
+
+def print_report(title, result, top):
+    print(f"{title}: {result['total_s']:.3f} s, {result['module_count']} modules")
+    for package, seconds in result['packages'][:top]:
+        print(f"  {package:<28} {seconds * 1e3:9.1f} ms")
+    print()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Break down import cost per package")
+    parser.add_argument('modules', nargs='*', help="Modules to import (default: app.py startup imports)")
+    parser.add_argument('--top', type=int, default=15, help="Packages to list")
+    parser.add_argument('--json', dest='json_path', help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.modules:
+        results = {'requested': report(args.modules)}
+        print_report("Imports", results['requested'], args.top)
+    else:
+        results = {'startup': report(startup_imports()), 'lazy': report(LAZY_IMPORTS)}
+        print_report("app.py startup imports", results['startup'], args.top)
+        print_report("Deferred until first use", results['lazy'], args.top)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
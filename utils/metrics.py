@@ -0,0 +1,310 @@
+"""
+Hot-path latency metrics in Prometheus text format
+
+Stages are timed with `timer('stage')` or `@timed('stage')` into per-stage
+histograms; counters and collectors (callables returning current values, e.g.
+cache hits and hit rates) are exported alongside. Serve them from the process with
+    start_metrics_server(9464)
+and scrape http://127.0.0.1:9464/metrics. /profile?enable=1 starts a cProfile
+capture of every profiled section (dashboard reruns, daemon batches),
+/profile shows the heaviest functions so far and /profile?enable=0 stops it.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+METRIC_PREFIX = 'thermal_comfort'
+# Histogram bucket upper bounds in seconds, 50 µs to 10 s
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_METRICS_PORT = 9464
+# Port the dashboard serves metrics on when set (e.g. THERMAL_METRICS_PORT=9464)
+METRICS_PORT_ENV = 'THERMAL_METRICS_PORT'
+# Start with profile capture enabled when set to 1
+PROFILE_ENV = 'THERMAL_METRICS_PROFILE'
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Cumulative-bucket latency histogram of one stage"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+class SectionProfiler:
+    """
+    cProfile capture that can be switched on at runtime
+    cProfile only sees the thread that enables it, so every profiled section
+    (one rerun, one batch) runs under its own profiler and the statistics are
+    merged. Sections nested in a profiled section of the same thread are part
+    of the outer capture.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.sections = 0
+        self._stats = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, enabled=True):
+        """Start or stop capturing; stopping discards what was captured"""
+        with self._lock:
+            self.enabled = enabled
+            if not enabled:
+                self._stats = None
+                self.sections = 0
+
+    def start(self, outermost=False):
+        """
+        Begin a section in this thread; returns a token for stop()
+        outermost: The caller is never nested (e.g. a whole script rerun), so a section
+                   still open in this thread was interrupted and is dropped
+        """
+        active = getattr(self._local, 'active', None)
+        if active is not None and outermost:
+            active.disable()
+            active = self._local.active = None
+        if not self.enabled or active is not None:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, an outside cProfile run) owns this thread
+            return None
+        self._local.active = profile
+        return profile
+
+    def stop(self, profile):
+        if profile is None:
+            return
+        profile.disable()
+        self._local.active = None
+        with self._lock:
+            if not self.enabled:
+                return
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.sections += 1
+
+    @contextmanager
+    def section(self):
+        profile = self.start()
+        try:
+            yield
+        finally:
+            self.stop(profile)
+
+    def report(self, sort='cumulative', limit=40):
+        """pstats listing of the heaviest functions captured so far"""
+        with self._lock:
+            if self._stats is None:
+                state = 'enabled' if self.enabled else 'disabled (GET /profile?enable=1 to start)'
+                return f"Profile capture {state}, nothing captured yet\n"
+            stream = io.StringIO()
+            self._stats.stream = stream
+            stream.write(f"{self.sections} profiled sections\n")
+            self._stats.sort_stats(sort).print_stats(limit)
+            return stream.getvalue()
+
+class MetricsRegistry:
+    def __init__(self, prefix=METRIC_PREFIX, buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.profiler = SectionProfiler(os.environ.get(PROFILE_ENV) == '1')
+        self._histograms = {}  # stage -> Histogram
+        self._counters = {}  # (name, sorted labels) -> value
+        self._collectors = {}  # name -> (callable returning {key: number}, keys that are counters)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """Record one duration of stage"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, stage, profile=False, outermost=False):
+        """
+        Time the block as stage; profile=True also makes it a profiled section
+        (outermost: see SectionProfiler.start)
+        """
+        profiler = self.profiler.start(outermost) if profile else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+            self.profiler.stop(profiler)
+
+    def timed(self, stage, profile=False, outermost=False):
+        """Decorator form of timer()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage, profile, outermost):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def register_collector(self, name, collect, counters=()):
+        """
+        Export collect()'s numeric values at every scrape: keys in counters (values that
+        only grow, e.g. cache hits) as name_<key>_total counters, the others as name_<key> gauges
+        """
+        with self._lock:
+            self._collectors[name] = (collect, frozenset(counters))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Per-stage count/mean/max and counters as plain dicts"""
+        with self._lock:
+            return {
+                'stages': {
+                    stage: {
+                        'count': histogram.count,
+                        'mean_s': histogram.sum / histogram.count if histogram.count else 0.0,
+                        'max_s': histogram.max
+                    }
+                    for stage, histogram in self._histograms.items()
+                },
+                'counters': {
+                    name + _format_labels(labels): value for (name, labels), value in self._counters.items()
+                }
+            }
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {stage: (histogram.cumulative(), histogram.sum, histogram.count)
+                          for stage, histogram in self._histograms.items()}
+            counters = dict(self._counters)
+            collectors = dict(self._collectors)
+
+        lines = []
+        name = f"{self.prefix}_stage_seconds"
+        lines.append(f"# HELP {name} Duration of instrumented stages")
+        lines.append(f"# TYPE {name} histogram")
+        for stage in sorted(histograms):
+            buckets, total, count = histograms[stage]
+            for bound, cumulative in buckets:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        for counter in sorted({counter for counter, _ in counters}):
+            lines.append(f"# TYPE {self.prefix}_{counter}_total counter")
+            for (other, labels), value in sorted(counters.items()):
+                if other == counter:
+                    lines.append(f"{self.prefix}_{counter}_total{_format_labels(labels)} {_format_value(value)}")
+
+        for collector, (collect, counter_keys) in sorted(collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                # A broken collector must not take the whole scrape down
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if key in counter_keys:
+                        lines.append(f"# TYPE {self.prefix}_{collector}_{key}_total counter")
+                        lines.append(f"{self.prefix}_{collector}_{key}_total {_format_value(value)}")
+                    else:
+                        lines.append(f"# TYPE {self.prefix}_{collector}_{key} gauge")
+                        lines.append(f"{self.prefix}_{collector}_{key} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+observe = REGISTRY.observe
+increment = REGISTRY.increment
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+register_collector = REGISTRY.register_collector
+
+def _handle_get(handler, registry):
+    from urllib.parse import parse_qs, urlparse
+
+    url = urlparse(handler.path)
+    if url.path == '/metrics':
+        body = registry.render()
+        content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    elif url.path == '/profile':
+        enable = parse_qs(url.query).get('enable')
+        if enable:
+            registry.profiler.enable(enable[-1].lower() in ('1', 'true', 'on'))
+        body = registry.profiler.report()
+        content_type = 'text/plain; charset=utf-8'
+    else:
+        handler.send_error(404)
+        return
+    data = body.encode('utf-8')
+    handler.send_response(200)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Content-Length', str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+def start_metrics_server(port=DEFAULT_METRICS_PORT, host='127.0.0.1', registry=REGISTRY):
+    """Serve /metrics and /profile from a background thread; returns the server (call shutdown() to stop)"""
+    # http.server pulls in the email package; only processes that serve metrics pay for it
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            _handle_get(self, registry)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood stderr
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,147 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_TTL = 300.0
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_CACHE_ENTRIES = 1024
+
+def estimate_size(value):
+    """Approximate memory held by a cached value in bytes"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    # pandas objects, checked by duck typing so pandas is not imported here
+    if callable(getattr(value, 'memory_usage', None)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    # Altair charts keep their data on .data
+    data = getattr(value, 'data', None)
+    if callable(getattr(data, 'memory_usage', None)):
+        return sys.getsizeof(value) + estimate_size(data)
+    return sys.getsizeof(value)
+
+class ResultsCache:
+    """
+    Process-wide cache for computed series, statistics and chart specs.
+
+    Keys are tuples whose first element names the data they derive from (e.g.
+    a room), so everything computed from that data can be invalidated at once.
+    Entries expire after ttl seconds; the least recently used are evicted once
+    the cache holds more than max_entries or max_bytes. Concurrent requests for
+    a missing key wait for a single computation instead of repeating it.
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, max_bytes=DEFAULT_CACHE_BYTES, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._versions = {}
+        self._computing = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _lookup(self, key, now):
+        """Cached value or None; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= now:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return the cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            entry = self._lookup(key, time.monotonic())
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            key_lock = self._computing.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another viewer may have computed it while we waited
+            with self._lock:
+                entry = self._lookup(key, time.monotonic())
+                if entry is not None:
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+            try:
+                value = compute()
+                self.put(key, value, ttl)
+            finally:
+                with self._lock:
+                    if self._computing.get(key) is key_lock:
+                        del self._computing[key]
+        return value
+
+    def put(self, key, value, ttl=None):
+        size = estimate_size(value)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires_at)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *prefix):
+        """Drop every entry whose key starts with prefix (everything when empty)"""
+        with self._lock:
+            stale = [key for key in self._entries if key[:len(prefix)] == prefix]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def mark_version(self, namespace, version):
+        """Record the data version behind namespace; entries under it are dropped when it changes"""
+        with self._lock:
+            previous = self._versions.get(namespace)
+            self._versions[namespace] = version
+        if previous is not None and previous != version:
+            self.invalidate(namespace)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.bytes = 0
+
+    def info(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,166 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# Histogram sketch ranges (low, high, bin width); percentiles are exact to one bin
+PMV_SKETCH = (-3.0, 3.0, 0.01)
+PPD_SKETCH = (0.0, 100.0, 0.1)
+DEFAULT_PERCENTILES = (50, 95)
+
+def comfort_mask(pmv, ppd, pmv_min, pmv_max, ppd_max):
+    """True for readings inside the comfort thresholds"""
+    pmv = np.asarray(pmv)
+    ppd = np.asarray(ppd)
+    return (pmv >= pmv_min) & (pmv <= pmv_max) & (ppd <= ppd_max)
+
+def count_comfortable(pmv, ppd, pmv_min, pmv_max, ppd_max):
+    """Number of readings inside the comfort thresholds"""
+    return int(np.count_nonzero(comfort_mask(pmv, ppd, pmv_min, pmv_max, ppd_max)))
+
+class RollingColumn:
+    """
+    Statistics of the most recent `capacity` values of one column in O(1) per update.
+    Min/max come from monotonic deques, mean/variance from running sums and
+    percentiles from a fixed-bin histogram. NaN values (invalid readings) hold
+    their place in the window but are only counted, in `invalid`.
+    """
+
+    def __init__(self, capacity, sketch):
+        self.capacity = capacity
+        self.low, self.high, self.width = sketch
+        self.bins = np.zeros(int(round((self.high - self.low) / self.width)) + 1, dtype=np.int64)
+        self._min = deque()  # (index, value), values increasing
+        self._max = deque()  # (index, value), values decreasing
+        self._index = 0
+        self.count = 0
+        self.invalid = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _bin(self, value):
+        return min(max(int((value - self.low) / self.width + 0.5), 0), len(self.bins) - 1)
+
+    def update(self, value, evicted=None):
+        """Add value; evicted is the value that left the window, if any"""
+        value = float(value)
+        if evicted is not None:
+            evicted = float(evicted)
+            if math.isnan(evicted):
+                self.invalid -= 1
+            else:
+                self.count -= 1
+                self.total -= evicted
+                self.total_sq -= evicted * evicted
+                self.bins[self._bin(evicted)] -= 1
+        valid = not math.isnan(value)
+        if valid:
+            self.count += 1
+            self.total += value
+            self.total_sq += value * value
+            self.bins[self._bin(value)] += 1
+        else:
+            self.invalid += 1
+
+        oldest = self._index - self.count - self.invalid
+        for extremes, keep in ((self._min, value.__gt__), (self._max, value.__lt__)):
+            while extremes and extremes[0][0] <= oldest:
+                extremes.popleft()
+            if valid:
+                while extremes and not keep(extremes[-1][1]):
+                    extremes.pop()
+                extremes.append((self._index, value))
+        self._index += 1
+
+    @property
+    def min(self):
+        return self._min[0][1] if self.count else float('nan')
+
+    @property
+    def max(self):
+        return self._max[0][1] if self.count else float('nan')
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def variance(self):
+        if not self.count:
+            return float('nan')
+        mean = self.total / self.count
+        # Running sums drift slightly negative for constant series
+        return max(self.total_sq / self.count - mean * mean, 0.0)
+
+    def percentile(self, q):
+        """Approximate q-th percentile (bin centre)"""
+        if not self.count:
+            return float('nan')
+        rank = max(1, int(np.ceil(q / 100.0 * self.count)))
+        return self.low + int(np.searchsorted(np.cumsum(self.bins), rank)) * self.width
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        result = {
+            'count': self.count,
+            'invalid': self.invalid,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'std': float(np.sqrt(self.variance))
+        }
+        for q in percentiles:
+            result[f'p{q}'] = self.percentile(q)
+        return result
+
+class RollingStats:
+    """
+    Incremental PMV/PPD statistics over a HistoryBuffer window
+    Feed every appended reading together with the reading HistoryBuffer.append
+    evicted; comfort counts follow the current thresholds and are recounted
+    only when the thresholds change.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.pmv = RollingColumn(capacity, PMV_SKETCH)
+        self.ppd = RollingColumn(capacity, PPD_SKETCH)
+        self.thresholds = None
+        self.comfortable = 0
+
+    def __len__(self):
+        return self.pmv.count
+
+    def _is_comfortable(self, pmv, ppd):
+        pmv_min, pmv_max, ppd_max = self.thresholds
+        return pmv_min <= pmv <= pmv_max and ppd <= ppd_max
+
+    def update(self, pmv, ppd, evicted=None):
+        """Add one reading; evicted is the (pmv, ppd, timestamp) it pushed out of the window"""
+        old_pmv, old_ppd = (None, None) if evicted is None else evicted[:2]
+        self.pmv.update(pmv, old_pmv)
+        self.ppd.update(ppd, old_ppd)
+        if self.thresholds is not None:
+            self.comfortable += self._is_comfortable(pmv, ppd)
+            if evicted is not None:
+                self.comfortable -= self._is_comfortable(old_pmv, old_ppd)
+
+    def comfort_counts(self, pmv_min, pmv_max, ppd_max, pmv_window, ppd_window):
+        """{'Comfort': n, 'Discomfort': m}; the window arrays are only read when the thresholds change"""
+        thresholds = (pmv_min, pmv_max, ppd_max)
+        if thresholds != self.thresholds:
+            self.thresholds = thresholds
+            self.comfortable = count_comfortable(pmv_window, ppd_window, *thresholds)
+        return {'Comfort': self.comfortable, 'Discomfort': len(self) - self.comfortable}
+
+    @classmethod
+    def from_history(cls, buffer):
+        """Statistics of everything currently in a HistoryBuffer"""
+        pmv, ppd, _ = buffer.window()
+        return cls.from_arrays(pmv, ppd, buffer.capacity)
+
+    @classmethod
+    def from_arrays(cls, pmv, ppd, capacity=None):
+        stats = cls(len(pmv) if capacity is None else capacity)
+        for values in zip(np.asarray(pmv).tolist(), np.asarray(ppd).tolist()):
+            stats.update(*values)
+        return stats
@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import time
+import uuid
+import numpy as np
+from datetime import datetime
+
+DEFAULT_SESSION_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'sessions')
+DEFAULT_SEGMENT_SIZE = 3600
+# Seconds a reading may wait in memory before it is written, bounding what a closed browser loses
+DEFAULT_FLUSH_INTERVAL = 10.0
+# Small segments written since the last compact that trigger the next one
+DEFAULT_COMPACT_AFTER = 32
+SEGMENT_DTYPE = np.dtype([('timestamp', '<i8'), ('pmv', '<f8'), ('ppd', '<f8')])
+_SEGMENT_NAME = re.compile(r'^seg-(\d+)-(\d+)(?:-\w+)?\.npy$')
+# Names of the live segments; swapped atomically so a merge is seen all at once
+_MANIFEST = 'segments.json'
+# Reads restarted when a segment disappears under them (a concurrent compact)
+_READ_ATTEMPTS = 5
+
+def new_session_id():
+    """Sortable, collision-safe session directory name"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+def list_sessions(root=DEFAULT_SESSION_ROOT):
+    """Stored session ids, newest first"""
+    if not os.path.isdir(root):
+        return []
+    return sorted((name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))), reverse=True)
+
+class SessionStore:
+    """
+    Append-only, columnar on-disk history for one session.
+
+    Readings are buffered in memory and written as immutable segment files
+    (structured .npy: timestamp int64, pmv/ppd float64). Each file name holds
+    its first and last timestamp, so a time-window read only memory-maps the
+    segments that overlap the window. The live segments are listed in a
+    manifest replaced with os.replace, so readers in other processes see
+    either the segments before a compact or the merged one, never both.
+    """
+
+    def __init__(self, session_id, root=DEFAULT_SESSION_ROOT, segment_size=DEFAULT_SEGMENT_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, compact_after=DEFAULT_COMPACT_AFTER):
+        """
+        flush_interval: Write buffered readings once the oldest has waited this many
+                        seconds (None: only every segment_size readings or on flush())
+        compact_after: Merge small segments after this many were written (None: only on compact())
+        """
+        if segment_size < 1:
+            raise ValueError("segment_size must be at least 1")
+        self.session_id = session_id
+        self.path = os.path.join(root, session_id)
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self._pending = []
+        self._pending_since = None
+        self._small_segments = 0
+
+    def append(self, pmv, ppd, timestamp):
+        """Buffer one reading; written every segment_size readings or flush_interval seconds"""
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.append((int(timestamp), float(pmv), float(ppd)))
+        if len(self._pending) >= self.segment_size or (
+                self.flush_interval is not None and time.monotonic() - self._pending_since >= self.flush_interval):
+            self.flush()
+            if self.compact_after is not None and self._small_segments >= self.compact_after:
+                self.compact()
+
+    def flush(self):
+        """Write buffered readings as a new segment"""
+        if not self._pending:
+            return
+        segment = np.array(self._pending, dtype=SEGMENT_DTYPE)
+        segment.sort(order='timestamp', kind='stable')
+        self._write_segment(segment)
+        if len(segment) < self.segment_size:
+            self._small_segments += 1
+        self._pending = []
+
+    def _write_segment(self, segment, replaces=()):
+        """Write segment, then publish it in the manifest in place of the replaced paths"""
+        os.makedirs(self.path, exist_ok=True)
+        name = f"seg-{segment['timestamp'][0]:012d}-{segment['timestamp'][-1]:012d}.npy"
+        target = os.path.join(self.path, name)
+        if os.path.exists(target):
+            name = name.replace('.npy', f"-{uuid.uuid4().hex[:6]}.npy")
+            target = os.path.join(self.path, name)
+        # Write then rename so readers never see a half-written segment
+        temporary = target + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, segment)
+        os.replace(temporary, target)
+
+        replaced = {os.path.basename(path) for path in replaces}
+        names = [other for other in self._segment_names() if other not in replaced]
+        self._write_manifest(names + [name])
+
+    def _segment_names(self):
+        """Live segment file names, as listed in the manifest"""
+        try:
+            with open(os.path.join(self.path, _MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _write_manifest(self, names):
+        temporary = os.path.join(self.path, _MANIFEST + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(sorted(names), f)
+        os.replace(temporary, os.path.join(self.path, _MANIFEST))
+
+    def segments(self):
+        """(first_timestamp, last_timestamp, path) of every segment, oldest first"""
+        found = []
+        for name in self._segment_names():
+            match = _SEGMENT_NAME.match(name)
+            if match:
+                found.append((int(match.group(1)), int(match.group(2)), os.path.join(self.path, name)))
+        return sorted(found)
+
+    def time_bounds(self):
+        """(first, last) timestamp stored, including unflushed readings, or None"""
+        bounds = [(first, last) for first, last, _ in self.segments()]
+        bounds += [(row[0], row[0]) for row in self._pending]
+        if not bounds:
+            return None
+        return min(first for first, _ in bounds), max(last for _, last in bounds)
+
+    def read_range(self, start=None, end=None):
+        """
+        Readings with start <= timestamp <= end (either bound optional).
+        Returns (pmv, ppd, timestamp) arrays, oldest first.
+        """
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        for attempt in range(_READ_ATTEMPTS):
+            try:
+                parts = self._read_segments(start, end)
+                break
+            except FileNotFoundError:
+                # A compact replaced segments after we listed them; the new manifest has the merged one
+                if attempt == _READ_ATTEMPTS - 1:
+                    raise
+        if self._pending:
+            pending = np.array(self._pending, dtype=SEGMENT_DTYPE)
+            parts.append(pending[(pending['timestamp'] >= start) & (pending['timestamp'] <= end)])
+
+        readings = np.concatenate(parts) if parts else np.empty(0, dtype=SEGMENT_DTYPE)
+        readings.sort(order='timestamp', kind='stable')
+        return readings['pmv'], readings['ppd'], readings['timestamp']
+
+    def read_last(self, count):
+        """
+        The newest count readings as (pmv, ppd, timestamp) arrays, oldest first;
+        only the newest segments that hold them are read
+        """
+        for attempt in range(_READ_ATTEMPTS):
+            try:
+                start = self._last_start(count)
+                break
+            except FileNotFoundError:
+                if attempt == _READ_ATTEMPTS - 1:
+                    raise
+        pmv, ppd, timestamp = self.read_range(start)
+        keep = slice(max(len(timestamp) - count, 0), None)
+        return pmv[keep], ppd[keep], timestamp[keep]
+
+    def _last_start(self, count):
+        """Timestamp after which at least count readings follow (None: all readings)"""
+        available = len(self._pending)
+        start = min(timestamp for timestamp, _, _ in self._pending) if self._pending else None
+        for first, _, path in sorted(self.segments(), key=lambda segment: segment[1], reverse=True):
+            if available >= count:
+                break
+            available += len(np.load(path, mmap_mode='r'))
+            start = first if start is None else min(start, first)
+        return start
+
+    def _read_segments(self, start, end):
+        parts = []
+        for first, last, path in self.segments():
+            if last < start or first > end:
+                continue
+            segment = np.load(path, mmap_mode='r')
+            lo = np.searchsorted(segment['timestamp'], start, side='left')
+            hi = np.searchsorted(segment['timestamp'], end, side='right')
+            if hi > lo:
+                parts.append(np.asarray(segment[lo:hi]))
+        return parts
+
+    def compact(self):
+        """Merge runs of small segments (e.g. from timed flushes and saves) into full-size ones"""
+        self.flush()
+        batch, count = [], 0
+        for _, _, path in self.segments():
+            # The memory map only reads the header, so full segments cost nothing to skip
+            if len(np.load(path, mmap_mode='r')) >= self.segment_size:
+                continue
+            segment = np.load(path)
+            batch.append((path, segment))
+            count += len(segment)
+            if count >= self.segment_size:
+                self._merge(batch)
+                batch, count = [], 0
+        if len(batch) > 1:
+            self._merge(batch)
+        self._small_segments = 0
+
+    def _merge(self, batch):
+        merged = np.concatenate([segment for _, segment in batch])
+        merged.sort(order='timestamp', kind='stable')
+        paths = [path for path, _ in batch]
+        # Readers switch to the merged segment with the manifest; only then are the originals removed
+        self._write_segment(merged, replaces=paths)
+        for path in paths:
+            os.remove(path)
+
+    def write_meta(self, meta):
+        """Store session settings (notes, title, thresholds) next to the segments"""
+        os.makedirs(self.path, exist_ok=True)
+        temporary = os.path.join(self.path, 'meta.json.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temporary, os.path.join(self.path, 'meta.json'))
+
+    def read_meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
@@ -0,0 +1,241 @@
+"""
+SQLite time-series storage for scored readings
+
+Raw readings are kept per (room, millisecond) in a clustered WITHOUT ROWID table,
+so a room's time-range query is an index range scan however large the
+database grows. Completed buckets are rolled up into 1 min and 15 min tiers
+(count, mean/min/max) and each tier has its own retention period.
+The database runs in WAL mode: one writer (the scoring daemon) and any number
+of readers (dashboards) work concurrently.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'timeseries.db')
+ROLLUP_TIERS = (60, 900)
+# Buckets are rolled up this long after they close, so late readings of a batch are included
+ROLLUP_GRACE = 30
+# Seconds each tier is kept (1 = raw readings); None keeps forever
+DEFAULT_RETENTION = {1: 7 * 86400, 60: 90 * 86400, 900: 2 * 365 * 86400}
+READING_COLUMNS = ('tdb', 'tr', 'vr', 'rh', 'met', 'clo', 'pmv', 'ppd')
+# readings.ts units per second (milliseconds)
+TIMESTAMP_SCALE = 1000
+_TS_LIMIT = 2 ** 62
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    room TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    tdb REAL, tr REAL, vr REAL, rh REAL, met REAL, clo REAL,
+    pmv REAL, ppd REAL,
+    PRIMARY KEY (room, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS readings_ts ON readings (ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    tier INTEGER NOT NULL,
+    room TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    tdb REAL, rh REAL,
+    pmv REAL, pmv_min REAL, pmv_max REAL,
+    ppd REAL, ppd_min REAL, ppd_max REAL,
+    PRIMARY KEY (tier, room, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_bucket ON rollups (tier, bucket);
+CREATE TABLE IF NOT EXISTS rollup_state (
+    tier INTEGER PRIMARY KEY,
+    watermark INTEGER NOT NULL
+);
+"""
+
+def _to_ts(seconds):
+    """Epoch seconds to readings.ts units, clamped to the SQLite integer range"""
+    return int(np.clip(np.floor(seconds * TIMESTAMP_SCALE), -_TS_LIMIT, _TS_LIMIT))
+
+class TimeSeriesDB:
+    def __init__(self, path=DEFAULT_DB_PATH, retention=None, readonly=False):
+        """
+        Open (and create) the database
+        retention: {tier_seconds: keep_seconds}, merged over DEFAULT_RETENTION
+        readonly: Open an existing database for queries only (dashboards)
+        """
+        self.path = path
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.readonly = readonly
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL with NORMAL sync loses at most the last transactions on power failure, never corrupts
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def insert(self, rows):
+        """
+        Store scored readings in one transaction
+        rows: structured array with room, timestamp and READING_COLUMNS fields
+        (services.results_store.LATEST_DTYPE); timestamps are kept to the millisecond,
+        so readings faster than 1 Hz are all stored (a repeated (room, millisecond) replaces the earlier row)
+        """
+        if len(rows) == 0:
+            return 0
+        values = zip(
+            rows['room'].tolist(),
+            np.floor(rows['timestamp'] * TIMESTAMP_SCALE).astype(np.int64).tolist(),
+            *(rows[name].tolist() for name in READING_COLUMNS)
+        )
+        # NaN results (out-of-range inputs) are stored as NULL
+        values = [tuple(None if value != value else value for value in row) for row in values]
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO readings (room, ts, {', '.join(READING_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(READING_COLUMNS) + 2))})",
+                    values
+                )
+        return len(values)
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def rollup(self, now=None):
+        """Aggregate raw readings of completed buckets into every tier; returns rows written per tier"""
+        now = int(time.time() if now is None else now)
+        written = {}
+        with self._lock:
+            with self._transaction():
+                for tier in ROLLUP_TIERS:
+                    state = self._conn.execute("SELECT watermark FROM rollup_state WHERE tier = ?", (tier,)).fetchone()
+                    if state is None:
+                        oldest = self._conn.execute("SELECT MIN(ts) FROM readings").fetchone()[0]
+                        if oldest is None:
+                            continue
+                        oldest //= TIMESTAMP_SCALE
+                        start = oldest - oldest % tier
+                    else:
+                        start = state[0]
+                    end = (now - ROLLUP_GRACE) - (now - ROLLUP_GRACE) % tier
+                    if end <= start:
+                        continue
+                    cursor = self._conn.execute(
+                        """INSERT OR REPLACE INTO rollups
+                           SELECT ?, room, ts / ? * ? AS bucket, COUNT(*), AVG(tdb), AVG(rh),
+                                  AVG(pmv), MIN(pmv), MAX(pmv), AVG(ppd), MIN(ppd), MAX(ppd)
+                           FROM readings WHERE ts >= ? AND ts < ?
+                           GROUP BY room, bucket""",
+                        (tier, tier * TIMESTAMP_SCALE, tier, start * TIMESTAMP_SCALE, end * TIMESTAMP_SCALE)
+                    )
+                    written[tier] = cursor.rowcount
+                    self._conn.execute("INSERT OR REPLACE INTO rollup_state VALUES (?, ?)", (tier, end))
+        return written
+
+    def apply_retention(self, now=None):
+        """Delete raw readings and rollups older than their tier's retention; returns rows deleted per tier"""
+        now = int(time.time() if now is None else now)
+        deleted = {}
+        with self._lock:
+            with self._transaction():
+                for tier, keep in self.retention.items():
+                    if keep is None:
+                        continue
+                    if tier == 1:
+                        # Never drop raw readings that are not rolled up yet
+                        watermark = self._conn.execute("SELECT MIN(watermark) FROM rollup_state").fetchone()[0]
+                        if watermark is None:
+                            continue
+                        cursor = self._conn.execute("DELETE FROM readings WHERE ts < ?",
+                                                    (min(now - keep, watermark) * TIMESTAMP_SCALE,))
+                    else:
+                        cursor = self._conn.execute("DELETE FROM rollups WHERE tier = ? AND bucket < ?",
+                                                    (tier, now - keep))
+                    deleted[tier] = cursor.rowcount
+        return deleted
+
+    def maintain(self, now=None):
+        """Roll up, then apply retention (run periodically by the writer)"""
+        return {'rolled_up': self.rollup(now), 'deleted': self.apply_retention(now)}
+
+    def query(self, room, start=None, end=None, tier=1):
+        """
+        (pmv, ppd, timestamp) arrays for one room with start <= timestamp <= end, oldest first
+        tier 1 reads raw readings (timestamps as float seconds); 60 or 900 read bucket
+        means (bucket start seconds), including buckets after the last roll-up,
+        which are averaged from the raw readings.
+        """
+        start = -_TS_LIMIT if start is None else start
+        end = _TS_LIMIT if end is None else end
+        with self._lock:
+            if tier == 1:
+                rows = self._conn.execute(
+                    "SELECT pmv, ppd, ts * 1.0 / ? FROM readings WHERE room = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                    (TIMESTAMP_SCALE, room, _to_ts(start), _to_ts(end))
+                ).fetchall()
+            else:
+                start, end = int(np.ceil(max(start, -_TS_LIMIT))), int(min(end, _TS_LIMIT))
+                rows = self._conn.execute(
+                    "SELECT pmv, ppd, bucket FROM rollups WHERE tier = ? AND room = ? AND bucket BETWEEN ? AND ? "
+                    "ORDER BY bucket",
+                    (tier, room, start, end)
+                ).fetchall()
+                # Buckets from the watermark on are not rolled up yet
+                state = self._conn.execute("SELECT watermark FROM rollup_state WHERE tier = ?", (tier,)).fetchone()
+                tail_start = max(start, -_TS_LIMIT if state is None else state[0])
+                rows += self._conn.execute(
+                    "SELECT AVG(pmv), AVG(ppd), ts / ? * ? AS bucket FROM readings WHERE room = ? AND ts >= ? "
+                    "GROUP BY bucket HAVING bucket BETWEEN ? AND ? ORDER BY bucket",
+                    (tier * TIMESTAMP_SCALE, tier, room, _to_ts(tail_start), tail_start, end)
+                ).fetchall()
+        if not rows:
+            return np.empty(0), np.empty(0), np.empty(0, dtype=np.float64 if tier == 1 else np.int64)
+        pmv, ppd, timestamps = zip(*rows)
+        return (np.array(pmv, dtype=np.float64), np.array(ppd, dtype=np.float64),
+                np.array(timestamps, dtype=np.float64 if tier == 1 else np.int64))
+
+    def rooms(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT room FROM readings ORDER BY room")]
+
+    def stats(self):
+        """Row counts per table/tier and file size"""
+        with self._lock:
+            raw = self._conn.execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+            tiers = dict(self._conn.execute("SELECT tier, COUNT(*) FROM rollups GROUP BY tier").fetchall())
+        return {
+            'readings': raw,
+            'rollups': tiers,
+            'bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time-series database maintenance")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    parser.add_argument('--maintain', action='store_true', help="Roll up and apply retention now")
+    args = parser.parse_args()
+
+    database = TimeSeriesDB(args.db)
+    if args.maintain:
+        print(database.maintain())
+    print(database.stats())
+    database.close()